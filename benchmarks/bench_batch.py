@@ -0,0 +1,62 @@
+"""
+Times batch optimization of many plans at 1, 2 and 4 worker processes.
+
+Usage: python benchmarks/bench_batch.py [jobs]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.ride_catalog as ride_catalog
+from utils.batch_optimizer import optimize_batch
+from utils.ride_table import get_ride_table
+
+WORKERS = [1, 2, 4]
+DUPLICATE_SHARE = 0.25
+
+
+def make_jobs(rng, ride_ids, count):
+    """Plans of 8-30 rides from random spots near the entrance, some repeated."""
+    jobs = []
+    while len(jobs) < count:
+        if jobs and rng.random() < DUPLICATE_SHARE:
+            jobs.append(dict(rng.choice(jobs)))
+            continue
+        jobs.append({
+            "latitude": 33.8121 + rng.uniform(-0.002, 0.002),
+            "longitude": -117.919 + rng.uniform(-0.002, 0.002),
+            "rideIds": rng.sample(ride_ids, rng.randint(8, 30)),
+        })
+    return jobs
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(11)
+    ride_ids = list(get_ride_table().ids)
+    catalog = [{"rideId": ride_id, "waitTime": rng.randint(5, 60)} for ride_id in ride_ids]
+    ride_catalog._catalog = ride_catalog.RideCatalog(loader=lambda: catalog)
+    jobs = make_jobs(rng, ride_ids, count)
+
+    print(f"{count} jobs on {os.cpu_count()} CPUs")
+    baseline = None
+    for workers in WORKERS:
+        began = time.perf_counter()
+        first = None
+        results = 0
+        for _ in optimize_batch(jobs, workers=workers):
+            results += 1
+            if first is None:
+                first = time.perf_counter() - began
+        elapsed = time.perf_counter() - began
+        baseline = baseline or elapsed
+        print(
+            f"workers={workers}  {elapsed:6.2f} s  {results / elapsed:7.1f} jobs/s  "
+            f"first result {first * 1000:6.1f} ms  speedup {baseline / elapsed:4.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
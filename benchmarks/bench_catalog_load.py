@@ -0,0 +1,76 @@
+"""
+Time to load the ride catalog at startup, from the rides JSON against the
+compiled Arrow file (utils/catalog_compiler.py), for parks of 75 rides up to
+100k (benchmarks/synthetic_park.py).
+
+Both include what the app derives before the first page renders: the sorted
+ride names and the digest the distance matrix is keyed on. "mapped" is the
+part of the compiled file used in place (numeric columns), which every
+process on the machine shares through the page cache.
+
+Usage: python benchmarks/bench_catalog_load.py
+"""
+import importlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_park import generate_park
+from utils.catalog_compiler import compile_catalog, load_compiled
+from utils.ride_table import RideTable
+
+SIZES = [75, 1000, 10000, 100000]
+REPEATS = 5
+
+
+def median_ms(func):
+    func()
+    timings = []
+    for _ in range(REPEATS):
+        began = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - began)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def from_json(path):
+    with open(path, "r") as f:
+        table = RideTable.from_records(json.load(f))
+    table.sorted_names(), table.digest()
+    return table
+
+
+def from_compiled(path):
+    table = load_compiled(path)
+    table.sorted_names(), table.digest()
+    return table
+
+
+def main():
+    began = time.perf_counter()
+    # Paid once per process by the compiled path
+    importlib.import_module("pyarrow.ipc")
+    print(f"pyarrow import: {(time.perf_counter() - began) * 1000:.0f} ms\n")
+    print(f"{'rides':>7s} {'json':>9s} {'compiled':>10s} {'speedup':>8s} {'json size':>10s} {'arrow size':>11s} {'mapped':>8s}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in SIZES:
+            source = os.path.join(tmp, f"rides_{size}.json")
+            compiled = os.path.join(tmp, f"rides_{size}.arrow")
+            with open(source, "w") as f:
+                json.dump(generate_park(size, seed=size)["rides"], f)
+            compile_catalog(source, compiled)
+
+            before = median_ms(lambda: from_json(source))
+            after = median_ms(lambda: from_compiled(compiled))
+            table = from_compiled(compiled)
+            mapped = sum(column.nbytes for column in (table.lats, table.lons, table.waits, table.durations))
+            print(f"{size:>7d} {before:>7.1f}ms {after:>8.1f}ms {before / after:>7.1f}x "
+                  f"{os.path.getsize(source) / 1024:>8.0f}KB {os.path.getsize(compiled) / 1024:>9.0f}KB "
+                  f"{mapped / 1024:>6.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Browser payload and server time of the location map as the attraction
+count grows: the plotly layer (utils/ride_map.py) ships every point, the
+pydeck map (utils/deck_map.py) only what is in view, clustered.
+
+Usage: python benchmarks/bench_deck_map.py
+"""
+import os
+import sys
+import time
+import warnings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import plotly.io as pio
+import plotly.tools as tools
+
+from benchmarks.synthetic_park import generate_park
+from utils.deck_map import MapPoints, location_deck, route_deck
+from utils.ride_table import RideTable
+from utils.ride_map import build_base_figure, location_map
+
+SIZES = [1000, 10000, 100000]
+# Plotly at 100k points takes seconds per run and tens of MB; skip it there
+PLOTLY_MAX_SIZE = 10000
+REPEATS = 5
+USER_LOC = (33.8121, -117.919)
+ZOOMS = [14, 16, 18]
+
+
+def timed(func):
+    """Median ms of REPEATS runs and the last result."""
+    result = func()
+    timings = []
+    for _ in range(REPEATS):
+        began = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - began)
+    return sorted(timings)[len(timings) // 2] * 1000, result
+
+
+def main():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    print(f"{'points':>7s} {'renderer':>12s} {'server':>10s} {'payload':>10s} {'markers':>8s} {'clusters':>9s}")
+    for size in SIZES:
+        table = RideTable.from_records(generate_park(size, seed=size)["rides"])
+        if size <= PLOTLY_MAX_SIZE:
+            base = build_base_figure(table)
+            ms, spec = timed(lambda: pio.to_json(
+                tools.return_figure_from_figure_or_data(location_map(USER_LOC, base=base), True), validate=False
+            ))
+            print(f"{size:>7d} {'plotly':>12s} {ms:>8.1f}ms {len(spec) / 1024:>8.0f}KB {size:>8d} {0:>9d}")
+
+        points = MapPoints.from_table(table)
+        for zoom in ZOOMS:
+            ms, spec = timed(lambda: location_deck(USER_LOC, zoom=zoom, points=points).to_json())
+            singles, clusters = points.view(*USER_LOC, zoom)
+            label = f"deck z={zoom}"
+            print(f"{size:>7d} {label:>12s} {ms:>8.1f}ms {len(spec) / 1024:>8.0f}KB "
+                  f"{len(singles):>8d} {len(clusters):>9d}")
+
+    stops = [dict(ride) for ride in generate_park(40, seed=1)["rides"]]
+    ms, spec = timed(lambda: route_deck(stops, USER_LOC).to_json())
+    print(f"\nroute of {len(stops)} stops: {ms:.1f} ms, {len(spec) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares repairing a route against re-solving it from scratch after the visitor
+finishes a ride, adds one and drops one.
+
+Usage: python benchmarks/bench_incremental.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils.ride_catalog as ride_catalog
+from benchmarks.bench_time_dependent import make_profile
+from utils.incremental import repair_route
+from utils.local_optimizer import optimize_routes_local
+from utils.ride_table import get_ride_table
+from utils.time_dependent import optimize_routes_time_dependent
+
+SIZES = [10, 20, 40]
+REPEATS = 5
+
+
+def median_ms(timings):
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def main():
+    rng = random.Random(7)
+    ride_ids = list(get_ride_table().ids)
+    profiles = {ride_id: make_profile(rng) for ride_id in ride_ids}
+    start_time = datetime(2025, 7, 1, 11, 0)
+
+    # Fixed waits, so the benchmark needs no DynamoDB access
+    catalog = [{"rideId": ride_id, "waitTime": rng.randint(5, 60)} for ride_id in ride_ids]
+    ride_catalog._catalog = ride_catalog.RideCatalog(loader=lambda: catalog)
+
+    for label, profile_arg in (("walking", None), ("predicted", profiles)):
+        for n in SIZES:
+            selection = rng.sample(ride_ids, n + 1)
+            extra = selection.pop()
+            if profile_arg:
+                first = optimize_routes_time_dependent(33.8121, -117.919, selection, profiles, start_time)
+            else:
+                first = optimize_routes_local(33.8121, -117.919, selection)
+            previous = first["data"]["orderedRides"]
+
+            # Finish the first ride, add one and drop the last
+            here = previous[0]
+            done, removed = [here["rideId"]], [previous[-1]["rideId"]]
+            remaining = [r["rideId"] for r in previous[1:-1]] + [extra]
+
+            repair_times, full_times = [], []
+            for _ in range(REPEATS):
+                began = time.perf_counter()
+                repaired = repair_route(previous, here["lat"], here["lon"], done, [extra], removed,
+                                        wait_profiles=profile_arg, start_time=start_time)
+                repair_times.append(time.perf_counter() - began)
+
+                began = time.perf_counter()
+                if profile_arg:
+                    full = optimize_routes_time_dependent(here["lat"], here["lon"], remaining, profiles, start_time)
+                else:
+                    full = optimize_routes_local(here["lat"], here["lon"], remaining)
+                full_times.append(time.perf_counter() - began)
+
+            repaired_total = repaired["data"]["totalTimeMinutes"]
+            full_total = full["data"]["totalTimeMinutes"]
+            print(
+                f"{label:9s} n={n:3d}  repair {median_ms(repair_times):7.1f} ms  "
+                f"full solve {median_ms(full_times):7.1f} ms  "
+                f"total {repaired_total:6.1f} vs {full_total:6.1f} min "
+                f"({(repaired_total / full_total - 1) * 100:+.1f}%)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Times one rerun of the Location page map before and after caching the ride
+layer, for parks of 50, 1k and 10k rides (benchmarks/synthetic_park.py).
+
+"before" rebuilds the DataFrame and the px.scatter_mapbox figure on every
+rerun, as the page used to; "after" draws the visitor marker on the shared
+ride layer. Both include the serialization st.plotly_chart does.
+
+Usage: python benchmarks/bench_location_map.py
+"""
+import os
+import sys
+import time
+import warnings
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import plotly.tools as tools
+
+from benchmarks.synthetic_park import generate_park
+from utils.ride_table import RideTable
+from utils.ride_map import build_base_figure, location_map
+
+SIZES = [50, 1000, 10000]
+REPEATS = 7
+USER_LOC = (33.8121, -117.919)
+
+
+def median_ms(func):
+    func()
+    timings = []
+    for _ in range(REPEATS):
+        began = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - began)
+    return sorted(timings)[len(timings) // 2] * 1000
+
+
+def st_serialize(fig):
+    """What st.plotly_chart does with the figure before sending it."""
+    return pio.to_json(tools.return_figure_from_figure_or_data(fig, validate_figure=True), validate=False)
+
+
+def old_make_map(rides, user_loc):
+    """The previous per-rerun map build from pages/1_Location.py."""
+    df = pd.DataFrame(rides)
+    fig = px.scatter_mapbox(
+        df, lat="lat", lon="lon", hover_name="name", custom_data=["description"],
+        zoom=16, height=600, color_discrete_sequence=["red"],
+    )
+    fig.update_traces(marker=dict(size=12), selector=dict(mode="markers"))
+    fig.update_traces(
+        hovertemplate="<b>%{hovertext}</b><br>%{customdata[0]}<extra></extra>",
+        hoverlabel=dict(align="left"),
+    )
+    lat, lon = user_loc
+    fig.update_layout(mapbox_center={"lat": lat, "lon": lon})
+    fig.add_scattermapbox(
+        lat=[lat], lon=[lon], mode="markers+text", marker=dict(size=12, color="blue"),
+        textposition="top right", showlegend=False, name="", hovertemplate="You are here!<extra></extra>",
+    )
+    fig.update_layout(
+        mapbox_style="open-street-map",
+        margin=dict(l=0, r=0, t=0, b=0),
+        shapes=[dict(type="rect", xref="paper", yref="paper", x0=0, y0=0, x1=1, y1=1,
+                     line=dict(color="black", width=3), fillcolor="rgba(0,0,0,0)")],
+    )
+    return fig
+
+
+def main():
+    # px.scatter_mapbox is deprecated in plotly 6 and warns on every call
+    warnings.simplefilter("ignore", DeprecationWarning)
+    print(f"{'rides':>6s} {'before':>10s} {'layer build':>12s} {'after':>10s} {'speedup':>8s} {'payload':>9s}")
+    for size in SIZES:
+        rides = generate_park(size, seed=size)["rides"]
+        table = RideTable.from_records(rides)
+        base = build_base_figure(table)
+        before = median_ms(lambda: st_serialize(old_make_map(rides, USER_LOC)))
+        layer = median_ms(lambda: build_base_figure(table))
+        after = median_ms(lambda: st_serialize(location_map(USER_LOC, base=base)))
+        payload = len(st_serialize(location_map(USER_LOC, base=base))) / 1024
+        print(f"{size:>6d} {before:>8.1f}ms {layer:>10.1f}ms {after:>8.1f}ms {before / after:>7.1f}x {payload:>7.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Cold catalog load time: sequential scan vs parallel segmented scan against
+the in-memory DynamoDB stand-in with a simulated round-trip latency.
+
+Usage: python benchmarks/bench_parallel_scan.py
+"""
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.fake_dynamodb import FakeDynamoDBClient
+from utils import config
+from utils.dynamodb import parallel_scan, serialize_item
+
+TABLE_SIZES = [1000, 10000, 100000]
+SEGMENTS = [1, 4, 8, 16]
+
+# Simulated round trip per scan call (seconds); a full 1 MB page usually takes longer
+LATENCY = 0.05
+
+
+def make_client(size, rng):
+    client = FakeDynamoDBClient(config.RIDE_TABLE_NAME, config.RIDE_TABLE_KEY, latency=LATENCY)
+    client.load(
+        serialize_item({
+            "rideId": str(uuid.UUID(int=rng.getrandbits(128))),
+            "name": f"Ride {i}",
+            "description": "x" * rng.randint(200, 600),
+            "waitTime": rng.randint(0, 90),
+            "status": "OPERATING",
+        })
+        for i in range(size)
+    )
+    return client
+
+
+def main():
+    rng = random.Random(11)
+    print(f"{'items':>7}  " + "  ".join(f"{f'{s} seg':>9}" for s in SEGMENTS) + "  speedup")
+    for size in TABLE_SIZES:
+        client = make_client(size, rng)
+        timings = []
+        for segments in SEGMENTS:
+            began = time.perf_counter()
+            items = list(parallel_scan(config.CATALOG_ATTRIBUTES, segments, client=client))
+            timings.append(time.perf_counter() - began)
+            assert len(items) == size
+        cells = "  ".join(f"{t * 1000:>7.0f}ms" for t in timings)
+        print(f"{size:>7}  {cells}  {timings[0] / min(timings):>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
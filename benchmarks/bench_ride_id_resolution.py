@@ -0,0 +1,74 @@
+"""
+Read cost of mapping selected ride names to IDs: a full table scan (what
+get_ride_ids_from_names used to do) vs the index + BatchGetItem path.
+
+Usage: python benchmarks/bench_ride_id_resolution.py
+"""
+import json
+import os
+import random
+import sys
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.fake_dynamodb import FakeDynamoDBClient
+from utils import config
+from utils.dynamodb import deserialize_item, serialize_item
+from utils.ride_mapping import resolve_ride_ids
+
+TABLE_SIZES = [75, 1000, 10000]
+SELECTION = 12
+
+
+def make_client(size, rides, rng):
+    """rideMetaData stand-in: the real rides plus synthetic ones up to size."""
+    client = FakeDynamoDBClient(config.RIDE_TABLE_NAME, config.RIDE_TABLE_KEY, unprocessed_every=40)
+    items = []
+    for i in range(size):
+        if i < len(rides):
+            ride = rides[i]
+        else:
+            ride = {"rideId": str(uuid.UUID(int=rng.getrandbits(128))), "name": f"Synthetic Ride {i}",
+                    "description": "x" * rng.randint(80, 400)}
+        items.append(serialize_item({
+            "rideId": ride["rideId"],
+            "name": ride["name"],
+            "description": ride.get("description", ""),
+            "waitTime": rng.randint(0, 90),
+            "status": "OPERATING",
+        }))
+    client.load(items)
+    return client
+
+
+def full_scan(client):
+    items = []
+    response = client.scan(TableName=config.RIDE_TABLE_NAME)
+    items.extend(response["Items"])
+    while "LastEvaluatedKey" in response:
+        response = client.scan(TableName=config.RIDE_TABLE_NAME, ExclusiveStartKey=response["LastEvaluatedKey"])
+        items.extend(response["Items"])
+    return {deserialize_item(item)["name"]: deserialize_item(item)["rideId"] for item in items}
+
+
+def main():
+    rng = random.Random(7)
+    with open(config.RIDES_JSON_PATH) as f:
+        rides = json.load(f)
+    names = [ride["name"] for ride in rng.sample(rides, SELECTION)]
+
+    print(f"{'table size':>10}  {'scan RCU':>9}  {'scan calls':>10}  {'batch RCU':>9}  {'batch calls':>11}")
+    for size in TABLE_SIZES:
+        client = make_client(size, rides, rng)
+        full_scan(client)
+        scan_units, scan_calls = client.consumed_read_units, sum(client.calls.values())
+
+        client.reset_counters()
+        resolved, unresolved, _, _ = resolve_ride_ids(names, client=client)
+        assert not unresolved and len(resolved) == SELECTION
+        print(f"{size:>10}  {scan_units:>9.1f}  {scan_calls:>10}  "
+              f"{client.consumed_read_units:>9.1f}  {sum(client.calls.values()):>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Memory held per ride catalog and per session: the previous lists of dicts
+against the columnar RideTable (utils/ride_table.py), for parks of 75, 1k
+and 10k rides (benchmarks/synthetic_park.py).
+
+"catalog" is the scanned rideMetaData items with the ID and name lookups
+built over them; "process" adds what the other modules kept from their own
+loads of the rides JSON file (local optimizer, spatial index, distance
+matrix, name index and search descriptions), where now one more table shares
+the catalog's interned IDs and names. "session" is the ride name list each
+Streamlit session used to copy into st.session_state.all_rides.
+
+Usage: python benchmarks/bench_ride_table.py
+"""
+import datetime
+import json
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic_park import generate_park, generate_wait_trace, table_items
+from utils.ride_table import RideTable, ride_id, ride_name
+
+SIZES = [75, 1000, 10000]
+DAY = datetime.date(2026, 7, 4)
+
+
+def allocated(build):
+    """Bytes still allocated by build() once it returns, and its result."""
+    tracemalloc.start()
+    tracemalloc.clear_traces()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, result
+
+
+def old_catalog(items_json):
+    """The lookups RideCatalog kept next to the raw items."""
+    items = json.loads(items_json)
+    by_id, by_name, names = {}, {}, []
+    for item in items:
+        name = ride_name(item)
+        rid = ride_id(item)
+        if name:
+            names.append(name)
+            if rid:
+                by_name[name] = rid
+        if rid:
+            by_id[rid] = item
+    return items, by_id, by_name, names
+
+
+def old_rides_copies(rides_json):
+    """What each module held after loading the rides JSON file itself."""
+    locations = {ride["rideId"]: ride for ride in json.loads(rides_json)}
+    indexed = json.loads(rides_json)
+    matrix_rides = json.loads(rides_json)
+    matrix_ids = [ride["rideId"] for ride in matrix_rides]
+    matrix = (matrix_ids, {rid: i for i, rid in enumerate(matrix_ids)},
+              np.array([r["lat"] for r in matrix_rides]), np.array([r["lon"] for r in matrix_rides]))
+    del matrix_rides
+    name_index = {ride["name"]: ride["rideId"] for ride in json.loads(rides_json)}
+    descriptions = {ride["name"]: ride.get("description", "") for ride in json.loads(rides_json)}
+    return locations, indexed, matrix, name_index, descriptions
+
+
+def main():
+    print(f"{'rides':>6s} {'what':>8s} {'before':>10s} {'after':>10s} {'ratio':>7s}")
+    for size in SIZES:
+        park = generate_park(size, seed=size)
+        trace = generate_wait_trace(park, DAY)
+        # Decoded from JSON so every string is a fresh object, as after a scan
+        items_json = json.dumps(table_items(park, trace[len(trace) // 2][1]))
+        rides_json = json.dumps(park["rides"])
+
+        before, catalog = allocated(lambda: old_catalog(items_json))
+        after, table = allocated(lambda: RideTable.from_items(json.loads(items_json)))
+        print(f"{size:>6d} {'catalog':>8s} {before / 1024:>8.0f}KB {after / 1024:>8.0f}KB {before / after:>6.1f}x")
+
+        copies, _ = allocated(lambda: old_rides_copies(rides_json))
+        # Interned IDs and names are shared with the catalog table built above
+        coords, _ = allocated(lambda: RideTable.from_records(json.loads(rides_json)))
+        before, after = before + copies, after + coords
+        print(f"{size:>6d} {'process':>8s} {before / 1024:>8.0f}KB {after / 1024:>8.0f}KB {before / after:>6.1f}x")
+
+        # Sessions now share the table's tuple instead of each holding a copy
+        before, _ = allocated(lambda: list(catalog[3]))
+        print(f"{size:>6d} {'session':>8s} {before / 1024:>8.0f}KB {0:>8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
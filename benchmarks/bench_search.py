@@ -0,0 +1,60 @@
+"""
+Query latency of the ride search index vs the old substring filter, on
+synthetic multi-park catalogs.
+
+Usage: python benchmarks/bench_search.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.search_index import RideSearchIndex
+
+CATALOG_SIZES = [75, 1000, 5000, 20000]
+QUERIES = ["h", "haunt", "haunted mansoin", "space mountain", "boat", "coaster", "pirates of", "xyzzy"]
+REPEATS = 200
+
+WORDS = ["Haunted", "Mansion", "Space", "Mountain", "Pirates", "Caribbean", "Jungle", "Cruise", "Big",
+         "Thunder", "Railroad", "Tower", "Terror", "Flight", "Passage", "Star", "Wars", "Adventure",
+         "Dumbo", "Flying", "Elephant", "Mad", "Tea", "Party", "Peter", "Pan", "Splash", "Coaster",
+         "Safari", "Expedition", "Everest", "Kilimanjaro", "Frozen", "Ever", "After", "Soarin", "Test",
+         "Track", "Mission", "Racers", "Toy", "Story", "Mania", "Slinky", "Dog", "Dash", "Boats"]
+DESCRIPTION_WORDS = ["a", "thrilling", "whimsical", "boat", "ride", "through", "dark", "scenes",
+                     "high-speed", "coaster", "family", "adventure", "with", "twists", "and", "turns"]
+
+
+def make_catalog(size, rng):
+    names, descriptions = [], {}
+    while len(names) < size:
+        name = " ".join(rng.sample(WORDS, rng.randint(2, 4))) + f" {len(names)}"
+        names.append(name)
+        descriptions[name] = " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(8, 20)))
+    return names, descriptions
+
+
+def time_per_query(func):
+    began = time.perf_counter()
+    for _ in range(REPEATS):
+        for query in QUERIES:
+            func(query)
+    return (time.perf_counter() - began) / (REPEATS * len(QUERIES))
+
+
+def main():
+    rng = random.Random(3)
+    print(f"{'rides':>6}  {'build':>8}  {'index query':>11}  {'substring filter':>16}")
+    for size in CATALOG_SIZES:
+        names, descriptions = make_catalog(size, rng)
+        began = time.perf_counter()
+        index = RideSearchIndex(names, descriptions)
+        build = time.perf_counter() - began
+
+        indexed = time_per_query(lambda q: index.search(q, 20))
+        linear = time_per_query(lambda q: [n for n in names if q.lower() in n.lower()])
+        print(f"{size:>6}  {build * 1000:>6.0f}ms  {indexed * 1e6:>9.0f}us  {linear * 1e6:>14.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Nearest-ride and within-radius queries: grid spatial index vs brute-force
+(vectorized) haversine over every point.
+
+Usage: python benchmarks/bench_spatial_index.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.distance_matrix import haversine_km
+from utils.spatial_index import SpatialIndex
+
+CATALOG_SIZES = [50, 1000, 10000, 100000]
+QUERIES = 500
+K = 5
+RADIUS_KM = 0.25
+
+
+def synthetic_points(n, rng):
+    """Points clustered around a few 'lands' in a 3 km x 3 km park."""
+    centers = rng.random((8, 2)) * 0.03
+    which = rng.integers(0, len(centers), n)
+    offsets = rng.normal(scale=0.002, size=(n, 2))
+    points = centers[which] + offsets
+    return 33.80 + points[:, 0], -117.93 + points[:, 1]
+
+
+def main():
+    rng = np.random.default_rng(5)
+    print(f"{'points':>7}  {'build':>7}  {'knn index':>10}  {'knn brute':>10}  {'radius index':>12}  {'radius brute':>12}")
+    for n in CATALOG_SIZES:
+        lats, lons = synthetic_points(n, rng)
+        queries = np.column_stack([33.80 + rng.random(QUERIES) * 0.03, -117.93 + rng.random(QUERIES) * 0.03])
+
+        began = time.perf_counter()
+        index = SpatialIndex(lats, lons)
+        build = time.perf_counter() - began
+
+        def per_query(func):
+            began = time.perf_counter()
+            for lat, lon in queries:
+                func(lat, lon)
+            return (time.perf_counter() - began) / QUERIES * 1e6
+
+        def brute_knn(lat, lon):
+            d = haversine_km(lat, lon, lats, lons)
+            top = np.argpartition(d, K - 1)[:K] if n > K else np.arange(n)
+            return top[np.argsort(d[top])]
+
+        def brute_radius(lat, lon):
+            d = haversine_km(lat, lon, lats, lons)
+            return np.flatnonzero(d <= RADIUS_KM)
+
+        print(
+            f"{n:>7}  {build * 1000:>5.1f}ms  "
+            f"{per_query(lambda a, b: index.nearest(a, b, K)):>8.0f}us  {per_query(brute_knn):>8.0f}us  "
+            f"{per_query(lambda a, b: index.within_radius(a, b, RADIUS_KM)):>10.0f}us  {per_query(brute_radius):>10.0f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Times the time-dependent optimizer at 10, 20 and 40 rides.
+
+Usage: python benchmarks/bench_time_dependent.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.distance_matrix import get_distance_matrix
+from utils.local_optimizer import solve_open_path
+from utils.ride_table import get_ride_table
+from utils.time_dependent import WaitModel, optimize_routes_time_dependent, simulate
+
+SIZES = [10, 20, 40]
+REPEATS = 5
+
+
+def make_profile(rng, bucket_minutes=15):
+    """A day of waits with a midday peak of random height and timing."""
+    peak = rng.uniform(11 * 60, 16 * 60)
+    height = rng.uniform(20, 90)
+    profile = []
+    for b in range(24 * 60 // bucket_minutes):
+        clock = b * bucket_minutes
+        shape = max(0.0, 1 - abs(clock - peak) / 300)
+        profile.append(int(5 + height * shape))
+    return profile
+
+
+def main():
+    rng = random.Random(42)
+    table = get_ride_table()
+    ride_ids = list(table.ids)
+    profiles = {ride_id: make_profile(rng) for ride_id in ride_ids}
+    start_time = datetime(2025, 7, 1, 9, 0)
+
+    for n in SIZES:
+        selection = rng.sample(ride_ids, n)
+        timings = []
+        for _ in range(REPEATS):
+            began = time.perf_counter()
+            result = optimize_routes_time_dependent(33.8121, -117.919, selection, profiles, start_time)
+            timings.append(time.perf_counter() - began)
+        timings.sort()
+
+        # Same rides in the walking-only order, for comparison
+        cost = get_distance_matrix().walking_cost_matrix(33.8121, -117.919, table.rows(selection))
+        model = WaitModel([None] + [profiles[ride_id] for ride_id in selection])
+        start_clock = start_time.hour * 60
+        static_total = simulate(cost, model, solve_open_path(cost), start_clock) - start_clock
+
+        print(
+            f"n={n:3d}  median {timings[len(timings) // 2] * 1000:7.1f} ms  "
+            f"max {timings[-1] * 1000:7.1f} ms  "
+            f"total {result['data']['totalTimeMinutes']:6.1f} min (walking-only order {static_total:6.1f} min)"
+        )
+
+
+if __name__ == "__main__":
+    main()
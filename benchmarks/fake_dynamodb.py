@@ -0,0 +1,162 @@
+"""
+In-memory stand-in for the DynamoDB client calls the app makes.
+
+Supports scan (including parallel Segment/TotalSegments), query on a name
+index, batch_get_item and put_item with low-level attribute values, and
+charges read capacity the way DynamoDB does for eventually consistent reads
+(0.5 RCU per 4 KB; whole item size regardless of projection). An optional
+per-call latency simulates the network round trip.
+"""
+import bisect
+import math
+import threading
+import time
+import zlib
+
+READ_UNIT_BYTES = 4096
+SCAN_PAGE_BYTES = 1024 * 1024
+
+
+def _value_size(value):
+    (kind, data), = value.items()
+    if kind in ("S", "N", "B"):
+        return len(str(data).encode("utf-8"))
+    if kind == "M":
+        return 3 + sum(len(k) + _value_size(v) for k, v in data.items())
+    if kind == "L":
+        return 3 + sum(_value_size(v) for v in data)
+    return 1
+
+
+def item_size(item):
+    """Approximate DynamoDB item size in bytes."""
+    return sum(len(name) + _value_size(value) for name, value in item.items())
+
+
+def _read_units(size):
+    return math.ceil(size / READ_UNIT_BYTES) * 0.5
+
+
+class FakeDynamoDBClient:
+    def __init__(self, table_name, key, name_index=None, name_attribute="name", latency=0.0, unprocessed_every=0):
+        """
+        Args:
+            table_name (str): The only table this client serves
+            key (str): Partition key attribute
+            name_index (str): Name of a GSI on name_attribute, if the table has one
+            latency (float): Seconds added to every call
+            unprocessed_every (int): Return every Nth batch key as unprocessed (0 = never)
+        """
+        self.table_name = table_name
+        self.key = key
+        self.name_index = name_index
+        self.name_attribute = name_attribute
+        self.latency = latency
+        self.unprocessed_every = unprocessed_every
+        self._items = {}
+        self._sizes = {}
+        self._segments = {}
+        self._lock = threading.Lock()
+        self.consumed_read_units = 0.0
+        self.calls = {}
+
+    def _charge(self, operation, units):
+        with self._lock:
+            self.consumed_read_units += units
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset_counters(self):
+        self.consumed_read_units = 0.0
+        self.calls = {}
+
+    def put_item(self, TableName, Item):
+        self._items[Item[self.key]["S"]] = Item
+        self._sizes[Item[self.key]["S"]] = item_size(Item)
+        self._segments = {}
+        return {}
+
+    def load(self, items):
+        """Bulk-loads low-level items."""
+        for item in items:
+            self._items[item[self.key]["S"]] = item
+            self._sizes[item[self.key]["S"]] = item_size(item)
+        self._segments = {}
+
+    def _segment_keys(self, segment, total_segments):
+        """Sorted keys of one scan segment (cached until the table changes)."""
+        with self._lock:
+            if (segment, total_segments) not in self._segments:
+                keys = sorted(self._items)
+                if total_segments > 1:
+                    keys = [k for k in keys if zlib.crc32(k.encode("utf-8")) % total_segments == segment]
+                self._segments[(segment, total_segments)] = keys
+            return self._segments[(segment, total_segments)]
+
+    @staticmethod
+    def _project(item, expression, names):
+        if not expression:
+            return item
+        wanted = [names.get(part.strip(), part.strip()) for part in expression.split(",")]
+        return {name: item[name] for name in wanted if name in item}
+
+    def scan(self, TableName, ExclusiveStartKey=None, Segment=0, TotalSegments=1, Limit=None,
+             ProjectionExpression=None, ExpressionAttributeNames=None, ReturnConsumedCapacity=None):
+        keys = self._segment_keys(Segment, TotalSegments)
+        position = 0
+        if ExclusiveStartKey:
+            position = bisect.bisect_right(keys, ExclusiveStartKey[self.key]["S"])
+
+        page, size = [], 0
+        while position < len(keys) and size < SCAN_PAGE_BYTES and (Limit is None or len(page) < Limit):
+            page.append(self._items[keys[position]])
+            size += self._sizes[keys[position]]
+            position += 1
+
+        units = _read_units(size)
+        self._charge("scan", units)
+        response = {
+            "Items": [self._project(item, ProjectionExpression, ExpressionAttributeNames or {}) for item in page],
+            "Count": len(page),
+            "ConsumedCapacity": {"TableName": TableName, "CapacityUnits": units},
+        }
+        if position < len(keys):
+            response["LastEvaluatedKey"] = {self.key: page[-1][self.key]}
+        return response
+
+    def query(self, TableName, IndexName, KeyConditionExpression, ExpressionAttributeNames,
+              ExpressionAttributeValues, ProjectionExpression=None, ReturnConsumedCapacity=None):
+        if IndexName != self.name_index:
+            raise ValueError(f"Unknown index {IndexName}")
+        wanted = ExpressionAttributeValues[":name"]["S"]
+        matches = [item for item in self._items.values()
+                   if item.get(self.name_attribute, {}).get("S") == wanted]
+        units = max(_read_units(sum(item_size(item) for item in matches)), 0.5)
+        self._charge("query", units)
+        return {
+            "Items": [self._project(item, ProjectionExpression, ExpressionAttributeNames) for item in matches],
+            "ConsumedCapacity": {"TableName": TableName, "CapacityUnits": units},
+        }
+
+    def batch_get_item(self, RequestItems, ReturnConsumedCapacity=None):
+        request = RequestItems[self.table_name]
+        names = request.get("ExpressionAttributeNames", {})
+        found, unprocessed, units = [], [], 0.0
+        for i, key in enumerate(request["Keys"]):
+            if self.unprocessed_every and (i + 1) % self.unprocessed_every == 0:
+                unprocessed.append(key)
+                continue
+            item = self._items.get(key[self.key]["S"])
+            if item is not None:
+                units += _read_units(item_size(item))
+                found.append(self._project(item, request.get("ProjectionExpression"), names))
+        self._charge("batch_get_item", units)
+        response = {
+            "Responses": {self.table_name: found},
+            "ConsumedCapacity": [{"TableName": self.table_name, "CapacityUnits": units}],
+            "UnprocessedKeys": {},
+        }
+        if unprocessed:
+            response["UnprocessedKeys"] = {self.table_name: dict(request, Keys=unprocessed)}
+        return response
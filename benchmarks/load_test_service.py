@@ -0,0 +1,86 @@
+"""
+Load-tests the optimization service with concurrent clients and prints client
+latency percentiles next to the service's own histograms.
+
+Start the service first (python -m utils.optimize_service), then:
+
+Usage: python benchmarks/load_test_service.py [--url URL] [--requests N] [--concurrency C]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.ride_table import get_ride_table
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=f"http://{config.SERVICE_HOST}:{config.SERVICE_PORT}/Optimize-Routes")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--min-rides", type=int, default=10)
+    parser.add_argument("--max-rides", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    ride_ids = list(get_ride_table().ids)
+    payloads = [
+        {
+            "latitude": 33.8121 + rng.uniform(-0.002, 0.002),
+            "longitude": -117.919 + rng.uniform(-0.002, 0.002),
+            "rideIds": rng.sample(ride_ids, rng.randint(args.min_rides, args.max_rides)),
+        }
+        for _ in range(args.requests)
+    ]
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+
+    def call(payload):
+        began = time.perf_counter()
+        response = session.post(args.url, json=payload, timeout=60)
+        return response.status_code, time.perf_counter() - began
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outcomes = list(pool.map(call, payloads))
+    elapsed = time.perf_counter() - began
+
+    ok = sorted(seconds * 1000 for status, seconds in outcomes if status == 200)
+    statuses = {}
+    for status, _ in outcomes:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    print(f"{args.requests} requests, {args.concurrency} concurrent: {elapsed:.2f} s, {len(ok) / elapsed:.1f} ok/s")
+    print(f"status codes: {statuses}")
+    print(
+        f"client latency ms  p50 {percentile(ok, 50):.1f}  p90 {percentile(ok, 90):.1f}  "
+        f"p99 {percentile(ok, 99):.1f}  max {ok[-1] if ok else 0:.1f}"
+    )
+
+    metrics = session.get(urljoin(args.url, "/metrics"), timeout=5).json()
+    for name, histogram in metrics["latency"].items():
+        print(
+            f"service {name:5s} ms  p50 <={histogram['p50Ms']}  p90 <={histogram['p90Ms']}  "
+            f"p99 <={histogram['p99Ms']}  mean {histogram['meanMs']}"
+        )
+    print(json.dumps({k: v for k, v in metrics.items() if k != "latency"}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+Benchmark suite: catalog loading, ride search, walkway paths, route
+optimization and itinerary building on synthetic parks of several sizes
+(benchmarks/synthetic_park.py), with fixed seeds.
+
+Results are written as JSON and compared against benchmarks/baseline.json;
+any benchmark whose median and best run both got slower than the threshold
+is flagged and the script exits with status 1. Baselines are machine
+specific: refresh them with --update-baseline on the machine that compares.
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # run and compare
+    python benchmarks/run_benchmarks.py --quick            # smaller parks, fewer repeats and processes
+    python benchmarks/run_benchmarks.py --update-baseline  # store this run as the baseline
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+
+import utils.distance_matrix as distance_matrix
+import utils.ride_table as ride_table
+from benchmarks.fake_dynamodb import FakeDynamoDBClient
+from benchmarks.synthetic_park import generate_park, generate_wait_trace, generate_walkways, table_items
+from utils import config
+from utils.dynamodb import parallel_scan, serialize_item
+from utils.itinerary import build_itinerary
+from utils.local_optimizer import solve_open_path
+from utils.ride_catalog import RideCatalog
+from utils.ride_table import RideTable
+from utils.search_index import RideSearchIndex
+from utils.time_dependent import WaitModel, solve_time_dependent
+from utils.walkway_graph import WalkwayGraph, compile_graph
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "latest.json")
+
+PARK_SIZES = [75, 500, 2000]
+QUICK_PARK_SIZES = [75, 500]
+SELECTION_SIZES = [10, 20, 40]
+REPEATS = 7
+QUICK_REPEATS = 3
+PROCESSES = 5
+QUICK_PROCESSES = 3
+SEED = 2024
+
+# Slowdown (fraction of the baseline median and best run) that counts as a
+# regression, ignored below an absolute noise floor
+THRESHOLD = 0.25
+NOISE_FLOOR_MS = 0.1
+
+PARK_CENTER = (33.8121, -117.919)
+TRACE_DAY = date(2025, 7, 1)
+QUERIES = ["haunted", "pir", "frontierland coaster", "jngle safari", "tomorrow", "mansion", "teacups ride", "spinnig"]
+
+
+def make_park(size, seed=SEED):
+    """Synthetic park of size rides (see synthetic_park) with the waits of a midday snapshot."""
+    park = generate_park(size, seed=seed)
+    trace = generate_wait_trace(park, TRACE_DAY, seed=seed)
+    park["items"] = table_items(park, trace[len(trace) // 2][1])
+    return park
+
+
+def make_profiles(rides, seed=SEED):
+    """A day of 15-minute wait buckets per ride with a midday peak."""
+    rng = random.Random(seed)
+    profiles = {}
+    for ride in rides:
+        peak, height = rng.uniform(660, 960), rng.uniform(20, 90)
+        profiles[ride["rideId"]] = [int(5 + height * max(0.0, 1 - abs(b * 15 - peak) / 300)) for b in range(96)]
+    return profiles
+
+
+def measure(func, repeats):
+    """
+    Runs func repeats times (after one warm-up) and summarizes wall times in ms.
+
+    Like timeit, garbage collection is off while timing so a collection
+    triggered by earlier work does not land on a random run.
+    """
+    func()
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            began = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - began) * 1000)
+    finally:
+        gc.enable()
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(timings[0], 3),
+        "max_ms": round(timings[-1], 3),
+        "runs": repeats,
+    }
+
+
+def bench_catalog(park, repeats):
+    """Cold catalog load: parallel scan of the DynamoDB stand-in plus index build."""
+    client = FakeDynamoDBClient(config.RIDE_TABLE_NAME, config.RIDE_TABLE_KEY)
+    client.load(serialize_item(item) for item in park["items"])
+
+    def load():
+        catalog = RideCatalog(
+            loader=lambda: list(parallel_scan(config.CATALOG_ATTRIBUTES, config.CATALOG_SCAN_SEGMENTS, client=client))
+        )
+        assert len(catalog.names()) == len(park["items"])
+
+    return measure(load, repeats)
+
+
+def bench_search(rides, repeats):
+    names = [ride["name"] for ride in rides]
+    descriptions = {ride["name"]: ride["description"] for ride in rides}
+    index = RideSearchIndex(names, descriptions)
+    return {
+        "search_build": measure(lambda: RideSearchIndex(names, descriptions), repeats),
+        "search_queries": measure(lambda: [index.search(q) for q in QUERIES], repeats),
+    }
+
+
+def bench_walkways(park, repeats, rng):
+    """Shortest walking paths between 40 rides over the park's walkway graph."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "walkways.json")
+        with open(source, "w") as f:
+            json.dump(generate_walkways(park, seed=SEED), f)
+        compile_graph(source, os.path.join(tmp, "walkways.npz"))
+        graph = WalkwayGraph(os.path.join(tmp, "walkways.npz"))
+
+    selection = rng.sample(park["rides"], min(40, len(park["rides"])))
+    lats, lons = [r["lat"] for r in selection], [r["lon"] for r in selection]
+    return measure(lambda: graph.pairwise_km(lats, lons, workers=1), repeats)
+
+
+def bench_optimize(rides, repeats, rng):
+    """Walking-only and time-dependent solves, then the itinerary for the solved route."""
+    table = RideTable.from_records(rides)
+    matrix = distance_matrix.DistanceMatrix(table, distance_matrix.build_distance_matrix(table.lats, table.lons))
+    # build_itinerary reads the shared matrix, which follows the shared table
+    ride_table._table = (ride_table.rides_version(), table)
+    distance_matrix._matrix = matrix
+    profiles = make_profiles(rides)
+    by_id = {ride["rideId"]: ride for ride in rides}
+
+    results = {}
+    for n in SELECTION_SIZES:
+        selection = rng.sample(list(by_id), n)
+        cost = matrix.walking_cost_matrix(*PARK_CENTER, table.rows(selection))
+        model = WaitModel([None] + [profiles[ride_id] for ride_id in selection])
+        results[f"optimize_walking[rides={n}]"] = measure(lambda: solve_open_path(cost), repeats)
+        results[f"optimize_predicted[rides={n}]"] = measure(
+            lambda: solve_time_dependent(cost, model, 9 * 60), repeats
+        )
+
+        tour = solve_open_path(cost)
+        ordered = [dict(by_id[selection[node - 1]]) for node in tour[1:]]
+        start = datetime(2025, 7, 1, 9, 0)
+        results[f"itinerary[rides={n}]"] = measure(lambda: build_itinerary(ordered, start), repeats)
+    return results
+
+
+def run_suite(quick=False):
+    repeats = QUICK_REPEATS if quick else REPEATS
+    results = {}
+    for size in QUICK_PARK_SIZES if quick else PARK_SIZES:
+        park = make_park(size)
+        print(f"park of {size} rides...", flush=True)
+        results[f"catalog_load[park={size}]"] = bench_catalog(park, repeats)
+        for name, summary in bench_search(park["rides"], repeats).items():
+            results[f"{name}[park={size}]"] = summary
+        lats, lons = [r["lat"] for r in park["rides"]], [r["lon"] for r in park["rides"]]
+        results[f"distance_matrix_build[park={size}]"] = measure(
+            lambda: distance_matrix.build_distance_matrix(lats, lons), repeats
+        )
+        results[f"walkway_paths[park={size}]"] = bench_walkways(park, repeats, random.Random(SEED))
+
+    # Solver cost depends on the selection, not the park, so one park is enough
+    results.update(bench_optimize(make_park(PARK_SIZES[1])["rides"], repeats, random.Random(SEED)))
+    return results
+
+
+def run_in_processes(processes, quick=False):
+    """
+    Runs the suite in fresh interpreter processes and combines the runs.
+
+    Timings shift between processes (memory layout, thread scheduling) far
+    more than within one, so each benchmark reports the median of the
+    per-process medians and the best run seen anywhere.
+    """
+    runs = []
+    for i in range(processes):
+        print(f"process {i + 1}/{processes}", flush=True)
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            command = [sys.executable, os.path.abspath(__file__), "--worker", "--output", path]
+            subprocess.run(command + (["--quick"] if quick else []), check=True)
+            with open(path, "r") as f:
+                runs.append(json.load(f))
+        finally:
+            os.remove(path)
+
+    results = {}
+    for name in runs[0]:
+        summaries = [run[name] for run in runs]
+        results[name] = {
+            "median_ms": round(statistics.median(s["median_ms"] for s in summaries), 3),
+            "min_ms": min(s["min_ms"] for s in summaries),
+            "max_ms": max(s["max_ms"] for s in summaries),
+            "runs": sum(s["runs"] for s in summaries),
+            "processes": processes,
+        }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints each benchmark against the baseline and returns the regressed names."""
+    regressions = []
+    print(f"\n{'benchmark':42s} {'baseline':>10s} {'current':>10s} {'change':>8s}")
+    for name, summary in results.items():
+        current = summary["median_ms"]
+        before = baseline.get(name, {}).get("median_ms")
+        if before is None:
+            print(f"{name:42s} {'-':>10s} {current:>8.2f}ms {'new':>8s}")
+            continue
+        change = (current - before) / before if before else 0.0
+        # The fastest run must be slower too, so one noisy median is not enough
+        best, best_before = summary["min_ms"], baseline[name]["min_ms"]
+        regressed = (
+            change > threshold and current - before > NOISE_FLOOR_MS
+            and best > best_before * (1 + threshold)
+        )
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:42s} {before:>8.2f}ms {current:>8.2f}ms {change * 100:>+7.1f}%{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--quick", action="store_true", help="Smaller parks, fewer repeats and processes")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed slowdown, e.g. 0.25 for 25%%")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Where to write this run's results")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--processes", type=int, help="Interpreter processes to run the suite in")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # One process's share of run_in_processes: plain results, no comparison
+        with open(args.output, "w") as f:
+            json.dump(run_suite(args.quick), f)
+        return 0
+
+    processes = args.processes or (QUICK_PROCESSES if args.quick else PROCESSES)
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+            "seed": SEED,
+            "processes": processes,
+        },
+        "results": run_in_processes(processes, args.quick),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated at {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --update-baseline to store one")
+        return 0
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(report["results"], baseline["results"], args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+Synthetic parks and wait-time traces for scale testing.
+
+A park is a set of themed lands clustered around a central hub, each with
+its own attractions, in the schema of rides_with_descriptions.json (rideId,
+name, lat, lon, description). Alongside it come a walkway graph in the
+JSON format utils.walkway_graph compiles, rideMetaData items (rideId, name,
+waitTime, status) and day-long wait traces with opening hours, midday
+peaks, breakdowns and closed attractions. Everything is seeded.
+
+Usage:
+    python benchmarks/synthetic_park.py --scale 100 --days 3 --out data/synthetic/x100
+
+then point the app, the optimization service or a benchmark at it with the
+environment variables the script prints.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+
+from utils import config
+from utils.distance_matrix import haversine_km
+from utils.spatial_index import SpatialIndex
+
+SEED = 2024
+
+# The real catalog: 75 rides in roughly a 1.2 km wide park around this point
+REAL_PARK_RIDES = 75
+PARK_CENTER = (33.8121, -117.919)
+REAL_PARK_RADIUS_KM = 0.6
+KM_PER_DEGREE_LAT = 111.32
+
+LAND_NAMES = [
+    "Main Street", "Adventureland", "Frontierland", "Fantasyland", "Tomorrowland",
+    "Critter Country", "New Orleans Square", "Toontown", "Galaxy's Edge", "Pixar Pier",
+    "Hollywood Land", "Grizzly Peak", "Paradise Gardens", "Cars Land", "Avengers Campus",
+]
+ADJECTIVES = [
+    "Haunted", "Flying", "Spinning", "Runaway", "Mad", "Enchanted", "Galactic", "Thunder",
+    "Jungle", "Pirate", "Royal", "Rocket", "Whirling", "Mystic", "Wild", "Starlight",
+]
+NOUNS = [
+    "Mansion", "Railroad", "Coaster", "Teacups", "Safari", "Voyage", "Carousel", "Canyon",
+    "Expedition", "Bobsleds", "Speedway", "Odyssey", "Cruise", "Adventure", "Lagoon", "Falls",
+]
+DESCRIPTION_WORDS = (
+    "a thrilling family classic journey through dark caverns and sunny lagoons with "
+    "animatronic characters twisting drops gentle boats glowing stars and song for "
+    "guests of all ages who love adventure speed music and magic under the sky"
+).split()
+
+# Park hours (local time) and how often waits are recorded, like the scheduled Lambda
+OPENING_HOUR = 8
+CLOSING_HOUR = 23
+SNAPSHOT_MINUTES = 20
+
+# Share of attractions closed all day, and breakdowns per attraction per day
+CLOSED_SHARE = 0.03
+BREAKDOWNS_PER_DAY = 0.4
+MAX_WAIT_MINUTES = 180
+
+
+def park_radius_km(rides):
+    """Parks grow in area with their ride count, keeping the real park's density."""
+    return REAL_PARK_RADIUS_KM * math.sqrt(rides / REAL_PARK_RIDES)
+
+
+def _offset(lat, lon, north_km, east_km):
+    """Point north_km / east_km away from (lat, lon)."""
+    return (
+        lat + north_km / KM_PER_DEGREE_LAT,
+        lon + east_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(lat))),
+    )
+
+
+def generate_park(rides, lands=None, seed=SEED):
+    """
+    Generates a park of clustered lands.
+
+    Args:
+        rides (int): Number of attractions
+        lands (int): Number of lands (defaults to about the square root of rides)
+        seed (int): Random seed
+
+    Returns:
+        dict: "rides" (catalog JSON records) and "lands" (name, lat, lon, rideIds)
+    """
+    rng = random.Random(seed)
+    lands = lands or max(1, round(math.sqrt(rides)))
+    radius = park_radius_km(rides)
+
+    # Land centers spread over the park, with a minimum spacing where possible
+    spacing = radius / math.sqrt(lands)
+    centers = []
+    for _ in range(lands):
+        for _ in range(50):
+            r, angle = radius * 0.85 * math.sqrt(rng.random()), rng.uniform(0, 2 * math.pi)
+            point = (r * math.cos(angle), r * math.sin(angle))
+            if all(math.dist(point, other) >= spacing for other in centers):
+                break
+        centers.append(point)
+
+    land_records = []
+    for i, (north, east) in enumerate(centers):
+        name = LAND_NAMES[i % len(LAND_NAMES)]
+        if i >= len(LAND_NAMES):
+            name = f"{name} {i // len(LAND_NAMES) + 1}"
+        lat, lon = _offset(*PARK_CENTER, north, east)
+        land_records.append({"name": name, "lat": lat, "lon": lon, "north": north, "east": east, "rideIds": []})
+
+    # Popular lands get more attractions
+    weights = [rng.uniform(0.5, 1.5) for _ in land_records]
+    ride_records = []
+    used_names = set()
+    for i in range(rides):
+        land = rng.choices(land_records, weights)[0]
+        north = land["north"] + rng.gauss(0, spacing * 0.3)
+        east = land["east"] + rng.gauss(0, spacing * 0.3)
+        lat, lon = _offset(*PARK_CENTER, north, east)
+
+        name = f"{land['name']} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        if name in used_names:
+            name = f"{name} {i}"
+        used_names.add(name)
+
+        ride_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        land["rideIds"].append(ride_id)
+        ride_records.append({
+            "rideId": ride_id,
+            "name": name,
+            "lat": round(lat, 6),
+            "lon": round(lon, 6),
+            "description": " ".join(rng.choices(DESCRIPTION_WORDS, k=rng.randint(15, 60))).capitalize() + ".",
+        })
+
+    for land in land_records:
+        del land["north"], land["east"]
+    return {"rides": ride_records, "lands": land_records}
+
+
+def generate_walkways(park, neighbors=2, seed=SEED):
+    """
+    Generates a walkway graph for a park in the JSON format of utils.walkway_graph.
+
+    Each land's plaza links to the central hub and its nearest plazas; every
+    attraction links to its land's plaza and to its nearest attractions. Paths wind, so each edge is 0-25% longer than a
+    straight line.
+
+    Returns:
+        dict: "nodes" (id, lat, lon) and "edges" (from, to, length_m)
+    """
+    rng = random.Random(seed)
+    rides = {ride["rideId"]: ride for ride in park["rides"]}
+    nodes = [{"id": "hub", "lat": PARK_CENTER[0], "lon": PARK_CENTER[1]}]
+    edges = []
+
+    def link(a, b):
+        km = float(haversine_km(a["lat"], a["lon"], b["lat"], b["lon"]))
+        edges.append({"from": a["id"], "to": b["id"], "length_m": round(km * 1000 * rng.uniform(1.0, 1.25), 1)})
+
+    plazas, attractions = [], []
+    for i, land in enumerate(park["lands"]):
+        plaza = {"id": f"plaza-{i}", "lat": land["lat"], "lon": land["lon"]}
+        plazas.append(plaza)
+        link(nodes[0], plaza)
+        for ride_id in land["rideIds"]:
+            attraction = {"id": ride_id, "lat": rides[ride_id]["lat"], "lon": rides[ride_id]["lon"]}
+            attractions.append(attraction)
+            link(plaza, attraction)
+    nodes += plazas + attractions
+
+    # Paths between neighboring lands and between nearby attractions (of any
+    # land), so walks need not detour through the plazas and the hub
+    for group in (plazas, attractions):
+        if len(group) < 2:
+            continue
+        index = SpatialIndex([g["lat"] for g in group], [g["lon"] for g in group])
+        linked = set()
+        for i, node in enumerate(group):
+            for j in index.nearest(node["lat"], node["lon"], neighbors + 1)[0].tolist():
+                pair = (min(i, j), max(i, j))
+                if j != i and pair not in linked:
+                    linked.add(pair)
+                    link(node, group[j])
+    return {"nodes": nodes, "edges": edges}
+
+
+def generate_wait_trace(park, day, interval_minutes=SNAPSHOT_MINUTES, seed=SEED):
+    """
+    Generates one day of wait snapshots, as the scheduled ingest would record them.
+
+    Each attraction has its own popularity and peak hour; waits ramp up after
+    opening, peak in the afternoon and fall off towards closing, with noise.
+    A few attractions are closed all day and others break down for an hour
+    or two (status DOWN, no wait).
+
+    Args:
+        park (dict): From generate_park
+        day (date): Day to generate (park-local)
+        interval_minutes (int): Minutes between snapshots
+        seed (int): Random seed (combined with the day)
+
+    Returns:
+        list: (observed_at as an aware datetime, waits) per snapshot; waits are
+        dicts with rideId, waitTime and status, as wait_history.append_snapshot takes
+    """
+    ride_ids = [ride["rideId"] for ride in park["rides"]]
+    n = len(ride_ids)
+    # Per-ride traits stay the same every day; the day only changes noise and breakdowns
+    traits = np.random.default_rng(seed)
+    popularity = traits.lognormal(mean=3.2, sigma=0.6, size=n)
+    peak_hour = traits.uniform(12, 16.5, size=n)
+    rng = np.random.default_rng([seed, day.toordinal()])
+    closed = rng.random(n) < CLOSED_SHARE
+
+    # At most one breakdown window per attraction per day
+    breaks = rng.random(n) < BREAKDOWNS_PER_DAY
+    down_start = rng.uniform(OPENING_HOUR, CLOSING_HOUR - 1, size=n)
+    down_end = down_start + rng.uniform(0.3, 2.0, size=n)
+
+    tz = ZoneInfo(config.PARK_TIMEZONE)
+    snapshots = []
+    clock = datetime(day.year, day.month, day.day, OPENING_HOUR, tzinfo=tz)
+    closing = clock.replace(hour=CLOSING_HOUR)
+    while clock <= closing:
+        hour = clock.hour + clock.minute / 60
+        shape = np.exp(-((hour - peak_hour) ** 2) / (2 * 3.0 ** 2))
+        ramp = min(1.0, (hour - OPENING_HOUR + 0.5) / 2)
+        noise = rng.normal(1.0, 0.12, size=n).clip(0.5, 1.5)
+        waits = np.minimum(MAX_WAIT_MINUTES, popularity * (0.25 + shape) * ramp * noise)
+        waits = (np.round(waits / 5) * 5).astype(int)
+
+        down = breaks & (down_start <= hour) & (hour < down_end)
+        status = np.where(closed, "CLOSED", np.where(down, "DOWN", "OPERATING"))
+        waits = np.where(status == "OPERATING", waits, 0)
+        snapshots.append((clock, [
+            {"rideId": ride_id, "waitTime": int(wait), "status": str(state)}
+            for ride_id, wait, state in zip(ride_ids, waits, status)
+        ]))
+        clock += timedelta(minutes=interval_minutes)
+    return snapshots
+
+
+def table_items(park, waits):
+    """rideMetaData items for a park at one snapshot of its wait trace."""
+    by_id = {w["rideId"]: w for w in waits}
+    return [
+        {
+            "rideId": ride["rideId"],
+            "name": ride["name"],
+            "waitTime": by_id[ride["rideId"]]["waitTime"],
+            "status": by_id[ride["rideId"]]["status"],
+        }
+        for ride in park["rides"]
+    ]
+
+
+def write_park(out_dir, rides, days=1, lands=None, seed=SEED):
+    """
+    Writes a synthetic park to out_dir: rides.json, walkways.json/.npz,
+    ride_table.jsonl (rideMetaData items at midday on the last day) and a
+    Parquet wait history covering the last days days.
+
+    Returns:
+        dict: Environment variables that point the app at the park
+    """
+    from utils.walkway_graph import compile_graph
+    from utils.wait_history import append_snapshot
+
+    os.makedirs(out_dir, exist_ok=True)
+    park = generate_park(rides, lands, seed)
+    rides_path = os.path.join(out_dir, "rides.json")
+    with open(rides_path, "w") as f:
+        json.dump(park["rides"], f)
+
+    walkways_json = os.path.join(out_dir, "walkways.json")
+    walkways_npz = os.path.join(out_dir, "walkways.npz")
+    with open(walkways_json, "w") as f:
+        json.dump(generate_walkways(park, seed=seed), f)
+    compile_graph(walkways_json, walkways_npz)
+
+    history_dir = os.path.join(out_dir, "wait_history")
+    today = date.today()
+    trace = []
+    for offset in range(days, 0, -1):
+        trace = generate_wait_trace(park, today - timedelta(days=offset), seed=seed)
+        for observed_at, waits in trace:
+            append_snapshot(waits, observed_at, root=history_dir)
+
+    midday = trace[len(trace) // 2][1]
+    with open(os.path.join(out_dir, "ride_table.jsonl"), "w") as f:
+        for item in table_items(park, midday):
+            f.write(json.dumps(item) + "\n")
+
+    return {
+        "RIDES_JSON_PATH": rides_path,
+        "WALKWAY_GRAPH_PATH": walkways_npz,
+        "WAIT_HISTORY_DIR": history_dir,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", type=float, default=10, help="Multiple of the real park's ride count")
+    size.add_argument("--rides", type=int, help="Exact number of attractions")
+    parser.add_argument("--lands", type=int, help="Number of lands (default: about sqrt(rides))")
+    parser.add_argument("--days", type=int, default=1, help="Days of wait history to record")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--out", help="Output directory (default: data/synthetic/<rides>)")
+    args = parser.parse_args()
+
+    rides = args.rides or round(REAL_PARK_RIDES * args.scale)
+    out_dir = args.out or os.path.join(config.PROJECT_ROOT, "data", "synthetic", str(rides))
+    env = write_park(out_dir, rides, args.days, args.lands, args.seed)
+    print(f"Wrote a park of {rides} attractions to {out_dir}")
+    for name, value in env.items():
+        print(f"export {name}={value}")
+
+
+if __name__ == "__main__":
+    main()
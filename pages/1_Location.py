@@ -1,15 +1,26 @@
 import streamlit as st
-import json
-import pandas as pd
-import plotly.express as px
+import os
+import sys
 from streamlit_js_eval import get_geolocation  # pip install streamlit_js_eval
 
-st.title("Disneyland Rides Map")
+# Add the root directory to sys.path to enable imports from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import config
+from utils.distance_matrix import WALKING_SPEED_KM_PER_MIN
+from utils.ride_map import location_map
+from utils.session import initialize_session_state
+from utils.spatial_index import get_ride_spatial_index
+from utils.telemetry import span
+from utils.debug_panel import render_debug_panel
+
+# How many nearby rides to suggest
+NEARBY_RIDE_COUNT = 5
 
-# — load rides.json (must include rideId, name, lat, lon, description) —
-with open("rides_with_descriptions.json", "r") as f:
-    rides = json.load(f)
-df = pd.DataFrame(rides)
+# Initialize session state
+initialize_session_state()
+render_debug_panel()
+
+st.title("Disneyland Rides Map")
 
 # — keep user_loc in session state —
 if "user_loc" not in st.session_state:
@@ -29,62 +40,37 @@ if st.session_state.user_loc is None:
 # Set location set variable to true anyways
 st.session_state.location_set = True
 
-# — build map, centering & dropping marker if we have coords —
-def make_map(user_loc=None):
-    fig = px.scatter_mapbox(
-        df,
-        lat="lat",
-        lon="lon",
-        hover_name="name",
-        custom_data=["description"],      # supply description without label
-        zoom=16,
-        height=600,
-        color_discrete_sequence=["red"],
-    )
-    fig.update_traces(
-    marker=dict(size=12),
-    selector=dict(mode="markers")     # only the ride dots (not your blue user‐dot)
-    )
+# — render the map: the ride layer is shared, only the visitor's marker is per request —
+if config.MAP_RENDERER == "deck":
+    # Only attractions near the view are sent, clustered at this zoom level
+    from utils.deck_map import location_deck
 
-    # use a hovertemplate to show only name & description,
-    # and left-align both lines
-    fig.update_traces(
-        hovertemplate=(
-            "<b>%{hovertext}</b><br>%{customdata[0]}<extra></extra>"
-        ),
-        hoverlabel=dict(align="left")
-    )
+    zoom = st.slider("Map zoom", min_value=12, max_value=19, value=16)
+    with span("render", page="location", renderer="deck"):
+        st.pydeck_chart(location_deck(st.session_state.user_loc, zoom=zoom), use_container_width=True)
+else:
+    with span("render", page="location"):
+        st.plotly_chart(location_map(st.session_state.user_loc), use_container_width=True)
 
-    if user_loc:
-        lat, lon = user_loc
-        fig.update_layout(mapbox_center={"lat": lat, "lon": lon})
-        fig.add_scattermapbox(
-            lat=[lat],
-            lon=[lon],
-            mode="markers+text",
-            marker=dict(size=12, color="blue"),
-            textposition="top right",
-            showlegend=False,
-            name="",
-            hovertemplate="You are here!<extra></extra>",
-        )
+# — closest rides to the visitor, from the shared spatial index —
+if st.session_state.user_loc:
+    spatial_index, indexed_rides = get_ride_spatial_index()
+    nearest, distances = spatial_index.nearest(*st.session_state.user_loc, NEARBY_RIDE_COUNT)
+    nearby_rides = [indexed_rides.names[i] for i in nearest]
 
-    fig.update_layout(
-        mapbox_style="open-street-map",
-        margin=dict(l=0, r=0, t=0, b=0),
-        shapes=[                          # thin black border
-            dict(
-                type="rect",
-                xref="paper",
-                yref="paper",
-                x0=0, y0=0, x1=1, y1=1,
-                line=dict(color="black", width=3),
-                fillcolor="rgba(0,0,0,0)",
-            )
-        ],
+    st.subheader("Closest rides to you")
+    st.dataframe(
+        {
+            "Attraction": nearby_rides,
+            "Walk": [f"{d / WALKING_SPEED_KM_PER_MIN:.0f} min ({d * 1000:.0f} m)" for d in distances],
+        },
+        hide_index=True,
+        use_container_width=True,
     )
 
-    return fig
-
-# — render the map —
-st.plotly_chart(make_map(st.session_state.user_loc), use_container_width=True)
\ No newline at end of file
+    # Seed the plan (and so the optimizer) with the nearby rides
+    if st.button("Add these to my plan", use_container_width=True):
+        for ride in nearby_rides:
+            if ride not in st.session_state.selected_rides:
+                st.session_state.selected_rides.append(ride)
+        st.switch_page("pages/2_Rides.py")
@@ -18,10 +18,13 @@ st.set_page_config(
 # Add the root directory to sys.path to enable imports from utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.get_rides import get_all_ride_names_from_dynamodb
+from utils.search_index import get_search_index
 from utils.session import initialize_session_state
+from utils.debug_panel import render_debug_panel
 
 # Initialize session state
 initialize_session_state()
+render_debug_panel()
 
 # Check if location is set
 if not st.session_state.get("location_set"):
@@ -62,21 +65,18 @@ st.markdown("""
 st.title("🎢 Disneyland Ride Planner")
 st.write(f"Planning your visit from coordinates: ({st.session_state.latitude:.6f}, {st.session_state.longitude:.6f})")
 
-# Load rides if not already loaded
-if 'all_rides' not in st.session_state or not st.session_state.all_rides:
-    with st.spinner("Loading rides..."):
-        st.info("Connecting to database to fetch rides...")
-        result = get_all_ride_names_from_dynamodb()
-        
-        if result.get("status") == "success":
-            st.session_state.all_rides = sorted(result['rides'])
-            st.success(f"Successfully loaded {len(st.session_state.all_rides)} rides!")
-        else:
-            st.error(f"Error loading rides: {result.get('message')}")
-            st.session_state.all_rides = []
+# Ride names are shared by every session, not copied into each one
+with st.spinner("Loading rides..."):
+    result = get_all_ride_names_from_dynamodb()
+
+if result.get("status") == "success":
+    all_rides = result['rides']
+else:
+    st.error(f"Error loading rides: {result.get('message')}")
+    all_rides = ()
 
 # For debugging
-st.write(f"Total rides loaded: {len(st.session_state.all_rides)}")
+st.write(f"Total rides loaded: {len(all_rides)}")
 
 if 'selected_rides' not in st.session_state:
     st.session_state.selected_rides = []
@@ -84,6 +84,9 @@ if 'selected_rides' not in st.session_state:
 # # Main app header
 # st.title("🎢 Disneyland Ride Planner")
 
+# Most search results to show
+SEARCH_RESULT_LIMIT = 50
+
 # Create two columns for main layout
 left_col, right_col = st.columns([3, 2])
 
@@ -93,15 +96,19 @@ with left_col:
     # Auto-complete search box
     search_query = st.text_input("🔍 Search for rides", key="search")
     
-    # Filter rides based on search query
+    # Ranked prefix/fuzzy matches from the index shared by all sessions
     if search_query:
-        filtered_rides = [ride for ride in st.session_state.all_rides 
-                         if search_query.lower() in ride.lower()]
+        search_index = get_search_index(all_rides)
+        filtered_rides, match_count = search_index.search_with_total(search_query, k=SEARCH_RESULT_LIMIT)
     else:
-        filtered_rides = st.session_state.all_rides
+        filtered_rides = all_rides
+        match_count = len(all_rides)
     
     # Display number of matching rides
-    st.caption(f"Found {len(filtered_rides)} rides")
+    if match_count > len(filtered_rides):
+        st.caption(f"Found {match_count} rides, showing the best {len(filtered_rides)}")
+    else:
+        st.caption(f"Found {match_count} rides")
     
     # Function to add a ride to selected list
     def add_ride(ride_name):
@@ -140,7 +147,7 @@ with left_col:
     st.write("### Quick Add")
     quick_add = st.selectbox(
         "Select a ride to add:",
-        options=[""] + [r for r in st.session_state.all_rides if r not in st.session_state.selected_rides],
+        options=[""] + [r for r in all_rides if r not in st.session_state.selected_rides],
         index=0
     )
     
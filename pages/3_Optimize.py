@@ -2,9 +2,7 @@ import streamlit as st
 import json
 import sys
 import os
-import time
-import pandas as pd
-from datetime import datetime, timedelta
+from streamlit_js_eval import get_geolocation
 
 # Set page configuration at the very beginning
 st.set_page_config(
@@ -19,9 +17,18 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.session import initialize_session_state
 from utils.ride_mapping import get_ride_ids_from_names
 from utils.route_optimizer import optimize_routes
+from utils.itinerary import build_itinerary
+from utils.wait_history import build_wait_profiles, has_history
+from utils.progress import BackgroundTask
+from utils.incremental import repair_route
+from utils.time_dependent import park_now
+from utils.deck_map import route_deck
+from utils.telemetry import span
+from utils.debug_panel import render_debug_panel
 
 # Initialize session state
 initialize_session_state()
+render_debug_panel()
 
 # Check if rides are selected
 if not st.session_state.get("selected_rides"):
@@ -132,16 +139,51 @@ def format_duration(minutes):
     return f"{mins} min"
 
 
-# Function to calculate estimated time
-def calculate_time_estimate(start_time, minutes_to_add):
-    return start_time + timedelta(minutes=minutes_to_add)
+# Plan around predicted queues when we have wait history to predict from
+use_predicted_waits = st.checkbox(
+    "Plan around predicted wait times",
+    value=has_history(),
+    disabled=not has_history(),
+    help="Schedules each ride for when its queue is usually short, based on recorded wait times.",
+)
+
+# Resolve ride IDs and optimize; runs on a worker thread so the page can show its progress
+def run_optimization(selected_rides, latitude, longitude, use_predicted_waits, progress_callback):
+    ride_id_result = get_ride_ids_from_names(selected_rides)
+    if ride_id_result["status"] != "success" or ride_id_result["found_count"] == 0:
+        return ride_id_result, None
+    ride_ids = ride_id_result["ride_ids"]
+    progress_callback("catalog_resolved", f"Found {len(ride_ids)} ride IDs")
+
+    wait_profiles = build_wait_profiles(ride_ids) if use_predicted_waits else None
+    optimization_result = optimize_routes(
+        latitude, longitude, ride_ids,
+        wait_profiles=wait_profiles,
+        start_time=park_now(),
+        progress_callback=progress_callback,
+        wait_times=ride_id_result["wait_times"],
+    )
+    return ride_id_result, optimization_result
 
 
 # Main optimization process
 if st.button("Optimize My Route", type="primary", use_container_width=True):
     with st.spinner("Optimizing your route..."):
-        # Step 1: Get ride IDs for the selected ride names
-        ride_id_result = get_ride_ids_from_names(st.session_state.selected_rides)
+        task = BackgroundTask(
+            run_optimization,
+            list(st.session_state.selected_rides),
+            st.session_state.latitude,
+            st.session_state.longitude,
+            use_predicted_waits,
+        )
+
+        # Show real progress events until the result is ready
+        progress_bar = st.progress(0, text="Looking up your rides...")
+        for event in task.events():
+            progress_bar.progress(event.fraction, text=event.message)
+        progress_bar.empty()
+
+        ride_id_result, optimization_result = task.result()
 
         if ride_id_result["status"] != "success" or ride_id_result["found_count"] == 0:
             st.error(
@@ -153,21 +195,6 @@ if st.button("Optimize My Route", type="primary", use_container_width=True):
                 )
             st.stop()
 
-        # Step 2: Call the optimization API
-        ride_ids = ride_id_result["ride_ids"]
-        st.info(f"Found {len(ride_ids)} ride IDs. Calling optimization API...")
-
-        # Add a progress bar for visual feedback
-        progress_bar = st.progress(0)
-        for i in range(100):
-            # Simulate progress while waiting for API
-            time.sleep(0.02)
-            progress_bar.progress(i + 1)
-
-        optimization_result = optimize_routes(
-            st.session_state.latitude, st.session_state.longitude, ride_ids
-        )
-
         if optimization_result["status"] != "success":
             st.error(
                 f"Failed to optimize route: {optimization_result.get('message', 'Unknown error')}"
@@ -177,16 +204,90 @@ if st.button("Optimize My Route", type="primary", use_container_width=True):
                     st.code(optimization_result["details"])
             st.stop()
 
-        # Process successful result
-        route_data = optimization_result["data"]
+        # Keep the route so it can be updated as the day goes on
+        st.session_state.route_data = optimization_result["data"]
+        st.session_state.route_predicted = use_predicted_waits
+
+
+# Ride IDs by name; results from the optimization API may not carry IDs
+def ride_ids_by_name(names):
+    if not names:
+        return {}
+    result = get_ride_ids_from_names(names)
+    found = [name for name in names if name not in result.get("missing_rides", [])]
+    return dict(zip(found, result.get("ride_ids", [])))
+
+
+# Where the visitor sets off from: their live position if the browser shares
+# it, else the last ride they finished, else where they started the day
+def start_position(ordered, done_names, live_location):
+    if live_location:
+        return live_location["coords"]["latitude"], live_location["coords"]["longitude"]
+    finished = [ride for ride in ordered if ride["name"] in done_names and ride.get("lat") is not None]
+    if finished:
+        return finished[-1]["lat"], finished[-1]["lon"]
+    return st.session_state.latitude, st.session_state.longitude
+
+
+# Repair the current route after rides are finished, added or removed
+def update_route(route_data, done_names, selected_rides, latitude, longitude, use_predicted_waits):
+    route_names = [ride["name"] for ride in route_data["orderedRides"]]
+    new_names = [name for name in selected_rides if name not in route_names]
+    unknown = [ride["name"] for ride in route_data["orderedRides"] if not ride.get("rideId")]
+    ids = ride_ids_by_name(unknown + new_names)
+    ordered = [
+        dict(ride, rideId=ride.get("rideId") or ids.get(ride["name"])) for ride in route_data["orderedRides"]
+    ]
+    done = [ride["rideId"] for ride in ordered if ride["name"] in done_names]
+    removed = [ride["rideId"] for ride in ordered if ride["name"] not in selected_rides]
+    added = [ids[name] for name in new_names if name in ids]
+    wait_profiles = None
+    if use_predicted_waits:
+        wait_profiles = build_wait_profiles([ride["rideId"] for ride in ordered] + added)
+    return repair_route(ordered, latitude, longitude, done, added, removed, wait_profiles=wait_profiles,
+                        start_time=park_now())
+
+
+if st.session_state.route_data:
+    with st.expander("Update my route as I go"):
+        st.caption(
+            "Mark the rides you have finished (and add or remove rides on the Rides page), "
+            "then update your route from your current location."
+        )
+        done_names = st.multiselect(
+            "Rides I've finished",
+            [ride["name"] for ride in st.session_state.route_data["orderedRides"]],
+        )
+        live_location = get_geolocation()
+        if st.button("Update My Route"):
+            latitude, longitude = start_position(
+                st.session_state.route_data["orderedRides"], done_names, live_location
+            )
+            repair_result = update_route(
+                st.session_state.route_data,
+                done_names,
+                st.session_state.selected_rides,
+                latitude,
+                longitude,
+                st.session_state.route_predicted,
+            )
+            if repair_result["status"] == "success":
+                st.session_state.route_data = repair_result["data"]
+                st.session_state.selected_rides = [
+                    name for name in st.session_state.selected_rides if name not in done_names
+                ]
+            else:
+                st.error(f"Failed to update route: {repair_result.get('message', 'Unknown error')}")
+
+    route_data = st.session_state.route_data
 
+    with span("render", page="optimize", rides=len(route_data.get("orderedRides", []))):
         # Extract the ordered rides and total time from the API response
         ordered_rides = route_data.get("orderedRides", [])
         total_time_minutes = route_data.get("totalTimeMinutes", 0)
 
         # Create tabs for different views
-        # tab1, tab2, tab3 = st.tabs(["Route Overview", "Detailed Itinerary", "Map View"])
-        tab1, tab2 = st.tabs(["Route Overview", "Detailed Itinerary"])
+        tab1, tab2, tab3 = st.tabs(["Route Overview", "Detailed Itinerary", "Map View"])
 
         with tab1:
             # Display summary statistics
@@ -247,6 +348,9 @@ if st.button("Optimize My Route", type="primary", use_container_width=True):
             st.subheader("Route Overview")
 
             if ordered_rides:
+                # pandas is only needed once there is a route to show
+                import pandas as pd
+
                 # Create a DataFrame for the route
                 route_df = pd.DataFrame(ordered_rides)
 
@@ -273,60 +377,20 @@ if st.button("Optimize My Route", type="primary", use_container_width=True):
 
             # Display each step in the route with rich formatting
             if ordered_rides:
-                # Get the current time to calculate actual times
-                now = datetime.now()
-                current_time = now
-
-                # Estimate ride duration (since it's not provided by the API)
-                estimated_ride_duration = 10  # minutes per ride, on average
-
-                for i, ride in enumerate(ordered_rides):
-                    ride_name = ride.get("name", "Unknown Ride")
-                    wait_time = ride.get("waitTime", 0)
+                # Walking legs are looked up in the precomputed distance matrix
+                itinerary = build_itinerary(ordered_rides, park_now())
 
-                    # Calculate estimated times
-                    wait_end_time = calculate_time_estimate(current_time, wait_time)
-                    ride_end_time = calculate_time_estimate(
-                        wait_end_time, estimated_ride_duration
-                    )
+                for i, step in enumerate(itinerary):
+                    ride_name = step["name"]
+                    wait_time = step["wait_time"]
+                    estimated_ride_duration = step["ride_duration"]
+                    walking_time = step["walking_time"]
+                    walking_distance = step["walking_distance"]
 
                     # Format for display
-                    arrival_time_str = current_time.strftime("%I:%M %p")
-                    wait_end_str = wait_end_time.strftime("%I:%M %p")
-                    ride_end_str = ride_end_time.strftime("%I:%M %p")
-
-                    # Calculate walking time to next attraction (estimate)
-                    walking_time = 0
-                    walking_distance = 0
-
-                    if i < len(ordered_rides) - 1:
-                        # Calculate distance between current and next ride
-                        next_ride = ordered_rides[i + 1]
-                        if all(key in ride for key in ["lat", "lon"]) and all(
-                            key in next_ride for key in ["lat", "lon"]
-                        ):
-                            from math import sin, cos, sqrt, atan2, radians
-
-                            # Approximate radius of earth in km
-                            R = 6373.0
-
-                            lat1 = radians(ride.get("lat"))
-                            lon1 = radians(ride.get("lon"))
-                            lat2 = radians(next_ride.get("lat"))
-                            lon2 = radians(next_ride.get("lon"))
-
-                            dlon = lon2 - lon1
-                            dlat = lat2 - lat1
-
-                            a = (
-                                sin(dlat / 2) ** 2
-                                + cos(lat1) * cos(lat2) * sin(dlon / 2) ** 2
-                            )
-                            c = 2 * atan2(sqrt(a), sqrt(1 - a))
-
-                            walking_distance = R * c
-                            # Assume average walking speed of 5 km/h or 0.083 km/min
-                            walking_time = walking_distance / 0.083
+                    arrival_time_str = step["arrival_time"].strftime("%I:%M %p")
+                    wait_end_str = step["wait_end_time"].strftime("%I:%M %p")
+                    ride_end_str = step["ride_end_time"].strftime("%I:%M %p")
 
                     # Create a styled step card
                     st.markdown(
@@ -344,53 +408,28 @@ if st.button("Optimize My Route", type="primary", use_container_width=True):
                     """,
                         unsafe_allow_html=True,
                     )
-
-                    # Update current time for next attraction
-                    current_time = calculate_time_estimate(ride_end_time, walking_time)
             else:
                 st.info("No route steps found in the optimization result.")
 
-        # with tab3:
-        #     st.subheader("Map View")
-
-        #     # Check if we have coordinates for the rides
-        #     has_coordinates = all(["lat" in ride and "lon" in ride for ride in ordered_rides])
-
-        #     if has_coordinates and ordered_rides:
-        #         # Create a map with the optimized route
-        #         map_data = []
-
-        #         # Add starting point
-        #         map_data.append({
-        #             "lat": st.session_state.latitude,
-        #             "lon": st.session_state.longitude,
-        #             "name": "Your Location (Start)"
-        #         })
-
-        #         # Add each ride location
-        #         for i, ride in enumerate(ordered_rides):
-        #             map_data.append({
-        #                 "lat": ride.get("lat"),
-        #                 "lon": ride.get("lon"),
-        #                 "name": f"{i+1}. {ride.get('name', 'Unknown Ride')}"
-        #             })
-
-        #         # Convert to DataFrame for map
-        #         map_df = pd.DataFrame(map_data)
-
-        #         # Display the map with the route
-        #         st.map(map_df, latitude="lat", longitude="lon")
-
-        #         # Display the route order as a table
-        #         route_order_df = pd.DataFrame({
-        #             "Order": ["Start"] + [f"Stop {i+1}" for i in range(len(ordered_rides))],
-        #             "Location": [map_data[0]["name"]] + [point["name"] for point in map_data[1:]]
-        #         })
-
-        #         st.subheader("Route Order")
-        #         st.table(route_order_df)
-        #     else:
-        #         st.warning("Map view is not available because coordinate data is missing for some attractions.")
+        with tab3:
+            st.subheader("Map View")
+
+            # Results from the remote API may not carry coordinates
+            has_coordinates = all(["lat" in ride and "lon" in ride for ride in ordered_rides])
+
+            if has_coordinates and ordered_rides:
+                # Display the map with the route
+                start = (st.session_state.latitude, st.session_state.longitude)
+                st.pydeck_chart(route_deck(ordered_rides, start), use_container_width=True)
+
+                # Display the route order as a table
+                st.subheader("Route Order")
+                st.table({
+                    "Order": ["Start"] + [f"Stop {i+1}" for i in range(len(ordered_rides))],
+                    "Location": ["Your Location (Start)"] + [ride.get("name", "Unknown Ride") for ride in ordered_rides],
+                })
+            else:
+                st.warning("Map view is not available because coordinate data is missing for some attractions.")
 
         #     # Provide option to download the itinerary
         #     st.download_button(
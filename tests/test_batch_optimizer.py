@@ -0,0 +1,24 @@
+from utils import ride_catalog
+from utils.batch_optimizer import optimize_batch
+from utils.ride_catalog import RideCatalog
+from utils.ride_table import get_ride_table
+
+
+def test_batch_on_spawned_workers(monkeypatch):
+    table = get_ride_table()
+    items = [{"rideId": ride_id, "name": name, "waitTime": 15} for ride_id, name in zip(table.ids, table.names)]
+    monkeypatch.setattr(ride_catalog, "_catalog", RideCatalog(loader=lambda: items))
+    job = {"latitude": 33.81, "longitude": -117.92, "rideIds": list(table.ids[:5])}
+    jobs = [job, dict(job, rideIds=list(table.ids[5:9])), job, {"latitude": 1}]
+
+    results = dict(optimize_batch(jobs, workers=2))
+
+    assert sorted(results) == [0, 1, 2, 3]
+    assert results[3]["status"] == "error"
+    # Duplicate plans are solved once and share the result
+    assert results[0] is results[2]
+    for index in (0, 1):
+        rides = results[index]["data"]["orderedRides"]
+        assert sorted(ride["rideId"] for ride in rides) == sorted(jobs[index]["rideIds"])
+        # Waits come from the parent's catalog snapshot
+        assert {ride["waitTime"] for ride in rides} == {15}
@@ -0,0 +1,78 @@
+import json
+import os
+
+import numpy as np
+
+from benchmarks.synthetic_park import generate_park
+from utils import catalog_compiler
+from utils.catalog_compiler import compile_catalog, load_compiled, load_or_compile
+from utils.ride_table import RideTable, rides_version
+
+
+def write_rides(path, rides):
+    with open(path, "w") as f:
+        json.dump(rides, f)
+
+
+def assert_same_table(loaded, expected):
+    assert loaded.ids == expected.ids
+    assert loaded.names == expected.names
+    assert loaded.statuses == expected.statuses
+    assert loaded.descriptions == expected.descriptions
+    for column in ("lats", "lons", "waits", "durations"):
+        np.testing.assert_array_equal(getattr(loaded, column), getattr(expected, column))
+    np.testing.assert_array_equal(loaded.name_order(), expected.name_order())
+    assert loaded.digest() == expected.digest()
+    assert loaded.sorted_names() == expected.sorted_names()
+
+
+def test_compiled_catalog_round_trip(tmp_path):
+    source, compiled = str(tmp_path / "rides.json"), str(tmp_path / "rides.arrow")
+    rides = generate_park(40, seed=5)["rides"]
+    write_rides(source, rides)
+
+    table = compile_catalog(source, compiled)
+    assert_same_table(table, RideTable.from_records(rides))
+    assert_same_table(load_compiled(compiled, rides_version(source)), table)
+
+
+def test_missing_file_is_compiled(tmp_path):
+    source, compiled = str(tmp_path / "rides.json"), str(tmp_path / "cache" / "rides.arrow")
+    rides = generate_park(10, seed=6)["rides"]
+    write_rides(source, rides)
+
+    assert load_compiled(compiled) is None
+    assert_same_table(load_or_compile(source, compiled), RideTable.from_records(rides))
+    assert os.path.exists(compiled)
+
+
+def test_stale_file_is_recompiled(tmp_path):
+    source, compiled = str(tmp_path / "rides.json"), str(tmp_path / "rides.arrow")
+    rides = generate_park(10, seed=7)["rides"]
+    write_rides(source, rides)
+    compile_catalog(source, compiled)
+
+    # An edit to the JSON makes the compiled copy stale
+    rides[0] = dict(rides[0], name="Renamed Ride")
+    write_rides(source, rides)
+    os.utime(source, ns=(os.stat(compiled).st_mtime_ns + 10**9,) * 2)
+    assert load_compiled(compiled, rides_version(source)) is None
+
+    table = load_or_compile(source, compiled)
+    assert table.names[0] == "Renamed Ride"
+    assert load_compiled(compiled, rides_version(source)).names[0] == "Renamed Ride"
+
+
+def test_unreadable_or_unwritable_file_falls_back_to_the_json(tmp_path, monkeypatch):
+    source, compiled = str(tmp_path / "rides.json"), str(tmp_path / "rides.arrow")
+    rides = generate_park(10, seed=8)["rides"]
+    write_rides(source, rides)
+    with open(compiled, "wb") as f:
+        f.write(b"not an arrow file")
+    assert load_compiled(compiled) is None
+
+    def fail(*args, **kwargs):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(catalog_compiler, "write_compiled", fail)
+    assert_same_table(load_or_compile(source, compiled), RideTable.from_records(rides))
@@ -0,0 +1,190 @@
+"""
+Cold-start budgets for the app's entry points.
+
+Each page's module-level imports are read from its source and run in a fresh
+interpreter, followed by the work its first view does before anything is
+drawn: the Location page builds the ride map layer (plotly, and pyarrow for
+the compiled catalog) and serializes it the way st.plotly_chart does; the
+Rides page creates the boto3 client and runs the first catalog scan (served
+by benchmarks.fake_dynamodb, so no AWS account is needed). A second render
+in the same process times the cached path every later rerun takes.
+
+Streamlit itself is left out: every page pays for it and it cannot be
+deferred. A page whose imports cannot all be resolved here (the session
+helpers need Streamlit installed) is skipped rather than half measured.
+Budgets are generous enough for a slower dyno; the point is to catch a heavy
+dependency slipping back onto a page's first view.
+
+Wall-clock budgets depend on the machine, so like the benchmarks they only
+run on request:
+
+    COLD_START_BUDGETS=1 python -m pytest tests/test_cold_start.py -s
+"""
+import ast
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+budgets = pytest.mark.skipif(
+    os.environ.get("COLD_START_BUDGETS") != "1", reason="timing budgets; set COLD_START_BUDGETS=1 to run"
+)
+
+# Loaded by the Streamlit server before any page runs
+FRAMEWORK_MODULES = {"streamlit", "streamlit_js_eval"}
+
+# Cold import plus first render, in ms (on top of the framework)
+FIRST_VIEW_BUDGETS_MS = {
+    "Home.py": 50,
+    "pages/1_Location.py": 1000,
+    "pages/2_Rides.py": 600,
+    "pages/3_Optimize.py": 150,
+}
+
+# Every later rerun: the shared ride layer plus the visitor marker, serialized
+RERUN_BUDGETS_MS = {
+    "Home.py": 5,
+    "pages/1_Location.py": 30,
+    "pages/2_Rides.py": 5,
+    "pages/3_Optimize.py": 5,
+}
+RUNS = 3
+
+USER_LOC = (33.8121, -117.919)
+
+# Untimed, before the page's imports
+SETUP = {
+    "pages/2_Rides.py": """
+import json
+from benchmarks.fake_dynamodb import FakeDynamoDBClient
+from utils import config
+with open(config.RIDES_JSON_PATH) as f:
+    rides = json.load(f)
+fake_client = FakeDynamoDBClient(config.RIDE_TABLE_NAME, config.RIDE_TABLE_KEY)
+fake_client.load(
+    {"rideId": {"S": r["rideId"]}, "name": {"S": r["name"]}, "waitTime": {"N": "20"}, "status": {"S": "OPERATING"}}
+    for r in rides
+)
+""",
+}
+
+# What the page computes before it can draw, run twice
+RENDER = {
+    "pages/1_Location.py": f"""
+import plotly.io as pio
+import plotly.tools as tools
+from utils.ride_map import location_map
+from utils.spatial_index import get_ride_spatial_index
+figure = location_map({USER_LOC!r})
+# What st.plotly_chart does with the figure before sending it
+pio.to_json(tools.return_figure_from_figure_or_data(figure, validate_figure=True), validate=False)
+spatial_index, indexed_rides = get_ride_spatial_index()
+spatial_index.nearest(*{USER_LOC!r}, 5)
+""",
+    "pages/2_Rides.py": """
+from utils import dynamodb
+from utils.get_rides import get_all_ride_names_from_dynamodb
+# The real client the scan is made with, then a fake table behind it
+if dynamodb._client is None:
+    dynamodb.get_dynamodb_client()
+    dynamodb._client = fake_client
+assert get_all_ride_names_from_dynamodb()["status"] == "success"
+""",
+    "pages/3_Optimize.py": """
+from utils.wait_history import has_history
+has_history()
+""",
+}
+
+START_MARKER = "--- page imports start ---"
+
+
+def module_imports(path):
+    """Modules a script imports at module level, in source order."""
+    with open(path, "r") as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return [m for m in dict.fromkeys(modules) if m.split(".")[0] not in FRAMEWORK_MODULES]
+
+
+def parse_importtime(stderr):
+    """Self and cumulative ms per module from -X importtime output."""
+    modules = {}
+    # Skip what the interpreter and the setup imported
+    for line in stderr.split(START_MARKER, 1)[-1].splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = {"self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000}
+    return modules
+
+
+def measure(entry):
+    """Times one cold start of an entry point in a fresh interpreter."""
+    imports = "\n".join(
+        f"try:\n    import {m}\nexcept ImportError:\n    missing.append({m!r})"
+        for m in module_imports(os.path.join(ROOT, entry))
+    )
+    code = "\n".join([
+        "import json, sys, time",
+        f"sys.path.insert(0, {ROOT!r})",
+        SETUP.get(entry, ""),
+        "missing = []",
+        f"sys.stderr.write({START_MARKER!r} + '\\n')",
+        "sys.stderr.flush()",
+        "began = time.perf_counter()",
+        imports,
+        "imported = time.perf_counter()",
+        f"render = compile({RENDER.get(entry, '')!r}, 'render', 'exec')",
+        "exec(render)",
+        "rendered = time.perf_counter()",
+        "exec(render)",
+        "rerendered = time.perf_counter()",
+        "print(json.dumps({'import_ms': (imported - began) * 1000, 'render_ms': (rendered - imported) * 1000,"
+        " 'rerun_ms': (rerendered - rendered) * 1000, 'missing': missing}))",
+    ])
+    # Run from outside the repo so nothing local shadows the imports
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, check=True, cwd=os.path.dirname(ROOT),
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["first_view_ms"] = timings["import_ms"] + timings["render_ms"]
+    timings["modules"] = parse_importtime(result.stderr)
+    return timings
+
+
+def slowest(modules, top=12):
+    ranked = sorted(modules.items(), key=lambda kv: kv[1]["cumulative_ms"], reverse=True)[:top]
+    return "\n".join(f"  {name:40s} {t['self_ms']:>7.1f}ms {t['cumulative_ms']:>9.1f}ms" for name, t in ranked)
+
+
+@budgets
+@pytest.mark.parametrize("entry", sorted(FIRST_VIEW_BUDGETS_MS))
+def test_first_view_within_budget(entry):
+    runs = [measure(entry)]
+    if runs[0]["missing"]:
+        pytest.skip(f"{entry} imports {', '.join(runs[0]['missing'])}, which cannot be imported here")
+    # Best of a few runs: noise only ever makes a start slower
+    runs += [measure(entry) for _ in range(RUNS - 1)]
+    best = min(runs, key=lambda t: t["first_view_ms"])
+    rerun_ms = min(t["rerun_ms"] for t in runs)
+    print(f"{entry}: imports {best['import_ms']:.0f} ms + first render {best['render_ms']:.0f} ms, "
+          f"rerun {rerun_ms:.1f} ms")
+
+    assert best["first_view_ms"] <= FIRST_VIEW_BUDGETS_MS[entry], (
+        f"{entry} first view took {best['first_view_ms']:.0f} ms "
+        f"(budget {FIRST_VIEW_BUDGETS_MS[entry]} ms); slowest imports:\n{slowest(best['modules'])}"
+    )
+    assert rerun_ms <= RERUN_BUDGETS_MS[entry], (
+        f"{entry} rerun took {rerun_ms:.1f} ms (budget {RERUN_BUDGETS_MS[entry]} ms)"
+    )
@@ -0,0 +1,69 @@
+import itertools
+import random
+
+import pytest
+
+from utils import config, held_karp, local_optimizer
+from utils.held_karp import exact_solver_fits, held_karp_open_path, memory_needed
+from utils.local_optimizer import path_cost, solve_open_path
+
+
+def random_cost(rng, points, symmetric=True):
+    coords = [(rng.uniform(0, 10), rng.uniform(0, 10)) for _ in range(points)]
+    cost = [[((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5 for bx, by in coords] for ax, ay in coords]
+    if not symmetric:
+        cost = [[c * rng.uniform(0.5, 1.5) for c in row] for row in cost]
+    return cost
+
+
+def brute_force_cost(cost, start):
+    others = [k for k in range(len(cost)) if k != start]
+    return min(path_cost(cost, [start] + list(order)) for order in itertools.permutations(others))
+
+
+@pytest.mark.parametrize("rides", [1, 2, 5, 6, 7, 8])
+@pytest.mark.parametrize("symmetric", [True, False])
+def test_matches_brute_force(rides, symmetric):
+    rng = random.Random(rides * 2 + symmetric)
+    for _ in range(5):
+        cost = random_cost(rng, rides + 1, symmetric)
+        start = rng.randrange(rides + 1)
+        tour = held_karp_open_path(cost, start)
+        assert tour[0] == start
+        assert sorted(tour) == list(range(rides + 1))
+        assert path_cost(cost, tour) == pytest.approx(brute_force_cost(cost, start))
+
+
+def test_memory_guard(monkeypatch):
+    monkeypatch.setattr(config, "EXACT_SOLVER_MAX_RIDES", 20)
+    monkeypatch.setattr(config, "EXACT_SOLVER_MAX_BYTES", memory_needed(10))
+    assert exact_solver_fits(10)
+    assert not exact_solver_fits(11)
+    assert not exact_solver_fits(0)
+
+
+def test_ride_limit(monkeypatch):
+    monkeypatch.setattr(config, "EXACT_SOLVER_MAX_RIDES", 6)
+    assert exact_solver_fits(6)
+    assert not exact_solver_fits(7)
+
+
+def test_time_limit_gives_up():
+    cost = random_cost(random.Random(1), 9)
+    assert held_karp_open_path(cost, time_limit=-1) is None
+
+
+def test_solver_falls_back_to_the_heuristic_on_time_limit(monkeypatch):
+    monkeypatch.setattr(config, "EXACT_SOLVER_TIME_LIMIT_SECONDS", -1)
+    calls = []
+
+    def timed_out(cost, start=0, time_limit=None):
+        calls.append(time_limit)
+        return held_karp.held_karp_open_path(cost, start, time_limit)
+
+    monkeypatch.setattr(local_optimizer, "held_karp_open_path", timed_out)
+    cost = random_cost(random.Random(2), 9)
+    tour = solve_open_path(cost)
+    assert calls == [-1]
+    # The heuristic's tour still visits every point once
+    assert tour[0] == 0 and sorted(tour) == list(range(9))
@@ -0,0 +1,123 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from utils import config, http_client
+from utils.http_client import CircuitOpenError, RetryableHTTPError, post_json
+
+
+class StubServer:
+    """
+    Local HTTP server answering POSTs from a script of (status, delay) steps;
+    the last step repeats once the script runs out.
+    """
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, delay = stub.script[min(stub.calls, len(stub.script) - 1)]
+                stub.calls += 1
+                time.sleep(delay)
+                body = json.dumps({"status": "success" if status < 400 else "error"}).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up on a slow response
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/Optimize-Routes"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    # Fresh breakers per test, with a short reset so half-open can be reached
+    monkeypatch.setattr(http_client, "_breakers", {})
+    monkeypatch.setattr(config, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(config, "CIRCUIT_RESET_SECONDS", 0.3)
+    servers = []
+
+    def start(script):
+        server = StubServer(script)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def test_transient_502_is_retried(stub):
+    server = stub([(502, 0), (200, 0)])
+    response = post_json(server.url, {"rideIds": []}, deadline=5, max_attempts=3)
+    assert response.status_code == 200
+    assert server.calls == 2
+    assert http_client.get_breaker(server.url).state == "closed"
+
+
+def test_slow_response_is_cut_off_at_the_deadline(stub):
+    server = stub([(200, 3)])
+    began = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        post_json(server.url, {}, deadline=0.5, max_attempts=3)
+    assert time.monotonic() - began < 1.5
+
+
+def test_client_errors_are_not_retried(stub):
+    server = stub([(400, 0), (200, 0)])
+    assert post_json(server.url, {}, deadline=5, max_attempts=3).status_code == 400
+    assert server.calls == 1
+
+
+def test_circuit_opens_after_threshold_then_half_opens(stub):
+    server = stub([(500, 0), (500, 0), (200, 0)])
+    breaker = http_client.get_breaker(server.url)
+    for _ in range(2):
+        with pytest.raises(RetryableHTTPError):
+            post_json(server.url, {}, deadline=5, max_attempts=1)
+    assert breaker.state == "open"
+
+    # Open: fails fast without reaching the server
+    with pytest.raises(CircuitOpenError):
+        post_json(server.url, {}, deadline=5, max_attempts=1)
+    assert server.calls == 2
+
+    # After the reset period one probe goes through and closes the circuit
+    time.sleep(0.35)
+    assert breaker.state == "half-open"
+    assert post_json(server.url, {}, deadline=5, max_attempts=1).status_code == 200
+    assert breaker.state == "closed"
+    assert server.calls == 3
+
+
+def test_failed_probe_reopens_the_circuit(stub):
+    server = stub([(500, 0)])
+    breaker = http_client.get_breaker(server.url)
+    for _ in range(2):
+        with pytest.raises(RetryableHTTPError):
+            post_json(server.url, {}, deadline=5, max_attempts=1)
+    time.sleep(0.35)
+    with pytest.raises(RetryableHTTPError):
+        post_json(server.url, {}, deadline=5, max_attempts=1)
+    assert breaker.state == "open"
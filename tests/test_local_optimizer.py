@@ -0,0 +1,37 @@
+import numpy as np
+
+from utils import ride_catalog
+from utils.local_optimizer import route_result
+from utils.ride_catalog import RideCatalog
+from utils.ride_table import RideTable
+
+
+def make_table(n):
+    ids = [f"r{i}" for i in range(n)]
+    return RideTable(ids, [f"Ride {i}" for i in range(n)], lats=np.zeros(n), lons=np.zeros(n))
+
+
+def test_route_result_reads_the_catalog_once_when_it_is_down(monkeypatch):
+    calls = []
+
+    def failing_scan():
+        calls.append(1)
+        raise ConnectionError("scan failed")
+
+    monkeypatch.setattr(ride_catalog, "_catalog", RideCatalog(loader=failing_scan, retry_seconds=0))
+    n = 15
+    table = make_table(n)
+    cost = [[1.0] * (n + 1) for _ in range(n + 1)]
+    result = route_result(table, list(range(n)), cost, list(range(n + 1)))
+
+    assert len(calls) == 1
+    rides = result["data"]["orderedRides"]
+    assert [ride["waitTime"] for ride in rides] == [0] * n
+
+
+def test_route_result_uses_given_waits():
+    table = make_table(3)
+    cost = [[2.0] * 4 for _ in range(4)]
+    result = route_result(table, [0, 1, 2], cost, [0, 2, 1, 3], waits={"r1": 30, "r0": 5})
+    assert [ride["rideId"] for ride in result["data"]["orderedRides"]] == ["r1", "r0", "r2"]
+    assert [ride["waitTime"] for ride in result["data"]["orderedRides"]] == [30, 5, 0]
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+from tornado.testing import AsyncHTTPTestCase
+
+from utils import ride_catalog
+from utils.optimize_service import OptimizeService, make_app
+from utils.ride_catalog import RideCatalog
+from utils.ride_table import get_ride_table
+
+
+def test_workers_plan_on_the_parents_waits(monkeypatch):
+    table = get_ride_table()
+    ride_ids = list(table.ids[:4])
+    items = [{"rideId": ride_id, "name": f"Ride {i}", "waitTime": 10 + i} for i, ride_id in enumerate(ride_ids)]
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return items
+
+    monkeypatch.setattr(ride_catalog, "_catalog", RideCatalog(loader=loader))
+    service = OptimizeService(workers=1)
+    try:
+        result = asyncio.run(service.solve({"latitude": 33.81, "longitude": -117.92, "rideIds": ride_ids}))
+        assert result["status"] == "success"
+        assert {ride["rideId"]: ride["waitTime"] for ride in result["data"]["orderedRides"]} == {
+            item["rideId"]: item["waitTime"] for item in items
+        }
+
+        # New waits reach the workers through the parent's catalog
+        items[0] = dict(items[0], waitTime=75)
+        ride_catalog.get_catalog().bump_version()
+        result = asyncio.run(service.solve({"latitude": 33.81, "longitude": -117.92, "rideIds": ride_ids}))
+        assert {ride["rideId"]: ride["waitTime"] for ride in result["data"]["orderedRides"]}[ride_ids[0]] == 75
+        assert len(loads) == 2
+    finally:
+        service.shutdown()
+
+
+class HandlerTest(AsyncHTTPTestCase):
+    def setUp(self):
+        table = get_ride_table()
+        self.ride_ids = list(table.ids[:4])
+        items = [{"rideId": ride_id, "name": f"Ride {i}", "waitTime": 20} for i, ride_id in enumerate(self.ride_ids)]
+        self.saved_catalog = ride_catalog._catalog
+        ride_catalog._catalog = RideCatalog(loader=lambda: items)
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        self.service.shutdown()
+        ride_catalog._catalog = self.saved_catalog
+
+    def get_app(self):
+        self.service = OptimizeService(workers=1, max_queue=2)
+        return make_app(self.service)
+
+    def post_json(self, path, body):
+        return self.fetch(path, method="POST", body=json.dumps(body))
+
+    def test_full_queue_is_turned_away(self):
+        self.service.in_flight = self.service.max_queue
+        response = self.post_json("/optimize", {"latitude": 33.81, "longitude": -117.92, "rideIds": self.ride_ids})
+        assert response.code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert self.service.rejected == 1
+
+        # A free slot admits the next request
+        self.service.in_flight = 0
+        response = self.post_json("/optimize", {"latitude": 33.81, "longitude": -117.92, "rideIds": self.ride_ids})
+        assert response.code == 200
+        assert len(json.loads(response.body)["orderedRides"]) == len(self.ride_ids)
+        assert self.service.in_flight == 0
+
+    def test_invalid_body_is_rejected(self):
+        response = self.post_json("/optimize", {"latitude": 33.81, "rideIds": self.ride_ids})
+        assert response.code == 400
+        assert self.service.requests == 0
+
+    def test_batch_streams_one_line_per_job(self):
+        job = {"latitude": 33.81, "longitude": -117.92, "rideIds": self.ride_ids}
+        jobs = [job, dict(job, rideIds=self.ride_ids[:2]), job]
+        response = self.post_json("/batch", jobs)
+        assert response.code == 200
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+
+        lines = {line["index"]: line for line in map(json.loads, response.body.decode().splitlines())}
+        assert sorted(lines) == [0, 1, 2]
+        for index, line in lines.items():
+            assert line["status"] == "success"
+            assert len(line["data"]["orderedRides"]) == len(jobs[index]["rideIds"])
+        # Duplicate jobs are solved once
+        assert self.service.requests == 1
+        assert self.service.latency["solve"].count == 2
+        assert self.service.in_flight == 0
+
+    def test_batch_is_turned_away_when_full(self):
+        self.service.in_flight = self.service.max_queue
+        response = self.post_json("/batch", [{"latitude": 33.81, "longitude": -117.92, "rideIds": self.ride_ids}])
+        assert response.code == 503
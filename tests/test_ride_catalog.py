@@ -0,0 +1,67 @@
+import pytest
+
+from utils.ride_catalog import RideCatalog
+
+ITEMS = [
+    {"rideId": "r1", "name": "Space Mountain", "waitTime": 45, "status": "OPERATING"},
+    {"id": "r2", "rideName": "Haunted Mansion", "waitTime": 20},
+]
+
+
+class FlakyLoader:
+    """Fails the first `failures` calls, then returns ITEMS."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("scan failed")
+        return ITEMS
+
+
+def test_lookups_after_load():
+    catalog = RideCatalog(loader=lambda: ITEMS)
+    assert catalog.id_for_name("Haunted Mansion") == "r2"
+    assert catalog.wait_time("r1") == 45
+    assert catalog.wait_time("missing") == 0
+
+
+def test_failed_first_load_is_not_retried_within_backoff():
+    loader = FlakyLoader(failures=1)
+    catalog = RideCatalog(loader=loader, retry_seconds=60)
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            catalog.table()
+    assert loader.calls == 1
+
+
+def test_failed_first_load_is_retried_after_backoff():
+    loader = FlakyLoader(failures=1)
+    catalog = RideCatalog(loader=loader, retry_seconds=0)
+    with pytest.raises(ConnectionError):
+        catalog.table()
+    assert len(catalog.table()) == 2
+    assert loader.calls == 2
+
+
+def test_failed_reload_keeps_serving_previous_table():
+    loader = FlakyLoader(failures=0)
+    catalog = RideCatalog(loader=loader, retry_seconds=60)
+    catalog.table()
+    loader.failures = 2
+    catalog.bump_version()
+    assert catalog.id_for_name("Space Mountain") == "r1"
+    assert loader.calls == 2
+
+
+def test_get_all_rides_skips_unnamed_rides(monkeypatch):
+    from utils import data_loader, ride_catalog
+
+    catalog = RideCatalog(loader=lambda: ITEMS + [{"rideId": "r3", "waitTime": 5}])
+    monkeypatch.setattr(ride_catalog, "_catalog", catalog)
+    result = data_loader.get_all_rides()
+    assert result["rides"] == ["Space Mountain", "Haunted Mansion"]
+    assert result["count"] == 2
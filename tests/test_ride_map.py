@@ -0,0 +1,36 @@
+import copy
+
+import numpy as np
+import plotly.io as pio
+
+from utils.ride_map import get_base_figure, location_map
+
+USER_LOC = (33.8121, -117.919)
+
+
+def test_location_map_leaves_the_shared_layer_unchanged():
+    base = get_base_figure()
+    before = copy.deepcopy(base)
+
+    figure = location_map(USER_LOC)
+    assert [trace.type for trace in figure.data] == ["scattermapbox", "scattermapbox"]
+    assert figure.layout.mapbox.center.lat == USER_LOC[0]
+    # The default template is applied to the figure, not stored in the layer
+    assert figure.layout.template.data is not None
+
+    # Changing the visitor's figure must not reach the shared layer
+    figure.data[0].marker.color = "green"
+    figure.data[0].hovertext = ["changed"] * len(figure.data[0].hovertext)
+    figure.layout.mapbox.zoom = 3
+    figure.layout.shapes[0].line.color = "white"
+    location_map()
+
+    assert get_base_figure() is base
+    assert pio.to_json(base, validate=False) == pio.to_json(before, validate=False)
+    assert not np.shares_memory(figure.data[0].lat, base["data"][0]["lat"])
+
+
+def test_location_map_without_a_visitor():
+    figure = location_map()
+    assert len(figure.data) == 1
+    assert figure.layout.mapbox.center.lat == get_base_figure()["layout"]["mapbox"]["center"]["lat"]
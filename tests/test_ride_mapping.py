@@ -0,0 +1,65 @@
+from benchmarks.fake_dynamodb import FakeDynamoDBClient
+from utils import config, dynamodb, ride_catalog, route_cache
+from utils.dynamodb import serialize_item
+from utils.ride_catalog import RideCatalog
+from utils.ride_mapping import get_ride_ids_from_names
+from utils.ride_table import get_ride_table
+from utils.route_cache import RouteCache
+from utils.route_optimizer import optimize_routes
+
+
+def make_client(rides, unprocessed_every=0):
+    client = FakeDynamoDBClient(config.RIDE_TABLE_NAME, config.RIDE_TABLE_KEY, unprocessed_every=unprocessed_every)
+    client.load(serialize_item({"rideId": ride_id, "name": name, "waitTime": wait, "status": "OPERATING"})
+                for ride_id, name, wait in rides)
+    return client
+
+
+def stale_catalog(monkeypatch):
+    """Installs a catalog that has never loaded; returns its list of loader calls."""
+    calls = []
+
+    def loader():
+        calls.append(1)
+        raise AssertionError("the catalog should not be scanned")
+
+    monkeypatch.setattr(ride_catalog, "_catalog", RideCatalog(loader=loader))
+    return calls
+
+
+def test_unprocessed_keys_are_retried(monkeypatch):
+    monkeypatch.setattr(dynamodb.time, "sleep", lambda seconds: None)
+    scans = stale_catalog(monkeypatch)
+    table = get_ride_table()
+    rides = [(table.ids[row], table.names[row], 10 * (row + 1)) for row in range(5)]
+    # Every second key of each request comes back unprocessed: 5 keys, then 2, then 1
+    client = make_client(rides, unprocessed_every=2)
+
+    result = get_ride_ids_from_names([name for _, name, _ in rides], client=client)
+
+    assert result["status"] == "success"
+    assert client.calls == {"batch_get_item": 3}
+    assert result["ride_ids"] == [ride_id for ride_id, _, _ in rides]
+    assert result["missing_rides"] == []
+    assert result["wait_times"] == {ride_id: wait for ride_id, _, wait in rides}
+    assert not scans
+
+
+def test_optimize_reuses_batch_get_waits(monkeypatch):
+    monkeypatch.setattr(route_cache, "_cache", RouteCache())
+    monkeypatch.setattr(config, "OPTIMIZER_BACKEND", "local")
+    scans = stale_catalog(monkeypatch)
+    table = get_ride_table()
+    rides = [(table.ids[row], table.names[row], 5 * row) for row in range(4)]
+    client = make_client(rides)
+
+    ids = get_ride_ids_from_names([name for _, name, _ in rides], client=client)
+    result = optimize_routes(33.81, -117.92, ids["ride_ids"], wait_times=ids["wait_times"])
+    assert result["status"] == "success"
+    assert {ride["rideId"]: ride["waitTime"] for ride in result["data"]["orderedRides"]} == ids["wait_times"]
+
+    # Same waits hit the cache; a changed wait is a different key
+    assert optimize_routes(33.81, -117.92, ids["ride_ids"], wait_times=ids["wait_times"]) is result
+    changed = dict(ids["wait_times"], **{rides[0][0]: 90})
+    assert optimize_routes(33.81, -117.92, ids["ride_ids"], wait_times=changed) is not result
+    assert not scans
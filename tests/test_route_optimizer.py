@@ -0,0 +1,56 @@
+from utils import config, ride_catalog, route_cache, route_optimizer
+from utils.ride_catalog import RideCatalog
+from utils.ride_table import get_ride_table
+from utils.route_cache import RouteCache
+from utils.route_optimizer import optimize_routes
+
+
+def test_cache_entries_follow_the_waits_the_solve_used(monkeypatch):
+    monkeypatch.setattr(route_cache, "_cache", RouteCache())
+    monkeypatch.setattr(config, "OPTIMIZER_BACKEND", "local")
+    table = get_ride_table()
+    ride_ids = list(table.ids[:3])
+    items = [{"rideId": ride_id, "name": f"Ride {i}", "waitTime": 10} for i, ride_id in enumerate(ride_ids)]
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return items
+
+    catalog = RideCatalog(loader=loader)
+    monkeypatch.setattr(ride_catalog, "_catalog", catalog)
+
+    first = optimize_routes(33.81, -117.92, ride_ids)
+    assert first["status"] == "success"
+    # Within the TTL a hit costs no reload
+    assert optimize_routes(33.81, -117.92, ride_ids) is first
+    assert len(calls) == 1
+
+    # Past the TTL the hit reloads; unchanged waits still hit
+    catalog.bump_version()
+    assert optimize_routes(33.81, -117.92, ride_ids) is first
+    assert len(calls) == 2
+
+    # Changed waits miss, and the new route is stored under the waits it was planned on
+    items[0] = dict(items[0], waitTime=60)
+    catalog.bump_version()
+    second = optimize_routes(33.81, -117.92, ride_ids)
+    assert second is not first
+    assert {ride["rideId"]: ride["waitTime"] for ride in second["data"]["orderedRides"]}[ride_ids[0]] == 60
+    assert optimize_routes(33.81, -117.92, ride_ids) is second
+    assert len(calls) == 3
+    assert route_cache.get_route_cache().stats()["hits"] == 3
+
+
+def test_remote_backend_is_used_for_small_selections(monkeypatch):
+    monkeypatch.setattr(route_cache, "_cache", RouteCache())
+    monkeypatch.setattr(config, "OPTIMIZER_BACKEND", "remote")
+    calls = []
+
+    def remote(latitude, longitude, ride_ids, progress_callback=None):
+        calls.append(ride_ids)
+        return {"status": "success", "data": {"orderedRides": [], "totalTimeMinutes": 0}}
+
+    monkeypatch.setattr(route_optimizer, "optimize_routes_remote", remote)
+    optimize_routes(33.81, -117.92, ["r1", "r2"], wait_times={"r1": 5, "r2": 10})
+    assert calls == [["r1", "r2"]]
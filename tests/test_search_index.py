@@ -0,0 +1,62 @@
+from utils.search_index import RideSearchIndex, get_search_index
+
+NAMES = [f"Space Ride {i}" for i in range(60)] + ["Haunted Mansion"]
+
+
+def test_total_counts_matches_past_the_limit():
+    index = RideSearchIndex(NAMES)
+    names, total = index.search_with_total("space", k=50)
+    assert len(names) == 50
+    assert total == 60
+    assert index.search_with_total("mansion", k=50) == (["Haunted Mansion"], 1)
+    assert index.search_with_total("", k=50) == ([], 0)
+
+
+def test_index_is_rebuilt_when_names_change_but_not_their_count():
+    first = get_search_index(tuple(NAMES))
+    assert get_search_index(tuple(NAMES)) is first
+
+    renamed = NAMES[:-1] + ["Matterhorn Bobsleds"]
+    second = get_search_index(tuple(renamed))
+    assert second is not first
+    assert second.search("matterhorn") == ["Matterhorn Bobsleds"]
+
+
+def test_index_is_reused_for_the_same_names_object():
+    names = tuple(NAMES)
+    first = get_search_index(names)
+    assert get_search_index(names) is first
+    # An equal tuple from a catalog reload keeps the index
+    assert get_search_index(tuple(NAMES)) is first
+
+
+RANKED = ["Haunted Mansion", "Mansion Tour", "Big Mansion Ride", "Germany Pavilion", "Matterhorn Bobsleds"]
+
+
+def test_ranking_prefers_whole_name_then_word_then_substring():
+    index = RideSearchIndex(RANKED)
+    # Whole-name prefix, then word prefixes (shorter name first), then a plain substring
+    assert index.search("man") == ["Mansion Tour", "Haunted Mansion", "Big Mansion Ride", "Germany Pavilion"]
+
+
+def test_substring_inside_a_word():
+    index = RideSearchIndex(RANKED)
+    # Equal scores: shorter names first, then alphabetical
+    assert index.search("ion") == ["Mansion Tour", "Haunted Mansion", "Big Mansion Ride", "Germany Pavilion"]
+    assert index.search("ansio") == ["Mansion Tour", "Haunted Mansion", "Big Mansion Ride"]
+
+
+def test_typos_match_by_trigrams():
+    index = RideSearchIndex(RANKED)
+    assert index.search("hanted mansoin")[0] == "Haunted Mansion"
+    assert index.search("matterhron") == ["Matterhorn Bobsleds"]
+
+
+def test_descriptions_match_only_longer_queries():
+    descriptions = {name: "A thrilling adventure through dark tunnels" for name in RANKED}
+    index = RideSearchIndex(RANKED, descriptions)
+    # One or two letters would share a trigram with every description
+    assert index.search("z") == []
+    assert index.search("tu") == []
+    assert index.search("tunnels") == index.search("adventure") != []
+    assert sorted(index.search("dark tunnels")) == sorted(RANKED)
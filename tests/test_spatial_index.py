@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from utils.distance_matrix import haversine_km
+from utils.spatial_index import BRUTE_FORCE_MAX_POINTS, SpatialIndex
+
+N = 3 * BRUTE_FORCE_MAX_POINTS // 2
+
+
+def park_points(rng):
+    """Points scattered over a few km around the park, clumped like rides and shops."""
+    centers = rng.uniform([33.80, -117.93], [33.82, -117.91], size=(40, 2))
+    points = centers[rng.integers(len(centers), size=N)] + rng.normal(0, 0.001, size=(N, 2))
+    return points[:, 0], points[:, 1]
+
+
+def polar_points(rng):
+    """Points within a degree of either pole, at every longitude."""
+    lats = rng.uniform(89, 90, size=N) * rng.choice([-1, 1], size=N)
+    return lats, rng.uniform(-180, 180, size=N)
+
+
+def global_points(rng):
+    """Points anywhere, uniform over the sphere, including both sides of the antimeridian."""
+    return np.degrees(np.arcsin(rng.uniform(-1, 1, size=N))), rng.uniform(-180, 180, size=N)
+
+
+# (points, cell size in degrees, queries to make, radii in km)
+CASES = {
+    "park": (park_points, 0.002, lambda rng: park_points(rng), (0.05, 0.3, 1.0)),
+    "poles": (polar_points, 0.1, lambda rng: polar_points(rng), (5.0, 30.0, 150.0)),
+    "global": (global_points, 1.0, lambda rng: global_points(rng), (50.0, 500.0, 3000.0)),
+}
+
+
+def brute_force(lats, lons, lat, lon):
+    distances = haversine_km(lat, lon, lats, lons)
+    return np.argsort(distances, kind="stable"), distances
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_nearest_matches_brute_force(case):
+    points, cell, queries, _ = CASES[case]
+    rng = np.random.default_rng(13)
+    lats, lons = points(rng)
+    index = SpatialIndex(lats, lons, cell_degrees=cell)
+    assert len(index) > BRUTE_FORCE_MAX_POINTS
+
+    query_lats, query_lons = queries(rng)
+    for lat, lon in list(zip(query_lats, query_lons))[:50]:
+        order, distances = brute_force(lats, lons, lat, lon)
+        for k in (1, 5, 40):
+            found, found_distances = index.nearest(lat, lon, k)
+            assert found_distances == pytest.approx(distances[order[:k]], abs=1e-9)
+            assert haversine_km(lat, lon, lats[found], lons[found]) == pytest.approx(found_distances, abs=1e-9)
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_within_radius_matches_brute_force(case):
+    points, cell, queries, radii = CASES[case]
+    rng = np.random.default_rng(31)
+    lats, lons = points(rng)
+    index = SpatialIndex(lats, lons, cell_degrees=cell)
+
+    query_lats, query_lons = queries(rng)
+    for lat, lon in list(zip(query_lats, query_lons))[:50]:
+        _, distances = brute_force(lats, lons, lat, lon)
+        for radius in radii:
+            found, found_distances = index.within_radius(lat, lon, radius)
+            assert sorted(found.tolist()) == np.flatnonzero(distances <= radius).tolist()
+            assert np.all(np.diff(found_distances) >= 0)
+            assert found_distances == pytest.approx(distances[found], abs=1e-9)
+
+
+def test_query_at_the_pole():
+    rng = np.random.default_rng(7)
+    lats, lons = polar_points(rng)
+    index = SpatialIndex(lats, lons, cell_degrees=0.1)
+    for lat in (90.0, -90.0):
+        _, distances = brute_force(lats, lons, lat, 0.0)
+        found, found_distances = index.nearest(lat, 0.0, 10)
+        assert found_distances == pytest.approx(np.sort(distances)[:10], abs=1e-9)
+        found, _ = index.within_radius(lat, 0.0, 20.0)
+        assert sorted(found.tolist()) == np.flatnonzero(distances <= 20.0).tolist()
@@ -0,0 +1,57 @@
+import random
+import time
+
+import pytest
+
+from utils.time_dependent import WaitModel, earliest_finish_tour, improve, simulate, solve_time_dependent
+
+
+def random_instance(n, seed):
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(n + 1)]
+    cost = [[abs(ax - bx) * 40 + abs(ay - by) * 40 for bx, by in points] for ax, ay in points]
+    # Waits that swing through the day, so reordering pays off
+    profiles = [None] + [[rng.choice([0, 5, 30, 90]) for _ in range(96)] for _ in range(n)]
+    return cost, WaitModel(profiles, bucket_minutes=15, ride_duration=5)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_improve_returns_a_permutation_of_the_rides(seed):
+    n = 12
+    cost, model = random_instance(n, seed)
+    start_clock = 9 * 60
+    tour = earliest_finish_tour(cost, model, start_clock)
+    before = simulate(cost, model, tour, start_clock)
+
+    result = improve(cost, model, list(tour), start_clock, time.perf_counter() + 10)
+
+    assert result[0] == 0
+    assert sorted(result) == list(range(n + 1))
+    assert simulate(cost, model, result, start_clock) <= before + 1e-9
+
+
+def test_solve_time_dependent_visits_every_ride_once():
+    cost, model = random_instance(20, seed=7)
+    tour = solve_time_dependent(cost, model, 10 * 60, time_limit=0.5)
+    assert sorted(tour) == list(range(21))
+
+
+def test_clock_minutes_uses_the_park_time_zone(monkeypatch):
+    from datetime import datetime, timezone
+
+    from utils import config
+    from utils.time_dependent import clock_minutes
+
+    monkeypatch.setattr(config, "PARK_TIMEZONE", "America/Los_Angeles")
+    # 17:30 UTC on a summer day is 10:30 in Anaheim
+    assert clock_minutes(datetime(2026, 7, 1, 17, 30, tzinfo=timezone.utc)) == 10 * 60 + 30
+    # Naive times are already park time
+    assert clock_minutes(datetime(2026, 7, 1, 10, 30)) == 10 * 60 + 30
+
+
+def test_park_now_is_in_the_park_time_zone(monkeypatch):
+    from utils import config
+    from utils.time_dependent import park_now
+
+    monkeypatch.setattr(config, "PARK_TIMEZONE", "America/Los_Angeles")
+    assert park_now().tzinfo.key == "America/Los_Angeles"
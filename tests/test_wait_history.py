@@ -0,0 +1,98 @@
+import os
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from utils import config
+from utils.wait_history import (
+    append_snapshot, build_wait_profiles, compact_day, has_history, history_version, read_wait_history,
+)
+
+PARK = ZoneInfo(config.PARK_TIMEZONE)
+DAY = datetime(2026, 7, 4, 9, 0, tzinfo=PARK)
+
+
+def waits(*pairs):
+    return [{"rideId": ride_id, "waitTime": wait, "status": "OPERATING"} for ride_id, wait in pairs]
+
+
+def rows(table):
+    return sorted(zip(table.column("ride_id").to_pylist(), table.column("wait_time").to_pylist()))
+
+
+def test_empty_history(tmp_path):
+    root = str(tmp_path / "history")
+    assert not has_history(root)
+    assert history_version(root) is None
+    assert read_wait_history(columns=["ride_id"], root=root).column_names == ["ride_id"]
+    assert build_wait_profiles(["r1"], end=DAY, root=root) == {}
+
+
+def test_append_and_filtered_reads(tmp_path):
+    root = str(tmp_path)
+    append_snapshot(waits(("r1", 10), ("r2", 20)), observed_at=DAY, root=root)
+    append_snapshot(waits(("r1", 30), ("r2", 40)), observed_at=DAY + timedelta(hours=2), root=root)
+    append_snapshot(waits(("r1", 50), ("r2", 60)), observed_at=DAY + timedelta(days=1), root=root)
+
+    assert rows(read_wait_history(root=root)) == [("r1", 10), ("r1", 30), ("r1", 50), ("r2", 20), ("r2", 40), ("r2", 60)]
+    assert rows(read_wait_history(["r2"], root=root)) == [("r2", 20), ("r2", 40), ("r2", 60)]
+    # start is inclusive, end exclusive
+    window = read_wait_history(start=DAY + timedelta(hours=2), end=DAY + timedelta(days=1), root=root)
+    assert rows(window) == [("r1", 30), ("r2", 40)]
+    assert read_wait_history(columns=["wait_time"], root=root).column_names == ["wait_time"]
+
+
+def test_history_version_changes_on_append(tmp_path):
+    root = str(tmp_path)
+    append_snapshot(waits(("r1", 10)), observed_at=DAY, root=root)
+    first = history_version(root)
+    assert first.startswith("date=")
+    assert history_version(root) == first
+
+    append_snapshot(waits(("r1", 20)), observed_at=DAY + timedelta(days=1), root=root)
+    assert history_version(root) != first
+
+
+def test_compact_day_merges_files(tmp_path):
+    root = str(tmp_path)
+    for hour in range(3):
+        append_snapshot(waits(("r2", hour), ("r1", 10 * hour)), observed_at=DAY + timedelta(hours=hour), root=root)
+    day = DAY.astimezone(timezone.utc).date()
+    partition = os.path.join(root, f"date={day:%Y-%m-%d}")
+    before = rows(read_wait_history(root=root))
+
+    compact_day(day, root=root)
+
+    assert os.listdir(partition) == ["000000-compacted.parquet"]
+    assert rows(read_wait_history(root=root)) == before
+    # A temp file left behind by an interrupted compaction is not read as data
+    with open(os.path.join(partition, ".compacted.parquet.tmp"), "wb") as f:
+        f.write(b"partial")
+    assert rows(read_wait_history(root=root)) == before
+
+
+def test_compact_day_leaves_a_single_file_alone(tmp_path):
+    root = str(tmp_path)
+    path = append_snapshot(waits(("r1", 10)), observed_at=DAY, root=root)
+    compact_day(date(2026, 7, 4), root=root)
+    assert os.path.exists(path)
+
+
+def test_build_wait_profiles_takes_medians_per_bucket(tmp_path):
+    root = str(tmp_path)
+    # Three days of 9:00 and 9:30 (park time) observations
+    for day in range(3):
+        morning = DAY - timedelta(days=day)
+        append_snapshot(waits(("r1", 10 + day), ("r2", 5)), observed_at=morning, root=root)
+        append_snapshot(waits(("r1", 40 + 10 * day)), observed_at=morning + timedelta(minutes=30), root=root)
+
+    profiles = build_wait_profiles(["r1"], days=7, bucket_minutes=30, end=DAY + timedelta(hours=1), root=root)
+
+    assert list(profiles) == ["r1"]
+    profile = profiles["r1"]
+    assert len(profile) == 48
+    assert profile[18] == 11  # 9:00, median of 10, 11, 12
+    assert profile[19] == 50  # 9:30, median of 40, 50, 60
+    # Buckets without observations take the ride's overall median
+    assert profile[0] == pytest.approx(30.5)
@@ -0,0 +1,70 @@
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_park import generate_park, generate_walkways
+from utils import distance_matrix
+from utils.distance_matrix import load_or_build
+from utils.ride_table import RideTable
+from utils.walkway_graph import WalkwayGraph, compile_graph, dijkstra
+
+
+@pytest.fixture(scope="module")
+def park_graph(tmp_path_factory):
+    park = generate_park(60, seed=3)
+    tmp = tmp_path_factory.mktemp("walkways")
+    with open(tmp / "walkways.json", "w") as f:
+        json.dump(generate_walkways(park, seed=3), f)
+    compile_graph(str(tmp / "walkways.json"), str(tmp / "walkways.npz"))
+    return park, WalkwayGraph(str(tmp / "walkways.npz"))
+
+
+def test_snap_finds_the_nearest_node(park_graph):
+    _, graph = park_graph
+    rng = np.random.default_rng(0)
+    lats = graph.lats.mean() + rng.normal(0, 0.002, 200)
+    lons = graph.lons.mean() + rng.normal(0, 0.002, 200)
+    nodes, snap_m = graph.snap(lats, lons)
+    for lat, lon, node, m in zip(lats, lons, nodes, snap_m):
+        km = distance_matrix.haversine_km(lat, lon, graph.lats, graph.lons)
+        assert node == km.argmin()
+        assert m == pytest.approx(km.min() * 1000)
+
+
+def test_precomputed_distances_match_a_dijkstra_per_request(park_graph):
+    park, graph = park_graph
+    lats = np.array([ride["lat"] for ride in park["rides"]])
+    lons = np.array([ride["lon"] for ride in park["rides"]])
+    to_rides = graph.walking_m_to_points(lats, lons, workers=1)
+
+    lat, lon = lats[0] + 0.0007, lons[0] - 0.0004
+    (source,), (source_m,) = graph.snap(lat, lon)
+    targets, target_m = graph.snap(lats, lons)
+    expected = (source_m + np.array(dijkstra(graph.indptr, graph.indices, graph.weights, source))[targets] + target_m) / 1000
+
+    np.testing.assert_allclose(graph.distances_from_point(lat, lon, lats, lons, to_rides), expected, rtol=1e-5)
+    np.testing.assert_allclose(graph.distances_from_point(lat, lon, lats, lons), expected, rtol=1e-5)
+
+
+def test_pairwise_on_a_spawned_pool_matches_in_process(park_graph):
+    park, graph = park_graph
+    lats = [ride["lat"] for ride in park["rides"][:12]]
+    lons = [ride["lon"] for ride in park["rides"][:12]]
+    km = graph.pairwise_km(lats, lons, workers=1)
+    np.testing.assert_allclose(graph.pairwise_km(lats, lons, workers=2), km)
+    np.testing.assert_allclose(km, km.T, rtol=1e-5)
+
+
+def test_matrix_serves_start_distances_from_the_stored_walkways(park_graph, monkeypatch, tmp_path):
+    park, graph = park_graph
+    monkeypatch.setattr(distance_matrix.config, "CACHE_DIR", str(tmp_path))
+    table = RideTable.from_records(park["rides"])
+    load_or_build(table, graph)
+
+    # A cached build is memory-mapped and never runs Dijkstra again
+    monkeypatch.setattr(graph, "walking_m_to_points", lambda *args, **kwargs: pytest.fail("recomputed walkways"))
+    matrix = load_or_build(table, graph)
+    rows = [3, 10, 25]
+    km, _ = matrix.from_point(table.lats[0], table.lons[0], rows)
+    np.testing.assert_allclose(km, matrix.data[distance_matrix.DISTANCE_KM, 0, rows], rtol=1e-5)
@@ -0,0 +1,118 @@
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils import config
+from utils.distance_matrix import get_distance_matrix
+from utils.local_optimizer import optimize_routes_local
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def job_key(job):
+    """Identical plans (same start, same set of rides) share one key."""
+    return (
+        round(float(job["latitude"]), 6),
+        round(float(job["longitude"]), 6),
+        tuple(sorted(set(job["rideIds"]))),
+    )
+
+
+def _init_worker(catalog_table):
+    """
+    Prepares a pool worker: maps the shared distance matrix file and serves
+    wait times from the parent's catalog snapshot instead of scanning DynamoDB.
+    """
+    from utils import ride_catalog
+    ride_catalog._catalog = ride_catalog.RideCatalog(loader=lambda: catalog_table)
+    get_distance_matrix()
+
+
+def _solve(job):
+    return optimize_routes_local(job["latitude"], job["longitude"], list(job["rideIds"]))
+
+
+def optimize_batch(jobs, workers=None, max_pending=None):
+    """
+    Optimizes many plans at once, yielding each result as soon as it is ready.
+
+    Identical jobs are solved once. Jobs are spread over a process pool; the
+    distance matrix is a memory-mapped file, so every worker reads the same
+    pages instead of holding its own copy. Results come back in completion
+    order, not job order.
+
+    Args:
+        jobs (list): Dicts with latitude, longitude and rideIds (the optimization API payload)
+        workers (int): Worker processes (defaults to config.BATCH_WORKERS, 0 = one per CPU)
+        max_pending (int): Most jobs in flight at once (defaults to 4 per worker)
+
+    Yields:
+        tuple: (job index, result dict in the optimize_routes shape)
+    """
+    # Group duplicate jobs so each distinct plan is solved once
+    groups = {}
+    for index, job in enumerate(jobs):
+        try:
+            key = job_key(job)
+        except (KeyError, TypeError, ValueError) as e:
+            yield index, {"status": "error", "message": f"Invalid job: {e}"}
+            continue
+        groups.setdefault(key, []).append(index)
+
+    workers = workers or config.BATCH_WORKERS or os.cpu_count() or 1
+    max_pending = max_pending or 4 * workers
+    logger.info(f"Optimizing {len(jobs)} jobs ({len(groups)} distinct) on {workers} processes")
+
+    # Build the matrix file (and take a wait snapshot) once, before any worker starts
+    get_distance_matrix()
+    from utils.ride_catalog import get_catalog
+    try:
+        catalog_table = get_catalog().table()
+    except Exception as e:
+        logger.warning(f"Could not load wait times for the batch: {e}")
+        catalog_table = []
+
+    if workers == 1:
+        for key, indices in groups.items():
+            result = _solve(jobs[indices[0]])
+            for index in indices:
+                yield index, result
+        return
+
+    pending = {}
+    queue = iter(groups.items())
+    # Spawned, not forked: the batch may run inside a threaded server process
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker, initargs=(catalog_table,),
+    ) as pool:
+        while True:
+            # Keep a bounded number of jobs in flight so huge batches stream steadily
+            for key, indices in queue:
+                pending[pool.submit(_solve, jobs[indices[0]])] = indices
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                indices = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Batch job failed: {e}")
+                    result = {"status": "error", "message": f"Error: {str(e)}"}
+                for index in indices:
+                    yield index, result
+
+
+if __name__ == "__main__":
+    # Reads one job per line (JSON) on stdin and writes one result per line as they finish
+    batch = [json.loads(line) for line in sys.stdin if line.strip()]
+    for index, result in optimize_batch(batch):
+        print(json.dumps({"index": index, **result}), flush=True)
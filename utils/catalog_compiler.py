@@ -0,0 +1,169 @@
+import json
+import logging
+import os
+import sys
+
+from utils import config
+from utils.ride_table import RideTable, rides_version
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the columns or metadata change, so old files are recompiled
+FORMAT_VERSION = "1"
+
+
+def read_source(source_path):
+    """
+    Reads a ride catalog source into a RideTable.
+
+    Accepts the rides JSON file (records with rideId, name, lat, lon and
+    description) or a rideMetaData export: a list of plain items, or the
+    {"Items": [...]} output of `aws dynamodb scan`.
+    """
+    with open(source_path, "r") as f:
+        source = json.load(f)
+    if isinstance(source, dict):
+        from utils.dynamodb import deserialize_item
+        return RideTable.from_items(deserialize_item(item) for item in source["Items"])
+    if source and "lat" in source[0]:
+        return RideTable.from_records(source)
+    return RideTable.from_items(source)
+
+
+def write_compiled(table, output_path, source_version=None):
+    """
+    Writes a RideTable as an uncompressed Arrow IPC (Feather v2) file.
+
+    Next to the columns it stores what is slow to derive at startup: the
+    rows in name order and the table digest the distance matrix is keyed on.
+    Uncompressed buffers can be memory-mapped and used without copying.
+
+    Args:
+        table (RideTable): Rides to write
+        output_path (str): Destination file
+        source_version (tuple): rides_version() of the source, to detect edits
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    compiled = pa.table(
+        {
+            "rideId": pa.array(table.ids, pa.string()),
+            "name": pa.array(table.names, pa.string()),
+            "lat": table.lats,
+            "lon": table.lons,
+            "waitTime": table.waits,
+            "duration": table.durations,
+            # A handful of distinct values, stored once each
+            "status": pa.array(table.statuses, pa.string()).dictionary_encode(),
+            "description": pa.array(table.descriptions, pa.string()),
+            "nameOrder": table.name_order(),
+        },
+        metadata={
+            "format": FORMAT_VERSION,
+            "digest": table.digest(),
+            "source_version": json.dumps(source_version),
+        },
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    # Write to a temp file first so readers never map a partial file
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    # One record batch, so every column maps as a single contiguous buffer
+    feather.write_feather(compiled, tmp_path, compression="uncompressed", chunksize=max(1, len(table)))
+    os.replace(tmp_path, output_path)
+
+
+def compile_catalog(source_path, output_path):
+    """Compiles a ride catalog source (see read_source) into the binary format."""
+    table = read_source(source_path)
+    write_compiled(table, output_path, rides_version(source_path))
+    return table
+
+
+def _column(compiled, name):
+    column = compiled.column(name)
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+def load_compiled(path, source_version=None):
+    """
+    Memory-maps a compiled catalog.
+
+    Numeric columns are read-only views of the mapped file, shared through
+    the page cache by every process that loads it; only the strings are
+    turned into Python objects.
+
+    Args:
+        path (str): Compiled catalog file
+        source_version (tuple): Expected rides_version() of the source, or None to skip the check
+
+    Returns:
+        RideTable: The catalog, or None if the file is missing, stale or unreadable
+    """
+    if not os.path.exists(path):
+        return None
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    try:
+        compiled = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"Could not read compiled catalog {path}: {e}")
+        return None
+    metadata = {key.decode(): value.decode() for key, value in (compiled.schema.metadata or {}).items()}
+    if metadata.get("format") != FORMAT_VERSION:
+        return None
+    if source_version is not None and json.loads(metadata["source_version"]) != list(source_version):
+        return None
+
+    columns = {name: _column(compiled, name) for name in compiled.column_names}
+    # Strings come out as object arrays, which is much faster than to_pylist()
+    strings = {name: columns[name].to_numpy(zero_copy_only=False) for name in ("rideId", "name", "description")}
+    statuses = columns["status"].dictionary.to_pylist()
+    return RideTable(
+        strings["rideId"],
+        strings["name"],
+        lats=columns["lat"].to_numpy(),
+        lons=columns["lon"].to_numpy(),
+        waits=columns["waitTime"].to_numpy(),
+        durations=columns["duration"].to_numpy(),
+        statuses=list(map(statuses.__getitem__, columns["status"].indices.to_numpy().tolist())),
+        descriptions=tuple(strings["description"]),
+        name_order=columns["nameOrder"].to_numpy(),
+        digest=metadata["digest"],
+    )
+
+
+def load_or_compile(source_path=None, output_path=None, source_version=None):
+    """
+    Loads the compiled copy of the rides JSON, compiling it first when it is
+    missing or older than the JSON (which stays the file to edit).
+
+    Returns:
+        RideTable: The catalog
+    """
+    source_path = source_path or config.RIDES_JSON_PATH
+    output_path = output_path or config.COMPILED_CATALOG_PATH
+    source_version = source_version or rides_version(source_path)
+    table = load_compiled(output_path, source_version)
+    if table is not None:
+        return table
+
+    logger.info(f"Compiling {source_path} -> {output_path}")
+    table = read_source(source_path)
+    try:
+        write_compiled(table, output_path, source_version)
+    except OSError as e:
+        # The JSON still works; the next process tries again
+        logger.warning(f"Could not write compiled catalog {output_path}: {e}")
+    return table
+
+
+if __name__ == "__main__":
+    # Build step: python -m utils.catalog_compiler [source.json output.arrow]
+    source = sys.argv[1] if len(sys.argv) > 1 else config.RIDES_JSON_PATH
+    output = sys.argv[2] if len(sys.argv) > 2 else config.COMPILED_CATALOG_PATH
+    table = compile_catalog(source, output)
+    print(f"Compiled {len(table)} rides: {source} -> {output}")
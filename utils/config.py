@@ -0,0 +1,122 @@
+import os
+
+# Root of the repository (one level above utils/)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# AWS settings
+AWS_REGION = os.environ.get("AWS_REGION", "us-west-2")
+RIDE_TABLE_NAME = os.environ.get("RIDE_TABLE_NAME", "rideMetaData")
+
+# How long the shared ride catalog is served before it is reloaded from DynamoDB
+RIDE_CATALOG_TTL_SECONDS = float(os.environ.get("RIDE_CATALOG_TTL_SECONDS", "600"))
+
+# After a failed first load, callers get the same error for this long before the next scan
+RIDE_CATALOG_RETRY_SECONDS = float(os.environ.get("RIDE_CATALOG_RETRY_SECONDS", "30"))
+
+# Catalog of ride coordinates and descriptions
+RIDES_JSON_PATH = os.environ.get(
+    "RIDES_JSON_PATH", os.path.join(PROJECT_ROOT, "rides_with_descriptions.json")
+)
+
+# Route optimizer: "remote" calls the API Gateway endpoint, "local" solves in-process
+OPTIMIZER_BACKEND = os.environ.get("OPTIMIZER_BACKEND", "remote")
+
+# Average time spent on a ride once through the queue (minutes)
+ESTIMATED_RIDE_DURATION_MINUTES = float(os.environ.get("ESTIMATED_RIDE_DURATION_MINUTES", "10"))
+
+# Exact (Held-Karp) solver limits; larger selections use the heuristic solver
+EXACT_SOLVER_MAX_RIDES = int(os.environ.get("EXACT_SOLVER_MAX_RIDES", "15"))
+EXACT_SOLVER_MAX_BYTES = int(os.environ.get("EXACT_SOLVER_MAX_BYTES", str(64 * 1024 * 1024)))
+EXACT_SOLVER_TIME_LIMIT_SECONDS = float(os.environ.get("EXACT_SOLVER_TIME_LIMIT_SECONDS", "1.0"))
+
+# Where derived data (distance matrices, etc.) is cached on disk
+CACHE_DIR = os.environ.get("PLANNER_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache"))
+
+# Compiled (Arrow IPC) copy of the rides JSON, memory-mapped at startup; the JSON stays the source
+COMPILED_CATALOG = os.environ.get("COMPILED_CATALOG", "1") == "1"
+COMPILED_CATALOG_PATH = os.environ.get("COMPILED_CATALOG_PATH", os.path.join(CACHE_DIR, "rides_catalog.arrow"))
+
+# Time-dependent optimizer: width of a wait profile bucket and the search budget
+WAIT_PROFILE_BUCKET_MINUTES = int(os.environ.get("WAIT_PROFILE_BUCKET_MINUTES", "15"))
+TIME_DEPENDENT_TIME_LIMIT_SECONDS = float(os.environ.get("TIME_DEPENDENT_TIME_LIMIT_SECONDS", "0.5"))
+
+# Search budget for repairing an existing route after the plan changes
+INCREMENTAL_TIME_LIMIT_SECONDS = float(os.environ.get("INCREMENTAL_TIME_LIMIT_SECONDS", "0.05"))
+
+# Append-only Parquet history of wait-time snapshots, partitioned by day
+WAIT_HISTORY_DIR = os.environ.get("WAIT_HISTORY_DIR", os.path.join(PROJECT_ROOT, "data", "wait_history"))
+
+# Park local time zone, used to turn snapshot timestamps into time of day
+PARK_TIMEZONE = os.environ.get("PARK_TIMEZONE", "America/Los_Angeles")
+
+# Remote optimization API (API Gateway, or the self-hosted utils.optimize_service)
+OPTIMIZE_API_URL = os.environ.get(
+    "OPTIMIZE_API_URL", "https://rg1uo7bmxd.execute-api.us-west-2.amazonaws.com/Optimize-Routes"
+)
+
+# HTTP client: timeouts (seconds), retries and connection pool size
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "20"))
+HTTP_DEADLINE_SECONDS = float(os.environ.get("HTTP_DEADLINE_SECONDS", "30"))
+HTTP_MAX_ATTEMPTS = int(os.environ.get("HTTP_MAX_ATTEMPTS", "3"))
+HTTP_POOL_SIZE = int(os.environ.get("HTTP_POOL_SIZE", "10"))
+
+# Circuit breaker: consecutive failures before opening, seconds before a retry probe
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+
+# Solve locally when the optimization API is unavailable
+OPTIMIZER_FALLBACK_LOCAL = os.environ.get("OPTIMIZER_FALLBACK_LOCAL", "1") == "1"
+
+# Route result cache: entries kept, entry lifetime and start-location cell size
+ROUTE_CACHE_MAX_ENTRIES = int(os.environ.get("ROUTE_CACHE_MAX_ENTRIES", "512"))
+ROUTE_CACHE_MAX_AGE_SECONDS = float(os.environ.get("ROUTE_CACHE_MAX_AGE_SECONDS", "1200"))
+ROUTE_CACHE_CELL_DEGREES = float(os.environ.get("ROUTE_CACHE_CELL_DEGREES", "0.0005"))
+
+# Partition key of rideMetaData and an optional GSI on the ride name
+RIDE_TABLE_KEY = os.environ.get("RIDE_TABLE_KEY", "rideId")
+RIDE_NAME_INDEX = os.environ.get("RIDE_NAME_INDEX", "")
+RIDE_NAME_INDEX_KEY = os.environ.get("RIDE_NAME_INDEX_KEY", "name")
+
+# Parallel scan segments used when (re)loading the ride catalog
+CATALOG_SCAN_SEGMENTS = int(os.environ.get("CATALOG_SCAN_SEGMENTS", "4"))
+
+# rideMetaData attributes the app reads (everything else is left in DynamoDB)
+CATALOG_ATTRIBUTES = os.environ.get(
+    "CATALOG_ATTRIBUTES", "rideId,id,name,rideName,waitTime,status"
+).split(",")
+
+# Grid cell size of the ride spatial index (degrees, ~200 m)
+SPATIAL_INDEX_CELL_DEGREES = float(os.environ.get("SPATIAL_INDEX_CELL_DEGREES", "0.002"))
+
+# Walkway graph of the park (compiled .npz); straight-line walking is used when missing
+WALKWAY_GRAPH_PATH = os.environ.get(
+    "WALKWAY_GRAPH_PATH", os.path.join(PROJECT_ROOT, "data", "walkways", "disneyland.npz")
+)
+
+# Worker processes for the all-pairs walking time build (0 = one per CPU)
+WALKWAY_WORKERS = int(os.environ.get("WALKWAY_WORKERS", "0"))
+
+# Worker processes for batch optimization (0 = one per CPU)
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", "0"))
+
+# Self-hosted optimization service (python -m utils.optimize_service); point
+# OPTIMIZE_API_URL at http://<host>:<port>/Optimize-Routes to use it
+SERVICE_HOST = os.environ.get("SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("SERVICE_PORT", "8001"))
+SERVICE_WORKERS = int(os.environ.get("SERVICE_WORKERS", "0"))
+SERVICE_MAX_QUEUE = int(os.environ.get("SERVICE_MAX_QUEUE", "64"))
+
+# Per-stage latency spans (utils.telemetry); optionally every span is also
+# appended to a JSON-lines file for the log pipeline
+TELEMETRY_ENABLED = os.environ.get("TELEMETRY_ENABLED", "1") == "1"
+TELEMETRY_LOG_PATH = os.environ.get("TELEMETRY_LOG_PATH", "")
+
+# Location map renderer: "plotly" (scatter mapbox) or "deck" (pydeck, culled
+# to the view and clustered so large catalogs stay light)
+MAP_RENDERER = os.environ.get("MAP_RENDERER", "plotly")
+
+# pydeck map: most single markers sent for one view before nearby ones are
+# clustered, and the cluster cell size in screen pixels
+MAP_MAX_POINTS = int(os.environ.get("MAP_MAX_POINTS", "1500"))
+MAP_CLUSTER_PIXELS = int(os.environ.get("MAP_CLUSTER_PIXELS", "48"))
@@ -1,31 +1,15 @@
-import boto3
 from botocore.exceptions import ClientError
 
+from utils.ride_catalog import get_catalog
+
 def get_all_rides():
     """
     Mock function to get all rides (replace with your actual DynamoDB function)
     """
     try:
-        # Initialize DynamoDB client with explicit region
-        session = boto3.Session(region_name='us-west-2')  # Replace with your region
-        dynamodb = session.resource('dynamodb')
-        
-        # Reference the table
-        table = dynamodb.Table('rideMetaData')
-        
-        # Scan the table to get all items
-        response = table.scan()
-        
-        # Extract ride names from the response
-        items = response['Items']
-        
-        # Continue scanning if we have more items (pagination)
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response['Items'])
-        
-        # Extract just the ride names
-        ride_names = [item.get('rideName') for item in items if 'rideName' in item]
+        # Names come from the shared catalog, which only scans the table when stale;
+        # rides without a name are left out
+        ride_names = [name for name in get_catalog().names() if name]
         
         # Create the JSON response
         result = {
@@ -0,0 +1,59 @@
+import streamlit as st
+
+from utils import config
+from utils.route_cache import get_route_cache
+from utils.telemetry import get_telemetry
+
+
+def render_debug_panel():
+    """
+    Shows per-stage latency in the sidebar when the app was opened with ?debug=1.
+
+    The flag sticks for the rest of the session, so the panel stays visible
+    after switching pages.
+    """
+    if st.query_params.get("debug") == "1":
+        st.session_state.debug = True
+    if not st.session_state.get("debug"):
+        return
+
+    with st.sidebar.expander("Route cache (debug)"):
+        stats = get_route_cache().stats()
+        st.caption("Per-process counters since the app started, across all sessions.")
+        hits, misses = st.columns(2)
+        hits.metric("Hits", stats["hits"], help=f"Hit rate {stats['hit_rate']:.0%}")
+        misses.metric("Misses", stats["misses"])
+        st.caption(
+            f"{stats['entries']} entries · {stats['evictions']} evicted · {stats['expirations']} expired"
+        )
+
+    with st.sidebar.expander("Latency (debug)", expanded=True):
+        if not config.TELEMETRY_ENABLED:
+            st.info("Telemetry is off (TELEMETRY_ENABLED=0).")
+            return
+
+        # Only debug sessions pay for importing pandas
+        import pandas as pd
+
+        telemetry = get_telemetry()
+        stages = telemetry.snapshot()
+        if not stages:
+            st.caption("No timings recorded yet.")
+            return
+
+        st.caption("Per-process latency (ms) since the app started, across all sessions.")
+        df = pd.DataFrame(stages)[["stage", "count", "errors", "p50Ms", "p95Ms", "p99Ms", "maxMs"]]
+        st.dataframe(
+            df.rename(columns={"p50Ms": "p50", "p95Ms": "p95", "p99Ms": "p99", "maxMs": "max"}),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.download_button(
+            "Download as JSON lines",
+            data=telemetry.to_jsonl(),
+            file_name="latency.jsonl",
+            mime="application/x-ndjson",
+        )
+        if st.button("Reset timings"):
+            telemetry.reset()
+            st.rerun()
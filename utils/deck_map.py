@@ -0,0 +1,242 @@
+import logging
+import math
+import threading
+
+import numpy as np
+
+from utils import config
+from utils.ride_map import MAP_HEIGHT, MAP_ZOOM
+from utils.ride_table import get_ride_table
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Web Mercator: the whole world is TILE_SIZE pixels wide at zoom 0
+TILE_SIZE = 256
+
+# Viewport assumed when culling (Streamlit does not report the chart size)
+VIEW_WIDTH_PX = 1200
+
+# Extra viewport width kept on each side, so panning a little stays populated
+CULL_MARGIN = 0.5
+
+# Coordinates are rounded to ~0.1 m before they are sent to the browser
+COORD_DECIMALS = 6
+
+RIDE_COLOR = [220, 40, 40]
+CLUSTER_COLOR = [220, 40, 40, 160]
+USER_COLOR = [30, 90, 220]
+ROUTE_COLOR = [30, 90, 220, 200]
+
+
+def mercator(lats, lons):
+    """Web Mercator x, y in [0, 1] (y grows southwards)."""
+    lats = np.clip(np.asarray(lats, dtype=float), -85.0511, 85.0511)
+    x = (np.asarray(lons, dtype=float) + 180.0) / 360.0
+    y = 0.5 - np.log(np.tan(np.pi / 4 + np.radians(lats) / 2)) / (2 * np.pi)
+    return x, y
+
+
+def _rounded(values):
+    return np.round(values, COORD_DECIMALS).tolist()
+
+
+class MapPoints:
+    """
+    Attractions as columns (numpy arrays), so one view is culled and
+    clustered with a few vectorized passes however many points there are.
+    """
+
+    def __init__(self, lats, lons, names):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.names = names
+        self.x, self.y = mercator(self.lats, self.lons)
+
+    @classmethod
+    def from_table(cls, table):
+        """Points sharing a RideTable's columns (nothing is copied but the projection)."""
+        return cls(table.lats, table.lons, table.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def visible(self, lat, lon, zoom, width_px=VIEW_WIDTH_PX, height_px=MAP_HEIGHT):
+        """Indices of the points inside the view (plus CULL_MARGIN on each side)."""
+        world_px = TILE_SIZE * 2 ** zoom
+        cx, cy = mercator([lat], [lon])
+        half_width = width_px / world_px * (0.5 + CULL_MARGIN)
+        half_height = height_px / world_px * (0.5 + CULL_MARGIN)
+        inside = (np.abs(self.x - cx[0]) <= half_width) & (np.abs(self.y - cy[0]) <= half_height)
+        return np.flatnonzero(inside)
+
+    def view(self, lat, lon, zoom, max_points=None, cluster_px=None,
+             width_px=VIEW_WIDTH_PX, height_px=MAP_HEIGHT):
+        """
+        Level of detail for one view: single markers while few enough points
+        are visible, otherwise points sharing a screen cell of cluster_px
+        pixels are merged into one cluster at their centroid.
+
+        Args:
+            lat (float): View center latitude
+            lon (float): View center longitude
+            zoom (float): Map zoom level
+            max_points (int): Most single markers before clustering (defaults to the config value)
+            cluster_px (int): Cluster cell size in screen pixels (defaults to the config value)
+
+        Returns:
+            tuple: (points, clusters) as lists of records for the deck layers
+        """
+        max_points = max_points or config.MAP_MAX_POINTS
+        cluster_px = cluster_px or config.MAP_CLUSTER_PIXELS
+        idx = self.visible(lat, lon, zoom, width_px, height_px)
+        if len(idx) <= max_points:
+            return self._points(idx), []
+
+        cell = cluster_px / (TILE_SIZE * 2 ** zoom)
+        cols = np.floor(self.x[idx] / cell).astype(np.int64)
+        rows = np.floor(self.y[idx] / cell).astype(np.int64)
+        _, inverse, counts = np.unique(cols * (1 << 32) + rows, return_inverse=True, return_counts=True)
+
+        # Cells holding one point keep it as an ordinary marker
+        single = counts[inverse] == 1
+        points = self._points(idx[single])
+        multi = counts > 1
+        lats = np.bincount(inverse, weights=self.lats[idx], minlength=len(counts))[multi] / counts[multi]
+        lons = np.bincount(inverse, weights=self.lons[idx], minlength=len(counts))[multi] / counts[multi]
+        clusters = [
+            {"position": [lon_, lat_], "count": int(count), "name": f"{count} attractions"}
+            for lon_, lat_, count in zip(_rounded(lons), _rounded(lats), counts[multi].tolist())
+        ]
+        return points, clusters
+
+    def _points(self, idx):
+        return [
+            {"position": [lon, lat], "name": self.names[i]}
+            for i, lon, lat in zip(idx.tolist(), _rounded(self.lons[idx]), _rounded(self.lats[idx]))
+        ]
+
+
+def build_deck(points=(), clusters=(), user_loc=None, route=None, center=None, zoom=MAP_ZOOM,
+               height=MAP_HEIGHT):
+    """
+    Assembles the pydeck map.
+
+    Args:
+        points (list): Single markers from MapPoints.view
+        clusters (list): Cluster records from MapPoints.view
+        user_loc (tuple): Optional (latitude, longitude) of the visitor
+        route (list): Optional (latitude, longitude, label) stops, in walking order
+        center (tuple): (latitude, longitude) of the view (defaults to the visitor)
+        zoom (float): Map zoom level
+        height (int): Chart height in pixels
+
+    Returns:
+        pydeck.Deck: The map
+    """
+    import pydeck as pdk
+
+    layers = []
+    if clusters:
+        max_count = max(cluster["count"] for cluster in clusters)
+        for cluster in clusters:
+            # Area grows with the count, up to three times the smallest radius
+            cluster["radius"] = 10 + 20 * math.sqrt(cluster["count"] / max_count)
+        layers.append(pdk.Layer(
+            "ScatterplotLayer", clusters, id="clusters", get_position="position",
+            get_radius="radius", radius_units="pixels", get_fill_color=CLUSTER_COLOR, pickable=True,
+        ))
+        layers.append(pdk.Layer(
+            "TextLayer", clusters, id="cluster-counts", get_position="position",
+            get_text="count", get_size=12, get_color=[255, 255, 255],
+        ))
+    if points:
+        layers.append(pdk.Layer(
+            "ScatterplotLayer", list(points), id="rides", get_position="position",
+            get_radius=6, radius_units="pixels", get_fill_color=RIDE_COLOR, pickable=True,
+        ))
+    if route:
+        path = [[round(lon, COORD_DECIMALS), round(lat, COORD_DECIMALS)] for lat, lon, _ in route]
+        stops = [{"position": position, "name": label} for position, (_, _, label) in zip(path, route)]
+        layers.append(pdk.Layer(
+            "PathLayer", [{"path": path, "name": "Your route"}], id="route", get_path="path",
+            get_width=4, width_units="pixels", get_color=ROUTE_COLOR, pickable=True,
+        ))
+        layers.append(pdk.Layer(
+            "ScatterplotLayer", stops, id="stops", get_position="position",
+            get_radius=8, radius_units="pixels", get_fill_color=RIDE_COLOR, pickable=True,
+        ))
+    if user_loc:
+        layers.append(pdk.Layer(
+            "ScatterplotLayer", [{"position": [user_loc[1], user_loc[0]], "name": "You are here!"}],
+            id="user", get_position="position", get_radius=8, radius_units="pixels",
+            get_fill_color=USER_COLOR, pickable=True,
+        ))
+
+    center = center or user_loc or (route[0][:2] if route else (0.0, 0.0))
+    return pdk.Deck(
+        layers=layers,
+        initial_view_state=pdk.ViewState(latitude=center[0], longitude=center[1], zoom=zoom),
+        map_provider="carto",
+        map_style="road",
+        height=height,
+        tooltip={"text": "{name}"},
+    )
+
+
+_points = None
+_points_lock = threading.Lock()
+
+
+def get_map_points():
+    """Returns the shared MapPoints over the ride table, rebuilt when the table is reloaded."""
+    global _points
+    table = get_ride_table()
+    if _points is None or _points[0] is not table:
+        with _points_lock:
+            if _points is None or _points[0] is not table:
+                _points = (table, MapPoints.from_table(table))
+    return _points[1]
+
+
+def location_deck(user_loc=None, zoom=MAP_ZOOM, points=None):
+    """
+    The location map as a pydeck chart: attractions near the view, clustered
+    when there are too many to draw one by one.
+
+    Args:
+        user_loc (tuple): Optional (latitude, longitude) to center on and mark
+        zoom (float): Map zoom level the view is culled and clustered for
+        points (MapPoints): Attractions to draw (defaults to the shared ones)
+
+    Returns:
+        pydeck.Deck: The map
+    """
+    points = points or get_map_points()
+    if user_loc:
+        center = user_loc
+    elif len(points):
+        center = (float(points.lats.mean()), float(points.lons.mean()))
+    else:
+        center = (0.0, 0.0)
+    singles, clusters = points.view(center[0], center[1], zoom)
+    return build_deck(singles, clusters, user_loc=user_loc, center=center, zoom=zoom)
+
+
+def route_deck(ordered_rides, start=None, zoom=MAP_ZOOM):
+    """
+    The optimized route as a path from the start through each ride in order.
+
+    Args:
+        ordered_rides (list): orderedRides from the optimization result (with lat/lon)
+        start (tuple): Optional (latitude, longitude) the visitor sets off from
+
+    Returns:
+        pydeck.Deck: The map
+    """
+    route = [(ride["lat"], ride["lon"], f"{i}. {ride.get('name', 'Unknown Ride')}")
+             for i, ride in enumerate(ordered_rides, start=1)]
+    if start:
+        route.insert(0, (start[0], start[1], "Your Location (Start)"))
+    return build_deck(user_loc=start, route=route, center=route[0][:2] if route else start, zoom=zoom)
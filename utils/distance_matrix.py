@@ -0,0 +1,189 @@
+import hashlib
+import logging
+import os
+import threading
+
+import numpy as np
+
+from utils import config
+from utils.ride_table import get_ride_table
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Approximate radius of earth in km
+EARTH_RADIUS_KM = 6373.0
+
+# Average walking speed of 5 km/h, in km per minute
+WALKING_SPEED_KM_PER_MIN = 0.083
+
+# Planes of the stored matrix
+DISTANCE_KM = 0
+WALK_MINUTES = 1
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; arguments may be NumPy arrays (broadcast)."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def build_distance_matrix(lats, lons, graph=None, walkways=None):
+    """
+    Computes all pairwise distances and walking times.
+
+    Distances follow the walkway graph when one is given and are straight
+    lines otherwise.
+
+    Args:
+        walkways (np.ndarray): graph.walking_m_to_points() for the points, if already computed
+
+    Returns:
+        np.ndarray: float32 array of shape (2, N, N); plane 0 is km, plane 1 is walking minutes
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if graph is not None:
+        km = graph.pairwise_km(lats, lons, to_points=walkways)
+    else:
+        km = haversine_km(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+    return np.stack([km, km / WALKING_SPEED_KM_PER_MIN]).astype(np.float32)
+
+
+def matrix_path(digest):
+    """Cache file for the matrix of a catalog with the given hash."""
+    return os.path.join(config.CACHE_DIR, f"ride_distances_{digest[:16]}.npy")
+
+
+def walkways_path(digest):
+    """Cache file for the walkway distances from every graph node to each ride."""
+    return os.path.join(config.CACHE_DIR, f"ride_walkways_{digest[:16]}.npy")
+
+
+def _save(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write to a temp file first so readers never map a partial file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, data)
+    os.replace(tmp_path, path)
+
+
+class DistanceMatrix:
+    """
+    Pairwise distance/walking-time lookups between catalog rides.
+
+    Matrix rows are the rows of the RideTable it was built for.
+    """
+
+    def __init__(self, table, data, graph=None, walkways=None):
+        """
+        Args:
+            table (RideTable): Rides with coordinates, in matrix order
+            data (np.ndarray): Matrix from build_distance_matrix (may be memory-mapped)
+            graph (WalkwayGraph): Walkway network the matrix was built on, if any
+            walkways (np.ndarray): graph.walking_m_to_points() for the rides (may be memory-mapped)
+        """
+        self.table = table
+        self.ride_ids = table.ids
+        self.lats = table.lats
+        self.lons = table.lons
+        self.data = data
+        self.graph = graph
+        self.walkways = walkways
+
+    def __contains__(self, ride_id):
+        return ride_id in self.table
+
+    def indices(self, ride_ids):
+        """Matrix rows for the given ride IDs."""
+        return np.array(self.table.rows(ride_ids), dtype=np.intp)
+
+    def distance_km(self, from_id, to_id):
+        return float(self.data[DISTANCE_KM, self.table.row(from_id), self.table.row(to_id)])
+
+    def walk_minutes(self, from_id, to_id):
+        return float(self.data[WALK_MINUTES, self.table.row(from_id), self.table.row(to_id)])
+
+    def from_point(self, latitude, longitude, rows):
+        """
+        Distances from an arbitrary point (e.g. the user) to the given rows.
+
+        Returns:
+            tuple: (km array, walking minutes array)
+        """
+        if self.graph is not None:
+            to_rides = self.walkways[:, rows] if self.walkways is not None else None
+            km = self.graph.distances_from_point(latitude, longitude, self.lats[rows], self.lons[rows], to_rides)
+        else:
+            km = haversine_km(latitude, longitude, self.lats[rows], self.lons[rows])
+        return km, km / WALKING_SPEED_KM_PER_MIN
+
+    def walking_cost_matrix(self, latitude, longitude, rows):
+        """
+        Walking minutes between a start point (index 0) and the given rides (1..n).
+
+        Args:
+            rows (list): Table rows of the rides
+
+        Returns:
+            list: Nested lists, ready for the route solvers
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        n = len(rows)
+        cost = np.zeros((n + 1, n + 1), dtype=np.float64)
+        cost[1:, 1:] = self.data[WALK_MINUTES][np.ix_(rows, rows)]
+        _, minutes = self.from_point(latitude, longitude, rows)
+        cost[0, 1:] = minutes
+        cost[1:, 0] = minutes
+        return cost.tolist()
+
+
+def load_or_build(table, graph=None):
+    """
+    Returns the DistanceMatrix for a RideTable, building the cache file only
+    when the catalog hash (and walkway graph, if any) has no matrix on disk yet.
+
+    With a walkway graph, the walking distance from every graph node to each
+    ride is stored as well, so distances from the user are an array lookup.
+    """
+    digest = table.digest()
+    walkways = None
+    if graph is not None:
+        digest = hashlib.sha256(f"{digest}:{graph.digest}".encode("utf-8")).hexdigest()
+        if not os.path.exists(walkways_path(digest)):
+            logger.info(f"Computing walkway distances to {len(table)} rides")
+            _save(walkways_path(digest), graph.walking_m_to_points(table.lats, table.lons))
+        walkways = np.load(walkways_path(digest), mmap_mode="r")
+    path = matrix_path(digest)
+    if not os.path.exists(path):
+        logger.info(f"Building distance matrix for {len(table)} rides")
+        _save(path, build_distance_matrix(table.lats, table.lons, graph, walkways))
+    return DistanceMatrix(table, np.load(path, mmap_mode="r"), graph, walkways)
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_distance_matrix():
+    """
+    Returns the shared DistanceMatrix for the shared ride table (on walkways
+    if a graph exists), rebuilt when the table is reloaded.
+    """
+    global _matrix
+    table = get_ride_table()
+    if _matrix is None or _matrix.table is not table:
+        with _matrix_lock:
+            if _matrix is None or _matrix.table is not table:
+                from utils.walkway_graph import get_walkway_graph
+                _matrix = load_or_build(table, get_walkway_graph())
+    return _matrix
+
+
+if __name__ == "__main__":
+    # Build step: python -m utils.distance_matrix
+    matrix = get_distance_matrix()
+    print(f"Distance matrix ready for {len(matrix.ride_ids)} rides in {config.CACHE_DIR}")
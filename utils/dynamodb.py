@@ -0,0 +1,200 @@
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# BatchGetItem accepts at most 100 keys per call
+BATCH_GET_MAX_KEYS = 100
+
+# Attempts at fetching keys DynamoDB returned as unprocessed
+BATCH_GET_MAX_ATTEMPTS = 8
+
+# boto3 takes ~0.15 s to import, so it is loaded with the first client or
+# (de)serializer rather than by every module that imports this one
+_client = None
+_client_lock = threading.Lock()
+_deserializer = None
+_serializer = None
+
+
+def get_dynamodb_client():
+    """Returns the shared low-level DynamoDB client (clients are thread-safe)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                import boto3
+
+                _client = boto3.Session(region_name=config.AWS_REGION).client('dynamodb')
+    return _client
+
+
+def _type_converters():
+    global _deserializer, _serializer
+    if _serializer is None:
+        from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+        _deserializer = TypeDeserializer()
+        _serializer = TypeSerializer()
+    return _deserializer, _serializer
+
+
+def deserialize_item(item):
+    """Converts a low-level item ({'S': ...} values) into plain Python values."""
+    deserializer = _type_converters()[0]
+    return {name: deserializer.deserialize(value) for name, value in item.items()}
+
+
+def serialize_item(item):
+    """Converts plain Python values into a low-level item."""
+    serializer = _type_converters()[1]
+    return {name: serializer.serialize(value) for name, value in item.items()}
+
+
+def projection(attributes):
+    """
+    ProjectionExpression and ExpressionAttributeNames for the attributes.
+
+    Placeholders are used for every name since attributes like 'name' are
+    reserved words.
+    """
+    names = {f"#a{i}": attribute for i, attribute in enumerate(attributes)}
+    return ", ".join(names), names
+
+
+def batch_get_items(keys, attributes=None, table_name=None, client=None):
+    """
+    Fetches items by key with BatchGetItem.
+
+    Keys are sent in chunks of 100; keys DynamoDB leaves unprocessed (e.g. when
+    throttled) are retried with jittered exponential backoff.
+
+    Args:
+        keys (list): Key dicts, e.g. [{'rideId': '...'}]
+        attributes (list): Attributes to return (default all)
+        table_name (str): Table to read (defaults to config.RIDE_TABLE_NAME)
+        client: DynamoDB client (defaults to the shared one)
+
+    Returns:
+        tuple: (list of items, read capacity units consumed)
+    """
+    table_name = table_name or config.RIDE_TABLE_NAME
+    client = client or get_dynamodb_client()
+
+    request_template = {}
+    if attributes:
+        expression, names = projection(attributes)
+        request_template = {"ProjectionExpression": expression, "ExpressionAttributeNames": names}
+
+    items = []
+    consumed = 0.0
+    for start in range(0, len(keys), BATCH_GET_MAX_KEYS):
+        chunk = [serialize_item(key) for key in keys[start:start + BATCH_GET_MAX_KEYS]]
+        request = {table_name: dict(request_template, Keys=chunk)}
+        for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+            response = client.batch_get_item(RequestItems=request, ReturnConsumedCapacity="TOTAL")
+            items.extend(deserialize_item(item) for item in response["Responses"].get(table_name, []))
+            consumed += sum(c.get("CapacityUnits", 0) for c in response.get("ConsumedCapacity", []))
+
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                break
+            delay = min(0.05 * 2 ** attempt, 2.0) * random.uniform(0.5, 1.0)
+            logger.info(f"Retrying {len(request[table_name]['Keys'])} unprocessed keys in {delay:.2f}s")
+            time.sleep(delay)
+        else:
+            raise RuntimeError(f"BatchGetItem still had unprocessed keys after {BATCH_GET_MAX_ATTEMPTS} attempts")
+    return items, consumed
+
+
+def query_keys_by_name(names, index_name, index_key, key_attribute, table_name=None, client=None):
+    """
+    Looks up table keys for ride names through a GSI on the name attribute.
+
+    Returns:
+        tuple: (dict of name -> key value, read capacity units consumed)
+    """
+    table_name = table_name or config.RIDE_TABLE_NAME
+    client = client or get_dynamodb_client()
+    found = {}
+    consumed = 0.0
+    for name in names:
+        response = client.query(
+            TableName=table_name,
+            IndexName=index_name,
+            KeyConditionExpression="#n = :name",
+            ExpressionAttributeNames={"#n": index_key, "#k": key_attribute},
+            ExpressionAttributeValues={":name": {"S": name}},
+            ProjectionExpression="#k",
+            ReturnConsumedCapacity="TOTAL",
+        )
+        consumed += response.get("ConsumedCapacity", {}).get("CapacityUnits", 0)
+        for item in response.get("Items", []):
+            found[name] = deserialize_item(item)[key_attribute]
+    return found, consumed
+
+
+def _scan_segment(client, request, segment, total_segments, pages):
+    """Scans one segment to the end, putting each page on the queue."""
+    try:
+        response = client.scan(Segment=segment, TotalSegments=total_segments, **request)
+        pages.put(response["Items"])
+        while "LastEvaluatedKey" in response:
+            response = client.scan(
+                Segment=segment, TotalSegments=total_segments,
+                ExclusiveStartKey=response["LastEvaluatedKey"], **request
+            )
+            pages.put(response["Items"])
+    except Exception as e:
+        pages.put(e)
+    finally:
+        pages.put(None)
+
+
+def parallel_scan(attributes=None, total_segments=None, table_name=None, client=None):
+    """
+    Scans a table with DynamoDB parallel scan, yielding items as pages arrive.
+
+    Each segment is scanned by its own thread; pages from all segments are
+    merged in arrival order, so callers can start on the first page while
+    the rest are still in flight.
+
+    Args:
+        attributes (list): Attributes to fetch (default all)
+        total_segments (int): Number of segments/threads (defaults to config.CATALOG_SCAN_SEGMENTS)
+        table_name (str): Table to scan (defaults to config.RIDE_TABLE_NAME)
+        client: DynamoDB client (defaults to the shared one)
+
+    Yields:
+        dict: Deserialized items
+    """
+    total_segments = max(1, total_segments or config.CATALOG_SCAN_SEGMENTS)
+    client = client or get_dynamodb_client()
+    request = {"TableName": table_name or config.RIDE_TABLE_NAME}
+    if attributes:
+        expression, names = projection(attributes)
+        request.update(ProjectionExpression=expression, ExpressionAttributeNames=names)
+
+    pages = queue.Queue()
+    with ThreadPoolExecutor(max_workers=total_segments, thread_name_prefix="scan") as pool:
+        for segment in range(total_segments):
+            pool.submit(_scan_segment, client, request, segment, total_segments, pages)
+
+        remaining = total_segments
+        while remaining:
+            page = pages.get()
+            if page is None:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                for item in page:
+                    yield deserialize_item(item)
@@ -0,0 +1,88 @@
+import logging
+import time
+
+import numpy as np
+
+from utils import config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def memory_needed(n):
+    """Bytes used by the DP and parent tables for n rides."""
+    # float64 costs plus int8 parents for every (subset, last ride) pair
+    return (1 << n) * n * 9
+
+
+def exact_solver_fits(n):
+    """Checks whether an exact solve of n rides is within the configured limits."""
+    return 0 < n <= config.EXACT_SOLVER_MAX_RIDES and memory_needed(n) <= config.EXACT_SOLVER_MAX_BYTES
+
+
+def _subsets_by_size(n):
+    """Groups every bitmask over n bits by its number of set bits."""
+    masks = np.arange(1 << n, dtype=np.int64)
+    sizes = np.zeros(1 << n, dtype=np.int8)
+    for bit in range(n):
+        sizes += ((masks >> bit) & 1).astype(np.int8)
+    order = np.argsort(sizes, kind="stable")
+    bounds = np.searchsorted(sizes[order], np.arange(n + 2))
+    return [order[bounds[k]:bounds[k + 1]] for k in range(n + 1)]
+
+
+def held_karp_open_path(cost, start=0, time_limit=None):
+    """
+    Finds the exact shortest open path through every point, beginning at start.
+
+    Bitmask dynamic programming over ride subsets: dp[mask, j] is the cheapest
+    way to leave start, visit exactly the rides in mask and stop at ride j.
+    Each subset size is computed in one NumPy pass per end ride, so the Python
+    loop is only O(n^2).
+
+    Args:
+        cost (list): Square matrix (nested lists or array) of travel costs
+        start (int): Index of the fixed first point
+        time_limit (float): Give up after this many seconds (None for no limit)
+
+    Returns:
+        list: Point indices in visiting order, or None if the time limit was hit
+    """
+    began = time.perf_counter()
+    cost = np.asarray(cost, dtype=np.float64)
+    others = [k for k in range(len(cost)) if k != start]
+    n = len(others)
+    if n == 0:
+        return [start]
+
+    from_start = cost[start, others]
+    between = cost[np.ix_(others, others)]
+
+    dp = np.full((1 << n, n), np.inf)
+    parent = np.full((1 << n, n), -1, dtype=np.int8)
+    singles = 1 << np.arange(n)
+    dp[singles, np.arange(n)] = from_start
+
+    for masks in _subsets_by_size(n)[2:]:
+        if time_limit is not None and time.perf_counter() - began > time_limit:
+            logger.warning(f"Exact solver exceeded {time_limit}s at n={n}")
+            return None
+        for j in range(n):
+            ending = masks[(masks >> j) & 1 == 1]
+            # Best way to reach each earlier end ride i, then walk i -> j
+            candidates = dp[ending ^ (1 << j)] + between[:, j]
+            best = np.argmin(candidates, axis=1)
+            dp[ending, j] = candidates[np.arange(len(ending)), best]
+            parent[ending, j] = best
+
+    # Walk the parent pointers back from the cheapest final ride
+    mask = (1 << n) - 1
+    j = int(np.argmin(dp[mask]))
+    order = []
+    while j >= 0:
+        order.append(j)
+        prev = int(parent[mask, j])
+        mask ^= 1 << j
+        j = prev
+    return [start] + [others[k] for k in reversed(order)]
@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+
+from utils import config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RetryableHTTPError(Exception):
+    """A 5xx response worth retrying."""
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint that keeps failing."""
+
+
+class CircuitBreaker:
+    """
+    Stops calling an endpoint after repeated failures.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast. Once reset_seconds have passed a single probe call is let
+    through; its outcome closes the circuit again or re-opens it.
+    """
+
+    def __init__(self, failure_threshold=None, reset_seconds=None):
+        self.failure_threshold = failure_threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_seconds = config.CIRCUIT_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        """True if a call may go ahead now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning(f"Circuit opened after {self._failures} failures")
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+_session = None
+_session_lock = threading.Lock()
+_breakers = {}
+
+
+def get_session():
+    """Returns the shared keep-alive session (connections are pooled per host)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                # requests and tenacity are only loaded once a call is made
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=config.HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_breaker(url):
+    """Returns the circuit breaker for a URL."""
+    with _session_lock:
+        if url not in _breakers:
+            _breakers[url] = CircuitBreaker()
+        return _breakers[url]
+
+
+def post_json(url, payload, deadline=None, max_attempts=None):
+    """
+    POSTs a JSON payload with pooling, timeouts, retries and circuit breaking.
+
+    Connection errors, timeouts and 5xx responses are retried with jittered
+    exponential backoff until max_attempts or the overall deadline is reached.
+    Other responses (including 4xx) are returned as-is.
+
+    Args:
+        url (str): Endpoint URL
+        payload (dict): JSON body
+        deadline (float): Seconds allowed for all attempts together
+        max_attempts (int): Maximum number of attempts
+
+    Returns:
+        requests.Response: The final response
+
+    Raises:
+        CircuitOpenError: If the endpoint's circuit is open
+        requests.RequestException, RetryableHTTPError: If every attempt failed
+    """
+    import requests
+    from tenacity import (
+        Retrying,
+        retry_if_exception_type,
+        stop_after_attempt,
+        stop_after_delay,
+        wait_random_exponential,
+    )
+
+    deadline = config.HTTP_DEADLINE_SECONDS if deadline is None else deadline
+    max_attempts = max_attempts or config.HTTP_MAX_ATTEMPTS
+    breaker = get_breaker(url)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for {url}")
+
+    session = get_session()
+    give_up_at = time.monotonic() + deadline
+
+    def attempt():
+        # Never wait on one attempt past the overall deadline
+        remaining = max(give_up_at - time.monotonic(), 0.1)
+        timeout = (min(config.HTTP_CONNECT_TIMEOUT, remaining), min(config.HTTP_READ_TIMEOUT, remaining))
+        response = session.post(url, json=payload, timeout=timeout)
+        if response.status_code >= 500:
+            raise RetryableHTTPError(response)
+        return response
+
+    retrying = Retrying(
+        retry=retry_if_exception_type((requests.ConnectionError, requests.Timeout, RetryableHTTPError)),
+        stop=stop_after_attempt(max_attempts) | stop_after_delay(deadline),
+        wait=wait_random_exponential(multiplier=0.2, max=2),
+        before_sleep=lambda state: logger.warning(
+            f"POST {url} attempt {state.attempt_number} failed: {state.outcome.exception()}"
+        ),
+        reraise=True,
+    )
+    try:
+        response = retrying(attempt)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return response
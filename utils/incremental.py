@@ -0,0 +1,127 @@
+import logging
+import time
+
+from utils import config
+from utils.distance_matrix import get_distance_matrix
+from utils.local_optimizer import or_opt, path_cost, route_result, two_opt
+from utils.telemetry import span
+from utils.time_dependent import WaitModel, clock_minutes, improve, park_now, simulate, timed_route_result
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def insert_cheapest(cost, tour, node):
+    """Inserts node where it lengthens the open path least (in place)."""
+    best = None
+    for pos in range(1, len(tour) + 1):
+        prev = tour[pos - 1]
+        if pos < len(tour):
+            nxt = tour[pos]
+            delta = cost[prev][node] + cost[node][nxt] - cost[prev][nxt]
+        else:
+            delta = cost[prev][node]
+        if best is None or delta < best[0]:
+            best = (delta, pos)
+    tour.insert(best[1], node)
+
+
+def insert_earliest_finish(cost, model, tour, node, start_clock):
+    """Inserts node where the whole route finishes soonest under predicted waits (in place)."""
+    best = None
+    for pos in range(1, len(tour) + 1):
+        candidate = tour[:pos] + [node] + tour[pos:]
+        finish = simulate(cost, model, candidate, start_clock)
+        if best is None or finish < best[0]:
+            best = (finish, pos)
+    tour.insert(best[1], node)
+
+
+def improve_walking(cost, tour, deadline):
+    """2-opt and Or-opt passes on walking time until no gain or the deadline passes."""
+    passes = 0
+    while time.perf_counter() < deadline:
+        passes += 1
+        improved = two_opt(cost, tour)
+        improved = or_opt(cost, tour) or improved
+        if not improved:
+            break
+    return passes
+
+
+def repair_route(previous_rides, latitude, longitude, done=(), added=(), removed=(),
+                 wait_profiles=None, start_time=None, time_limit=None):
+    """
+    Updates a route after the plan changes, warm-starting from the previous order.
+
+    Finished and removed rides are cut out, new rides are inserted at their
+    cheapest position, and a short improvement pass runs from there instead
+    of a full solve. Waits are re-read (or re-predicted from wait_profiles),
+    so the same call also refreshes a route when new waits arrive.
+
+    Args:
+        previous_rides (list): orderedRides from the previous optimization result
+        latitude (float): User's current latitude
+        longitude (float): User's current longitude
+        done (iterable): Ride IDs the user has finished
+        added (iterable): Ride IDs to add to the route
+        removed (iterable): Ride IDs to drop from the route
+        wait_profiles (dict): Optional ride ID -> waits per bucket; plans around predicted waits
+        start_time (datetime): When the user sets off (defaults to now, in the park's time zone)
+        time_limit (float): Improvement budget in seconds (defaults to the config value)
+
+    Returns:
+        dict: Status and either the route data (orderedRides, totalTimeMinutes) or an error
+    """
+    try:
+        started = time.perf_counter()
+        if time_limit is None:
+            time_limit = config.INCREMENTAL_TIME_LIMIT_SECONDS
+        matrix = get_distance_matrix()
+        table = matrix.table
+
+        dropped = set(done) | set(removed)
+        kept = [ride["rideId"] for ride in previous_rides if ride["rideId"] not in dropped]
+        new = [ride_id for ride_id in dict.fromkeys(added) if ride_id not in kept and ride_id not in dropped]
+        ride_ids = list(dict.fromkeys(kept + new))
+        missing = [ride_id for ride_id in ride_ids if ride_id not in table]
+        if missing:
+            return {
+                "status": "error",
+                "message": f"No coordinates for rides: {missing}"
+            }
+
+        rows = table.rows(ride_ids)
+        cost = matrix.walking_cost_matrix(latitude, longitude, rows)
+
+        # Warm start: the previous order from the current location, then the new rides
+        tour = list(range(len(rows) - len(new) + 1))
+        new_nodes = range(len(tour), len(rows) + 1)
+
+        with span("solver", solver="repair", rides=len(rows)):
+            if wait_profiles:
+                start_clock = clock_minutes(start_time or park_now())
+                model = WaitModel([None] + [wait_profiles.get(ride_id) for ride_id in ride_ids])
+                for node in new_nodes:
+                    insert_earliest_finish(cost, model, tour, node, start_clock)
+                improve(cost, model, tour, start_clock, time.perf_counter() + time_limit)
+                result = timed_route_result(table, rows, cost, model, tour, start_clock)
+            else:
+                for node in new_nodes:
+                    insert_cheapest(cost, tour, node)
+                improve_walking(cost, tour, time.perf_counter() + time_limit)
+                result = route_result(table, rows, cost, tour)
+
+        logger.info(
+            f"Repaired route in {(time.perf_counter() - started) * 1000:.1f} ms "
+            f"({len(dropped)} dropped, {len(new)} added, {path_cost(cost, tour):.1f} min walking)"
+        )
+        return result
+
+    except Exception as e:
+        logger.error(f"Error repairing route: {e}")
+        return {
+            "status": "error",
+            "message": f"Error: {str(e)}"
+        }
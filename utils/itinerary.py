@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from utils import config
+from utils.distance_matrix import WALKING_SPEED_KM_PER_MIN, get_distance_matrix, haversine_km
+from utils.telemetry import span
+
+
+def walk_between(matrix, ride, next_ride):
+    """
+    Walking distance and time between two rides of an optimized route.
+
+    Uses the precomputed matrix when both rides are in the catalog and falls
+    back to straight-line distance when only coordinates are known.
+
+    Returns:
+        tuple: (distance in km, walking time in minutes)
+    """
+    ride_id = ride.get("rideId")
+    next_id = next_ride.get("rideId")
+    if ride_id in matrix and next_id in matrix:
+        return matrix.distance_km(ride_id, next_id), matrix.walk_minutes(ride_id, next_id)
+    if all(key in ride for key in ["lat", "lon"]) and all(key in next_ride for key in ["lat", "lon"]):
+        km = float(haversine_km(ride["lat"], ride["lon"], next_ride["lat"], next_ride["lon"]))
+        return km, km / WALKING_SPEED_KM_PER_MIN
+    return 0, 0
+
+
+def build_itinerary(ordered_rides, start_time, ride_duration=None):
+    """
+    Lays out the timing of each step of an optimized route.
+
+    Args:
+        ordered_rides (list): Rides in visiting order, as returned by the optimizer
+        start_time (datetime): Arrival time at the first ride
+        ride_duration (float): Minutes spent on each ride (defaults to the config estimate)
+
+    Returns:
+        list: One dict per ride with arrival/wait/ride-end times and the walk to the next ride
+    """
+    with span("itinerary_build", rides=len(ordered_rides)):
+        return _build_steps(ordered_rides, start_time, ride_duration)
+
+
+def _build_steps(ordered_rides, start_time, ride_duration):
+    if ride_duration is None:
+        ride_duration = config.ESTIMATED_RIDE_DURATION_MINUTES
+    matrix = get_distance_matrix()
+
+    steps = []
+    current_time = start_time
+    for i, ride in enumerate(ordered_rides):
+        wait_time = ride.get("waitTime", 0)
+        wait_end_time = current_time + timedelta(minutes=wait_time)
+        ride_end_time = wait_end_time + timedelta(minutes=ride_duration)
+
+        walking_distance, walking_time = 0, 0
+        if i < len(ordered_rides) - 1:
+            walking_distance, walking_time = walk_between(matrix, ride, ordered_rides[i + 1])
+
+        steps.append({
+            "name": ride.get("name", "Unknown Ride"),
+            "arrival_time": current_time,
+            "wait_time": wait_time,
+            "wait_end_time": wait_end_time,
+            "ride_duration": ride_duration,
+            "ride_end_time": ride_end_time,
+            "walking_time": walking_time,
+            "walking_distance": walking_distance,
+        })
+
+        # Update current time for next attraction
+        current_time = ride_end_time + timedelta(minutes=walking_time)
+    return steps
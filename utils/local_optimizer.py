@@ -0,0 +1,261 @@
+import logging
+
+from utils import config
+from utils.distance_matrix import get_distance_matrix
+from utils.held_karp import exact_solver_fits, held_karp_open_path
+from utils.ride_catalog import current_waits
+from utils.telemetry import span
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Longest segment Or-opt will try to relocate
+OR_OPT_MAX_SEGMENT = 3
+
+# Cheapest insertion is O(n^3); above this size only nearest-neighbor is used
+CHEAPEST_INSERTION_MAX_POINTS = 100
+
+def path_cost(cost, tour):
+    """Total cost of walking the open path tour[0] -> tour[1] -> ... -> tour[-1]."""
+    return sum(cost[tour[k]][tour[k + 1]] for k in range(len(tour) - 1))
+
+
+def nearest_neighbor_tour(cost, start=0):
+    """Greedy construction: always walk to the closest unvisited point."""
+    unvisited = set(range(len(cost))) - {start}
+    tour = [start]
+    while unvisited:
+        last = cost[tour[-1]]
+        nxt = min(unvisited, key=last.__getitem__)
+        tour.append(nxt)
+        unvisited.remove(nxt)
+    return tour
+
+
+def cheapest_insertion_tour(cost, start=0):
+    """Greedy construction: repeatedly insert the point that lengthens the path least."""
+    remaining = set(range(len(cost))) - {start}
+    tour = [start]
+    while remaining:
+        best = None
+        for node in remaining:
+            row = cost[node]
+            for pos in range(1, len(tour) + 1):
+                prev = tour[pos - 1]
+                if pos < len(tour):
+                    nxt = tour[pos]
+                    delta = cost[prev][node] + row[nxt] - cost[prev][nxt]
+                else:
+                    delta = cost[prev][node]
+                if best is None or delta < best[0]:
+                    best = (delta, node, pos)
+        _, node, pos = best
+        tour.insert(pos, node)
+        remaining.remove(node)
+    return tour
+
+
+def two_opt(cost, tour):
+    """
+    Improves an open path with a fixed first point by reversing segments.
+
+    Returns:
+        bool: True if the tour was changed in place
+    """
+    n = len(tour)
+    improved = False
+    changed = True
+    while changed:
+        changed = False
+        for i in range(1, n - 1):
+            a, b = tour[i - 1], tour[i]
+            for j in range(i + 1, n):
+                c = tour[j]
+                if j + 1 < n:
+                    d = tour[j + 1]
+                    delta = cost[a][c] + cost[b][d] - cost[a][b] - cost[c][d]
+                else:
+                    delta = cost[a][c] - cost[a][b]
+                if delta < -1e-9:
+                    tour[i:j + 1] = tour[i:j + 1][::-1]
+                    b = tour[i]
+                    changed = improved = True
+    return improved
+
+
+def or_opt(cost, tour, max_segment=OR_OPT_MAX_SEGMENT):
+    """
+    Improves an open path by moving short segments (optionally reversed) elsewhere.
+
+    Returns:
+        bool: True if the tour was changed in place
+    """
+    improved = False
+    changed = True
+    while changed:
+        changed = False
+        n = len(tour)
+        for length in range(1, max_segment + 1):
+            for i in range(1, n - length + 1):
+                seg = tour[i:i + length]
+                prev = tour[i - 1]
+                nxt = tour[i + length] if i + length < n else None
+                # Cost saved by cutting the segment out
+                removed = cost[prev][seg[0]]
+                if nxt is not None:
+                    removed += cost[seg[-1]][nxt] - cost[prev][nxt]
+                rest = tour[:i] + tour[i + length:]
+                best = None
+                for pos in range(1, len(rest) + 1):
+                    p = rest[pos - 1]
+                    q = rest[pos] if pos < len(rest) else None
+                    for s in (seg, seg[::-1]):
+                        if pos == i and s is seg:
+                            continue
+                        added = cost[p][s[0]]
+                        if q is not None:
+                            added += cost[s[-1]][q] - cost[p][q]
+                        delta = added - removed
+                        if delta < -1e-9 and (best is None or delta < best[0]):
+                            best = (delta, pos, s)
+                if best:
+                    _, pos, s = best
+                    tour[:] = rest[:pos] + list(s) + rest[pos:]
+                    changed = improved = True
+                    break
+            if changed:
+                break
+    return improved
+
+
+def solve_open_path(cost, start=0, progress_callback=None):
+    """
+    Finds a short open path through every point, beginning at start.
+
+    Small inputs are solved exactly with Held-Karp. Otherwise (or if the exact
+    solver runs out of time) runs nearest-neighbor and cheapest-insertion
+    constructions, then alternates 2-opt and Or-opt until neither improves
+    the best one.
+
+    Args:
+        cost (list): Square matrix (nested lists) of travel costs
+        start (int): Index of the fixed first point
+        progress_callback (callable): Optional progress_callback(stage, message)
+
+    Returns:
+        list: Point indices in visiting order, starting with start
+    """
+    if exact_solver_fits(len(cost) - 1):
+        if progress_callback:
+            progress_callback("solving", f"Finding the exact best order of {len(cost) - 1} rides")
+        tour = held_karp_open_path(cost, start, time_limit=config.EXACT_SOLVER_TIME_LIMIT_SECONDS)
+        if tour is not None:
+            return tour
+
+    tours = [nearest_neighbor_tour(cost, start)]
+    if len(cost) <= CHEAPEST_INSERTION_MAX_POINTS:
+        tours.append(cheapest_insertion_tour(cost, start))
+    tour = min(tours, key=lambda t: path_cost(cost, t))
+    passes = 0
+    while True:
+        improved = two_opt(cost, tour)
+        improved = or_opt(cost, tour) or improved
+        passes += 1
+        if progress_callback:
+            progress_callback("improving", f"Improvement pass {passes}: {path_cost(cost, tour):.1f} min walking")
+        if not improved:
+            break
+    return tour
+
+
+def ride_rows(table, ride_ids):
+    """
+    Table rows for ride IDs, dropping duplicates but keeping the caller's order.
+
+    Returns:
+        tuple: (rows, IDs missing from the table)
+    """
+    ride_ids = list(dict.fromkeys(ride_ids))
+    missing = [ride_id for ride_id in ride_ids if ride_id not in table]
+    return [table.row(ride_id) for ride_id in ride_ids if ride_id in table], missing
+
+
+def route_result(table, rows, cost, tour, waits=None):
+    """
+    Builds the optimizer result for a solved tour, using current wait times.
+
+    Args:
+        table (RideTable): Rides the rows refer to
+        rows (list): Table rows; point k of the cost matrix is rows[k - 1]
+        cost (list): Square matrix of walking minutes (point 0 is the start)
+        tour (list): Point indices in visiting order, starting with 0
+        waits (dict): Ride ID -> current wait (defaults to current_waits())
+
+    Returns:
+        dict: Success status and the route data (orderedRides, totalTimeMinutes)
+    """
+    if waits is None:
+        waits = current_waits([table.ids[row] for row in rows])
+    ordered_rides = []
+    total_time = 0.0
+    for prev, node in zip(tour, tour[1:]):
+        row = rows[node - 1]
+        wait_time = waits.get(table.ids[row], 0)
+        walking_time = cost[prev][node]
+        total_time += walking_time + wait_time + float(table.durations[row])
+        ordered_rides.append({
+            "rideId": table.ids[row],
+            "name": table.names[row],
+            "lat": float(table.lats[row]),
+            "lon": float(table.lons[row]),
+            "waitTime": wait_time,
+            "walkingTimeMinutes": round(walking_time, 1),
+        })
+
+    return {
+        "status": "success",
+        "data": {
+            "orderedRides": ordered_rides,
+            "totalTimeMinutes": round(total_time, 1),
+        }
+    }
+
+
+def optimize_routes_local(latitude, longitude, ride_ids, progress_callback=None, wait_times=None):
+    """
+    Computes the optimal route in-process, with the same result shape as the
+    remote optimization API.
+
+    Args:
+        latitude (float): User's latitude
+        longitude (float): User's longitude
+        ride_ids (list): List of ride IDs to include in the route
+        progress_callback (callable): Optional progress_callback(stage, message)
+        wait_times (dict): Ride ID -> current wait (read from the catalog if not given)
+
+    Returns:
+        dict: Status and either the route data (orderedRides, totalTimeMinutes) or an error
+    """
+    try:
+        logger.info(f"Optimizing routes locally for {len(ride_ids)} rides")
+        matrix = get_distance_matrix()
+
+        rows, missing = ride_rows(matrix.table, ride_ids)
+        if missing:
+            return {
+                "status": "error",
+                "message": f"No coordinates for rides: {missing}"
+            }
+
+        cost = matrix.walking_cost_matrix(latitude, longitude, rows)
+        with span("solver", solver="local", rides=len(rows)):
+            tour = solve_open_path(cost, start=0, progress_callback=progress_callback)
+        return route_result(matrix.table, rows, cost, tour, waits=wait_times)
+
+    except Exception as e:
+        logger.error(f"Error optimizing routes locally: {e}")
+        return {
+            "status": "error",
+            "message": f"Error: {str(e)}"
+        }
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tornado import web
+
+from utils import config
+from utils.batch_optimizer import _init_worker, job_key
+from utils.distance_matrix import get_distance_matrix
+from utils.local_optimizer import optimize_routes_local
+from utils.ride_catalog import current_waits
+from utils.telemetry import LatencyHistogram
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+def _timed_solve(job, wait_times=None):
+    """Solves one job in a worker; returns the result and the solve time in seconds."""
+    began = time.perf_counter()
+    result = optimize_routes_local(job["latitude"], job["longitude"], job["rideIds"], wait_times=wait_times)
+    return result, time.perf_counter() - began
+
+
+def parse_job(payload):
+    """
+    Validates an optimization request body.
+
+    Raises:
+        ValueError: If a field is missing or has the wrong type
+    """
+    try:
+        ride_ids = payload["rideIds"]
+        if not isinstance(ride_ids, list) or not all(isinstance(r, str) for r in ride_ids):
+            raise ValueError("rideIds must be a list of strings")
+        return {
+            "latitude": float(payload["latitude"]),
+            "longitude": float(payload["longitude"]),
+            "rideIds": ride_ids,
+        }
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid request: {e}")
+
+
+class OptimizeService:
+    """
+    Route solver behind the HTTP handlers: a process pool plus admission control.
+
+    At most max_queue requests are admitted at once (running or waiting for a
+    worker); the rest are turned away with 503 so clients back off instead of
+    piling up behind a slow queue.
+    """
+
+    def __init__(self, workers=None, max_queue=None):
+        self.workers = workers or config.SERVICE_WORKERS or os.cpu_count() or 1
+        self.max_queue = max_queue or config.SERVICE_MAX_QUEUE
+        get_distance_matrix()  # Build the matrix file before the workers map it
+        from utils.ride_catalog import get_catalog
+        try:
+            catalog_table = get_catalog().table()
+        except Exception as e:
+            logger.warning(f"Could not load wait times for the workers: {e}")
+            catalog_table = []
+        # Spawned, not forked: forking the IOLoop process with running threads can leave locks held in the children
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(catalog_table,),
+        )
+        self.in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        # Only touched from the IOLoop thread, so the histograms need no lock
+        self.latency = {
+            "queue": LatencyHistogram(LATENCY_BUCKETS_MS),
+            "solve": LatencyHistogram(LATENCY_BUCKETS_MS),
+            "total": LatencyHistogram(LATENCY_BUCKETS_MS),
+        }
+
+    def try_admit(self):
+        """Reserves a queue slot; False when the service is full."""
+        if self.in_flight >= self.max_queue:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self.requests += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+
+    async def solve(self, job):
+        """
+        Runs one job on the pool and records its queue, solve and total latency.
+
+        Current waits come from this process's catalog, which reloads on its
+        TTL, so workers keep planning on fresh waits without scanning the
+        table themselves (their startup snapshot is only a fallback).
+        """
+        began = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        # Off the IOLoop thread: a catalog reload is a table scan
+        wait_times = await loop.run_in_executor(None, current_waits, job["rideIds"])
+        result, solve_seconds = await loop.run_in_executor(self.pool, _timed_solve, job, wait_times or None)
+        total = time.perf_counter() - began
+        self.latency["solve"].record(solve_seconds)
+        self.latency["queue"].record(max(0.0, total - solve_seconds))
+        self.latency["total"].record(total)
+        if result["status"] != "success":
+            self.errors += 1
+        return result
+
+    def metrics(self):
+        return {
+            "workers": self.workers,
+            "maxQueue": self.max_queue,
+            "inFlight": self.in_flight,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "latency": {name: histogram.snapshot(buckets=True) for name, histogram in self.latency.items()},
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _ServiceHandler(web.RequestHandler):
+    def initialize(self, service):
+        self.service = service
+
+    def write_json(self, status, body):
+        self.set_status(status)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(body))
+
+    def reject_busy(self):
+        self.set_header("Retry-After", "1")
+        self.write_json(503, {"message": "Optimizer is busy, try again shortly"})
+
+
+class OptimizeHandler(_ServiceHandler):
+    """POST latitude, longitude, rideIds -> orderedRides, totalTimeMinutes (the API Gateway contract)."""
+
+    async def post(self):
+        try:
+            job = parse_job(json.loads(self.request.body))
+        except ValueError as e:
+            self.write_json(400, {"message": str(e)})
+            return
+
+        if not self.service.try_admit():
+            self.reject_busy()
+            return
+        try:
+            result = await self.service.solve(job)
+        except Exception as e:
+            logger.error(f"Optimization failed: {e}")
+            self.service.errors += 1
+            self.write_json(500, {"message": f"Error: {str(e)}"})
+            return
+        finally:
+            self.service.release()
+
+        if result["status"] == "success":
+            self.write_json(200, result["data"])
+        else:
+            self.write_json(422, {"message": result.get("message", "Optimization failed")})
+
+
+class BatchHandler(_ServiceHandler):
+    """
+    POST a JSON list of jobs; streams one JSON line per job as results finish.
+
+    A batch takes one queue slot and keeps at most one job per worker in flight,
+    so single-plan requests still get through while it runs.
+    """
+
+    async def post(self):
+        try:
+            jobs = [parse_job(job) for job in json.loads(self.request.body)]
+        except (ValueError, TypeError) as e:
+            self.write_json(400, {"message": str(e)})
+            return
+
+        if not self.service.try_admit():
+            self.reject_busy()
+            return
+        try:
+            groups = {}
+            for index, job in enumerate(jobs):
+                groups.setdefault(job_key(job), []).append(index)
+
+            self.set_header("Content-Type", "application/x-ndjson")
+            limit = asyncio.Semaphore(self.service.workers)
+
+            async def run(indices):
+                async with limit:
+                    try:
+                        result = await self.service.solve(jobs[indices[0]])
+                    except Exception as e:
+                        result = {"status": "error", "message": f"Error: {str(e)}"}
+                return indices, result
+
+            for finished in asyncio.as_completed([run(indices) for indices in groups.values()]):
+                indices, result = await finished
+                for index in indices:
+                    self.write(json.dumps({"index": index, **result}) + "\n")
+                await self.flush()
+        finally:
+            self.service.release()
+        self.finish()
+
+
+class MetricsHandler(_ServiceHandler):
+    def get(self):
+        self.write_json(200, self.service.metrics())
+
+
+class HealthHandler(_ServiceHandler):
+    def get(self):
+        self.write_json(200, {"status": "ok"})
+
+
+def make_app(service):
+    """Tornado application serving the optimization API on top of service."""
+    args = {"service": service}
+    return web.Application([
+        (r"/Optimize-Routes", OptimizeHandler, args),
+        (r"/optimize", OptimizeHandler, args),
+        (r"/batch", BatchHandler, args),
+        (r"/metrics", MetricsHandler, args),
+        (r"/health", HealthHandler, args),
+    ])
+
+
+async def main():
+    service = OptimizeService()
+    app = make_app(service)
+    app.listen(config.SERVICE_PORT, address=config.SERVICE_HOST)
+    logger.info(
+        f"Optimization service on {config.SERVICE_HOST}:{config.SERVICE_PORT} "
+        f"({service.workers} workers, queue limit {service.max_queue})"
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+
+# One progress update from a running task
+ProgressEvent = namedtuple("ProgressEvent", ["stage", "message", "fraction", "elapsed"])
+
+# How far along the progress bar each stage puts us
+STAGE_FRACTIONS = {
+    "catalog_resolved": 0.2,
+    "request_sent": 0.35,
+    "solving": 0.35,
+    "improving": 0.5,
+    "response_received": 0.9,
+    "cache_hit": 0.9,
+    "done": 1.0,
+}
+
+
+class BackgroundTask:
+    """
+    Runs func(*args, progress_callback=..., **kwargs) on a worker thread.
+
+    The function reports progress by calling progress_callback(stage, message);
+    the Streamlit script thread reads the events with events() and renders
+    them, since Streamlit elements can only be updated from that thread.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        self._events = queue.Queue()
+        self._result = None
+        self._error = None
+        self._started = time.perf_counter()
+        self._improvements = 0
+        self._thread = threading.Thread(target=self._run, args=(func, args, kwargs), daemon=True)
+        self._thread.start()
+
+    def _run(self, func, args, kwargs):
+        try:
+            self._result = func(*args, progress_callback=self.report, **kwargs)
+        except Exception as e:
+            self._error = e
+        finally:
+            self.report("done", "Done")
+
+    def report(self, stage, message):
+        """Progress callback handed to the task."""
+        fraction = STAGE_FRACTIONS.get(stage, 0.0)
+        if stage == "improving":
+            # Each improvement pass closes part of the gap to the response
+            self._improvements += 1
+            fraction += 0.4 * (1 - 0.7 ** self._improvements)
+        self._events.put(ProgressEvent(stage, message, fraction, time.perf_counter() - self._started))
+
+    def events(self, poll_seconds=0.05):
+        """Yields progress events as they arrive, until the task has finished."""
+        while True:
+            try:
+                event = self._events.get(timeout=poll_seconds)
+            except queue.Empty:
+                continue
+            yield event
+            if event.stage == "done":
+                return
+
+    def result(self):
+        """Waits for the task and returns its result (re-raising its exception)."""
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
@@ -0,0 +1,177 @@
+import hashlib
+import threading
+import time
+import logging
+
+from utils import config
+from utils.dynamodb import parallel_scan
+from utils.ride_table import RideTable
+from utils.telemetry import span
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _scan_ride_table():
+    """
+    Scans the whole rideMetaData table with a parallel scan, fetching only the
+    attributes the app uses.
+
+    Returns:
+        list: All items in the table
+    """
+    return list(parallel_scan(config.CATALOG_ATTRIBUTES, config.CATALOG_SCAN_SEGMENTS))
+
+
+class RideCatalog:
+    """
+    Process-wide, read-mostly view of the rideMetaData table.
+
+    The table is scanned once and then served from memory until the TTL
+    expires or bump_version() is called. Every Streamlit session runs in the
+    same process, so they all share one catalog. Only the columnar RideTable
+    is kept; the scanned items are dropped once it is built.
+
+    If the first load fails there is nothing to fall back on, so the error
+    is remembered and raised again to every caller for retry_seconds
+    instead of each of them starting another scan.
+    """
+
+    def __init__(self, loader=None, ttl_seconds=None, retry_seconds=None):
+        """
+        Args:
+            loader (callable): Returns the list of table items, or a RideTable
+                               (defaults to a full scan)
+            ttl_seconds (float): Seconds before the catalog is reloaded
+            retry_seconds (float): Seconds a failed first load is not retried
+        """
+        self._loader = loader or _scan_ride_table
+        self._ttl_seconds = config.RIDE_CATALOG_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._retry_seconds = config.RIDE_CATALOG_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self._lock = threading.Lock()
+        self._table = None
+        self._failure = None
+        self._failed_at = 0.0
+        self._loaded_at = 0.0
+        self._stale = True
+        self.version = 0
+        self.wait_version = None
+
+    def _needs_refresh(self):
+        if self._table is None or self._stale:
+            return True
+        return time.monotonic() - self._loaded_at > self._ttl_seconds
+
+    def _raise_recent_failure(self):
+        failure = self._failure
+        if failure is not None and time.monotonic() - self._failed_at < self._retry_seconds:
+            # A fresh traceback each time, so repeated raises do not pile up frames
+            raise failure.with_traceback(None)
+
+    def _refresh(self):
+        """Reloads the table if needed. Only one caller does the scan."""
+        if not self._needs_refresh():
+            return
+        self._raise_recent_failure()
+        with self._lock:
+            if not self._needs_refresh():
+                return
+            self._raise_recent_failure()
+            logger.info("Loading ride catalog")
+            try:
+                with span("catalog_fetch"):
+                    loaded = self._loader()
+                table = loaded if isinstance(loaded, RideTable) else RideTable.from_items(loaded)
+            except Exception as e:
+                # Keep serving the previous copy if we have one
+                if self._table is None:
+                    logger.error(f"Ride catalog load failed, retrying in {self._retry_seconds:.0f}s: {e}")
+                    self._failure = e
+                    self._failed_at = time.monotonic()
+                    raise
+                logger.exception("Ride catalog reload failed, serving previous version")
+                self._loaded_at = time.monotonic()
+                self._stale = False
+                return
+
+            # Changes only when some ride's wait time changed
+            waits = sorted(zip(table.ids, table.waits.tolist()))
+            wait_version = hashlib.sha1(repr(waits).encode('utf-8')).hexdigest()[:12]
+
+            # The table is immutable, so swapping it in is atomic for readers
+            self._table = table
+            self._failure = None
+            self.wait_version = wait_version
+            self._loaded_at = time.monotonic()
+            self._stale = False
+            self.version += 1
+            logger.info(f"Ride catalog version {self.version} loaded with {len(table)} rides")
+
+    def is_fresh(self):
+        """True if lookups can be served from memory without reloading."""
+        return not self._needs_refresh()
+
+    def bump_version(self):
+        """Marks the catalog stale so the next access reloads it."""
+        self._stale = True
+
+    def current_wait_version(self):
+        """Returns a token that changes whenever the loaded wait times change."""
+        self._refresh()
+        return self.wait_version
+
+    def table(self):
+        """Returns the current RideTable."""
+        self._refresh()
+        return self._table
+
+    def items(self):
+        """Returns the rides as plain items (rideId, name, waitTime, status)."""
+        return self.table().items()
+
+    def names(self):
+        """Returns the names of all rides, in table order."""
+        return self.table().names
+
+    def id_for_name(self, name):
+        """Returns the ride ID for a ride name, or None."""
+        table = self.table()
+        row = table.row_for_name(name)
+        return None if row is None else table.ids[row]
+
+    def wait_time(self, ride_id):
+        """Returns the current wait for a ride ID in minutes (0 if unknown)."""
+        table = self.table()
+        row = table.row(ride_id)
+        return 0 if row is None else int(table.waits[row])
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Returns the shared RideCatalog for this process."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = RideCatalog()
+    return _catalog
+
+
+def current_waits(ride_ids):
+    """
+    Current waits for the given rides from one catalog read, reloading the
+    catalog first if its TTL has expired.
+
+    Returns:
+        dict: Ride ID -> wait in minutes (empty if the catalog is unavailable)
+    """
+    try:
+        table = get_catalog().table()
+    except Exception as e:
+        logger.warning(f"Could not read wait times: {e}")
+        return {}
+    return {ride_id: int(table.waits[table.row(ride_id)]) for ride_id in ride_ids if ride_id in table}
@@ -0,0 +1,120 @@
+import logging
+import threading
+
+from utils.ride_table import get_ride_table
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RIDE_MARKER_SIZE = 12
+MAP_ZOOM = 16
+MAP_HEIGHT = 600
+
+_base = None
+_base_lock = threading.Lock()
+
+
+def build_base_figure(table):
+    """
+    Builds the ride layer of the location map.
+
+    Coordinates are numpy arrays, which plotly serializes as packed binary
+    instead of one JSON number at a time. The default template is left out:
+    every new figure applies it again, and validating the expanded copy would
+    cost more than the rest of the figure together.
+
+    Args:
+        table (RideTable): Rides with coordinates and descriptions
+
+    Returns:
+        dict: Validated figure dict (data and layout, without the template)
+    """
+    import plotly.graph_objects as go
+
+    lats, lons = table.lats, table.lons
+    fig = go.Figure(go.Scattermapbox(
+        lat=lats,
+        lon=lons,
+        mode="markers",
+        marker=dict(size=RIDE_MARKER_SIZE, color="red"),
+        hovertext=list(table.names),
+        # Description without a label; text only shows in the hover for markers
+        text=list(table.descriptions),
+        hovertemplate="<b>%{hovertext}</b><br>%{text}<extra></extra>",
+        hoverlabel=dict(align="left"),
+        showlegend=False,
+    ))
+    fig.update_layout(
+        height=MAP_HEIGHT,
+        mapbox=dict(
+            style="open-street-map",
+            zoom=MAP_ZOOM,
+            center=dict(lat=float(lats.mean()), lon=float(lons.mean())) if len(table) else None,
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        shapes=[                          # thin black border
+            dict(
+                type="rect",
+                xref="paper",
+                yref="paper",
+                x0=0, y0=0, x1=1, y1=1,
+                line=dict(color="black", width=3),
+                fillcolor="rgba(0,0,0,0)",
+            )
+        ],
+    )
+    figure = fig.to_dict()
+    figure["layout"].pop("template", None)
+    return figure
+
+
+def get_base_figure():
+    """
+    Returns the shared ride layer, rebuilt only when the ride table is reloaded.
+
+    Every session reads the same dict, so callers must not modify it.
+    """
+    global _base
+    table = get_ride_table()
+    if _base is None or _base[0] is not table:
+        with _base_lock:
+            if _base is None or _base[0] is not table:
+                _base = (table, build_base_figure(table))
+                logger.info(f"Built the ride map layer for {len(table)} rides")
+    return _base[1]
+
+
+def location_map(user_loc=None, base=None):
+    """
+    The location map for one visitor: the shared ride layer plus their marker.
+
+    The figure is built and validated from the shared dict, so it holds its
+    own copy of the ride layer and changing it never touches the cache.
+
+    Args:
+        user_loc (tuple): Optional (latitude, longitude) to center on and mark
+        base (dict): Ride layer to draw on (defaults to the shared one)
+
+    Returns:
+        plotly.graph_objects.Figure: The map
+    """
+    import plotly.graph_objects as go
+
+    base = base or get_base_figure()
+    data = list(base["data"])
+    layout = base["layout"]
+    if user_loc:
+        lat, lon = user_loc
+        layout = dict(layout, mapbox=dict(layout["mapbox"], center={"lat": lat, "lon": lon}))
+        data.append(go.Scattermapbox(
+            lat=[lat],
+            lon=[lon],
+            mode="markers+text",
+            marker=dict(size=RIDE_MARKER_SIZE, color="blue"),
+            textposition="top right",
+            showlegend=False,
+            name="",
+            hovertemplate="You are here!<extra></extra>",
+        ))
+    return go.Figure(data=data, layout=layout)
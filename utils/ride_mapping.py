@@ -1,59 +1,112 @@
-import boto3
 import logging
 from botocore.exceptions import ClientError
 
+from utils import config
+from utils.dynamodb import batch_get_items, query_keys_by_name
+from utils.ride_catalog import get_catalog
+from utils.ride_table import get_ride_table
+from utils.telemetry import span
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_ride_ids_from_names(ride_names):
+def resolve_ride_ids(ride_names, client=None):
+    """
+    Maps ride names to IDs without scanning the table.
+    
+    Names are looked up in the local name index, then (for names it does not
+    know) in the config.RIDE_NAME_INDEX GSI if one is configured. The IDs are
+    then confirmed with BatchGetItem, which also returns their current waits
+    (projecting waitTime costs nothing: reads are charged on the whole item).
+    
+    Args:
+        ride_names (list): List of ride names to get IDs for
+        client: DynamoDB client (defaults to the shared one)
+    
+    Returns:
+        tuple: (dict of name -> ride ID for rides present in the table,
+                list of names that could not be resolved by index,
+                read capacity units consumed,
+                dict of ride ID -> current wait in minutes)
+    """
+    table = get_ride_table()
+    rows = {name: table.row_for_name(name) for name in ride_names}
+    ids_by_name = {name: table.ids[row] for name, row in rows.items() if row is not None}
+    consumed = 0.0
+
+    unknown = [name for name in ride_names if name not in ids_by_name]
+    if unknown and config.RIDE_NAME_INDEX:
+        found, units = query_keys_by_name(
+            unknown, config.RIDE_NAME_INDEX, config.RIDE_NAME_INDEX_KEY, config.RIDE_TABLE_KEY, client=client
+        )
+        ids_by_name.update(found)
+        consumed += units
+
+    # Confirm the rides still exist in the table
+    keys = [{config.RIDE_TABLE_KEY: ride_id} for ride_id in dict.fromkeys(ids_by_name.values())]
+    items, units = batch_get_items(keys, attributes=[config.RIDE_TABLE_KEY, "waitTime"], client=client)
+    consumed += units
+    waits = {item[config.RIDE_TABLE_KEY]: int(item.get("waitTime") or 0) for item in items}
+
+    resolved = {name: ride_id for name, ride_id in ids_by_name.items() if ride_id in waits}
+    unresolved = [name for name in ride_names if name not in resolved]
+    return resolved, unresolved, consumed, waits
+
+def _catalog_waits(table, ride_ids):
+    return {ride_id: int(table.waits[table.row(ride_id)]) for ride_id in ride_ids if ride_id in table}
+
+def get_ride_ids_from_names(ride_names, client=None):
     """
     Retrieves ride IDs for the given ride names from the DynamoDB table.
     
+    Served from the shared catalog when it is already loaded; otherwise
+    resolved by index and BatchGetItem (see resolve_ride_ids), with the
+    catalog as a last resort for names no index knows. The current waits of
+    the rides come back too, so the optimizer does not have to reload the
+    catalog for them (see optimize_routes).
+    
     Args:
         ride_names (list): List of ride names to get IDs for
+        client: DynamoDB client (defaults to the shared one)
     
     Returns:
-        dict: Dictionary with status and either ride IDs or error message
+        dict: Dictionary with status and either ride IDs (with their waits in
+            wait_times) or error message
     """
     try:
         logger.info(f"Getting ride IDs for {len(ride_names)} rides")
         
-        # Initialize DynamoDB client with explicit region
-        session = boto3.Session(region_name='us-west-2')
-        dynamodb = session.resource('dynamodb')
-        
-        # Reference the table
-        table = dynamodb.Table('rideMetaData')
-        
-        # Scan the table to get all items
-        response = table.scan()
-        items = response['Items']
-        
-        # Continue scanning if we have more items (pagination)
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response['Items'])
-        
-        # Create a mapping of ride names to ride IDs
-        ride_map = {}
-        for item in items:
-            # Check for both possible attribute names
-            name = item.get('name') or item.get('rideName')
-            ride_id = item.get('id') or item.get('rideId')
-            
-            if name and ride_id:
-                ride_map[name] = ride_id
-        
-        logger.info(f"Found {len(ride_map)} rides in the database")
+        with span("id_mapping", rides=len(ride_names)):
+            catalog = get_catalog()
+            consumed = 0.0
+            if catalog.is_fresh():
+                # Name -> ID lookups are served by the shared catalog from memory
+                resolved = {}
+                for ride_name in ride_names:
+                    ride_id = catalog.id_for_name(ride_name)
+                    if ride_id:
+                        resolved[ride_name] = ride_id
+                wait_times = _catalog_waits(catalog.table(), resolved.values())
+            else:
+                resolved, unresolved, consumed, wait_times = resolve_ride_ids(ride_names, client=client)
+                if unresolved and not config.RIDE_NAME_INDEX:
+                    # Without a GSI, only the catalog (one shared scan) knows these names
+                    for ride_name in unresolved:
+                        ride_id = catalog.id_for_name(ride_name)
+                        if ride_id:
+                            resolved[ride_name] = ride_id
+                    wait_times.update(
+                        _catalog_waits(catalog.table(), set(resolved.values()) - set(wait_times))
+                    )
         
         # Get the IDs for the requested ride names
         ride_ids = []
         missing_rides = []
         
         for ride_name in ride_names:
-            if ride_name in ride_map:
-                ride_ids.append(ride_map[ride_name])
+            if ride_name in resolved:
+                ride_ids.append(resolved[ride_name])
             else:
                 missing_rides.append(ride_name)
                 
@@ -64,7 +117,9 @@ def get_ride_ids_from_names(ride_names):
             "status": "success",
             "ride_ids": ride_ids,
             "missing_rides": missing_rides,
-            "found_count": len(ride_ids)
+            "found_count": len(ride_ids),
+            "wait_times": wait_times,
+            "consumed_read_units": consumed
         }
         
     except ClientError as e:
@@ -78,4 +133,4 @@ def get_ride_ids_from_names(ride_names):
         return {
             "status": "error",
             "message": f"Error: {str(e)}"
-        }
\ No newline at end of file
+        }
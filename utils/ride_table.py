@@ -0,0 +1,201 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+
+import numpy as np
+
+from utils import config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def ride_name(item):
+    """Returns the ride name of a rideMetaData item (either attribute name)."""
+    return item.get('name') or item.get('rideName')
+
+
+def ride_id(item):
+    """Returns the ride ID of a rideMetaData item (either attribute name)."""
+    return item.get('id') or item.get('rideId')
+
+
+def _interned(values):
+    return tuple(map(sys.intern, map(str, values)))
+
+
+def _frozen(values, dtype):
+    array = np.asarray(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+
+class RideTable:
+    """
+    Immutable, column-oriented set of rides.
+
+    A ride is an integer row: coordinates, waits and durations are NumPy
+    columns, IDs, names and statuses are tuples of interned strings (shared
+    with every other table and session holding the same values). Dicts are
+    only built at the edges, by record() and items().
+    """
+
+    __slots__ = ("ids", "names", "lats", "lons", "waits", "durations", "statuses", "descriptions",
+                 "_rows_by_id", "_rows_by_name", "_name_order", "_sorted_names", "_digest")
+
+    def __init__(self, ids, names, lats=None, lons=None, waits=None, durations=None, statuses=None,
+                 descriptions=None, name_order=None, digest=None):
+        """
+        Args:
+            ids (list): Ride IDs
+            names (list): Ride names
+            lats (list): Latitudes (NaN where unknown)
+            lons (list): Longitudes (NaN where unknown)
+            waits (list): Current waits in minutes (0 where unknown)
+            durations (list): Minutes on the ride (defaults to the config value)
+            statuses (list): Operating status per ride
+            descriptions (list): Description text per ride
+            name_order (array): Rows sorted by name, if already known (see catalog_compiler)
+            digest (str): digest() of these rides, if already known
+        """
+        n = len(ids)
+        self.ids = _interned(ids)
+        self.names = _interned(names)
+        self.lats = _frozen(np.full(n, np.nan) if lats is None else lats, np.float64)
+        self.lons = _frozen(np.full(n, np.nan) if lons is None else lons, np.float64)
+        self.waits = _frozen(np.zeros(n) if waits is None else waits, np.int32)
+        self.durations = _frozen(
+            np.full(n, config.ESTIMATED_RIDE_DURATION_MINUTES) if durations is None else durations, np.float32
+        )
+        self.statuses = _interned(statuses) if statuses is not None else ("",) * n
+        self.descriptions = tuple(descriptions) if descriptions is not None else ("",) * n
+        self._rows_by_id = dict(zip(self.ids, range(n)))
+        # The first row wins when two rides share a name (it is inserted last)
+        self._rows_by_name = dict(zip(reversed(self.names), range(n - 1, -1, -1)))
+        self._name_order = name_order
+        self._sorted_names = None
+        self._digest = digest
+
+    @classmethod
+    def from_records(cls, records):
+        """Table for ride records as in the rides JSON file (rideId, name, lat, lon, description)."""
+        return cls(
+            [r["rideId"] for r in records],
+            [r["name"] for r in records],
+            lats=[r["lat"] for r in records],
+            lons=[r["lon"] for r in records],
+            descriptions=[r.get("description", "") for r in records],
+        )
+
+    @classmethod
+    def from_items(cls, items):
+        """Table for rideMetaData items; items without an ID are skipped."""
+        items = [item for item in items if ride_id(item)]
+        return cls(
+            [ride_id(item) for item in items],
+            [ride_name(item) or "" for item in items],
+            waits=[int(item.get('waitTime') or 0) for item in items],
+            statuses=[item.get('status') or "" for item in items],
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, ride_id):
+        return ride_id in self._rows_by_id
+
+    def row(self, ride_id):
+        """Row of a ride ID, or None."""
+        return self._rows_by_id.get(ride_id)
+
+    def row_for_name(self, name):
+        """Row of a ride name, or None."""
+        return self._rows_by_name.get(name)
+
+    def rows(self, ride_ids):
+        """Rows of the given ride IDs (KeyError for unknown IDs)."""
+        return [self._rows_by_id[ride_id] for ride_id in ride_ids]
+
+    def sorted_names(self):
+        """All ride names in alphabetical order, skipping unnamed rides (computed once per table)."""
+        if self._sorted_names is None:
+            names = self.names
+            if self._name_order is None:
+                self._sorted_names = tuple(sorted(name for name in names if name))
+            else:
+                self._sorted_names = tuple(filter(None, map(names.__getitem__, self._name_order.tolist())))
+        return self._sorted_names
+
+    def name_order(self):
+        """Rows in alphabetical order of their names (stable for equal names)."""
+        if self._name_order is None:
+            names = self.names
+            self._name_order = np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.int32)
+        return self._name_order
+
+    def digest(self):
+        """Hash of the ride IDs and coordinates, in row order (computed once per table)."""
+        if self._digest is None:
+            key = [list(ride) for ride in zip(self.ids, self.lats.tolist(), self.lons.tolist())]
+            self._digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+        return self._digest
+
+    def record(self, row):
+        """A ride as a plain dict (rideId, name, lat, lon, description)."""
+        return {
+            "rideId": self.ids[row],
+            "name": self.names[row],
+            "lat": float(self.lats[row]),
+            "lon": float(self.lons[row]),
+            "description": self.descriptions[row],
+        }
+
+    def items(self):
+        """The rides as rideMetaData-style items (rideId, name, waitTime, status)."""
+        return [
+            {"rideId": rid, "name": name, "waitTime": wait, "status": status}
+            for rid, name, wait, status in zip(self.ids, self.names, self.waits.tolist(), self.statuses)
+        ]
+
+
+def rides_version(path=None):
+    """A token that changes whenever the rides JSON file is replaced or edited."""
+    stat = os.stat(path or config.RIDES_JSON_PATH)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def _load_rides(version):
+    if config.COMPILED_CATALOG:
+        # Memory-mapped from the compiled copy, compiled on first use
+        from utils.catalog_compiler import load_or_compile
+        return load_or_compile(source_version=version)
+    with open(config.RIDES_JSON_PATH, "r") as f:
+        return RideTable.from_records(json.load(f))
+
+
+def get_ride_table():
+    """
+    Returns the shared RideTable of the rides JSON file (coordinates and
+    descriptions), reloaded when the file changes. With config.COMPILED_CATALOG
+    it is served from the compiled copy (utils/catalog_compiler.py).
+
+    Derived structures (distance matrix, map layers, spatial index) are
+    rebuilt when this returns a different table.
+    """
+    global _table
+    version = rides_version()
+    if _table is None or _table[0] != version:
+        with _table_lock:
+            if _table is None or _table[0] != version:
+                table = _load_rides(version)
+                _table = (version, table)
+                logger.info(f"Loaded {len(table)} rides from {config.RIDES_JSON_PATH}")
+    return _table[1]
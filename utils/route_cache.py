@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from utils import config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def route_cache_key(latitude, longitude, ride_ids, wait_version, variant="static"):
+    """
+    Cache key for an optimization request.
+
+    The start location is snapped to a grid cell so visitors starting from
+    the same spot share entries; ride order does not matter.
+    """
+    cell = config.ROUTE_CACHE_CELL_DEGREES
+    return (
+        round(latitude / cell),
+        round(longitude / cell),
+        tuple(sorted(set(ride_ids))),
+        wait_version,
+        variant,
+    )
+
+
+class RouteCache:
+    """Thread-safe LRU cache of optimization results with a maximum entry age."""
+
+    def __init__(self, max_entries=None, max_age_seconds=None):
+        self.max_entries = max_entries or config.ROUTE_CACHE_MAX_ENTRIES
+        self.max_age_seconds = config.ROUTE_CACHE_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Returns the cached result for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at > self.max_age_seconds:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_route_cache():
+    """Returns the process-wide RouteCache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RouteCache()
+    return _cache
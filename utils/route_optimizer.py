@@ -1,29 +1,129 @@
-import requests
-import json
 import logging
 
+from utils import config
+from utils.http_client import CircuitOpenError, RetryableHTTPError, post_json
+from utils.route_cache import get_route_cache, route_cache_key
+from utils.telemetry import span
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def optimize_routes(latitude, longitude, ride_ids):
+def optimize_routes(latitude, longitude, ride_ids, wait_profiles=None, start_time=None,
+                    progress_callback=None, wait_times=None):
+    """
+    Gets the optimal route from the backend selected by config.OPTIMIZER_BACKEND.
+    
+    The local backend solves selections of up to config.EXACT_SOLVER_MAX_RIDES
+    rides exactly (see local_optimizer.solve_open_path). When wait profiles
+    are given, the route is planned locally against the predicted wait at
+    each arrival time instead.
+    
+    Results are cached per start-location cell, ride set and the waits the
+    route was planned against (see utils.route_cache), so repeat requests
+    return immediately. Waits are read from the catalog once, before the
+    lookup, so a hit is only served while the catalog is within its TTL and
+    a miss is stored under the same waits the solve used. Current waits
+    already read with the ride IDs (see get_ride_ids_from_names) can be
+    passed in instead, so neither the key nor a local solve reads the catalog.
+    
+    Args:
+        latitude (float): User's latitude
+        longitude (float): User's longitude
+        ride_ids (list): List of ride IDs to include in the route
+        wait_profiles (dict): Optional ride ID -> waits per bucket over the day
+        start_time (datetime): When the user sets off (defaults to now, in the park's time zone)
+        progress_callback (callable): Optional progress_callback(stage, message)
+        wait_times (dict): Optional ride ID -> current wait in minutes
+        
+    Returns:
+        dict: Status and either the route data or error information
+    """
+    if wait_profiles and start_time is None:
+        from utils.time_dependent import park_now
+        # One clock for both the cache key and the plan
+        start_time = park_now()
+    if not wait_profiles and wait_times is None:
+        from utils.ride_catalog import current_waits
+        # One read for both the cache key and the plan
+        wait_times = current_waits(ride_ids)
+    key = _cache_key(latitude, longitude, ride_ids, wait_profiles, start_time, wait_times)
+    cache = get_route_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info(f"Route cache hit for {len(ride_ids)} rides")
+        if progress_callback:
+            progress_callback("cache_hit", "Found a recent route for these rides")
+        return cached
+
+    result = _optimize_routes_uncached(
+        latitude, longitude, ride_ids, wait_profiles, start_time, progress_callback, wait_times
+    )
+    if result["status"] == "success":
+        cache.put(key, result)
+    return result
+
+def _cache_key(latitude, longitude, ride_ids, wait_profiles, start_time, wait_times=None):
+    """Route cache key, tied to the waits the route is planned against."""
+    if wait_profiles:
+        from utils.time_dependent import clock_minutes
+        from utils.wait_history import history_version
+        bucket = int(clock_minutes(start_time)) // config.WAIT_PROFILE_BUCKET_MINUTES
+        return route_cache_key(latitude, longitude, ride_ids, history_version(), f"predicted:{bucket}")
+
+    # Keyed on the waits themselves, so a wait change misses the cache
+    waits = tuple(sorted((ride_id, (wait_times or {}).get(ride_id, 0)) for ride_id in set(ride_ids)))
+    return route_cache_key(latitude, longitude, ride_ids, waits)
+
+def _optimize_routes_uncached(latitude, longitude, ride_ids, wait_profiles, start_time, progress_callback,
+                              wait_times=None):
+    """Dispatches an optimization to the right solver (see optimize_routes)."""
+    if wait_profiles:
+        from utils.time_dependent import optimize_routes_time_dependent
+        return optimize_routes_time_dependent(
+            latitude, longitude, ride_ids, wait_profiles, start_time, progress_callback=progress_callback
+        )
+
+    if config.OPTIMIZER_BACKEND == "local":
+        # Imported here so the remote-only setup never loads the solver
+        from utils.local_optimizer import optimize_routes_local
+        return optimize_routes_local(
+            latitude, longitude, ride_ids, progress_callback=progress_callback, wait_times=wait_times
+        )
+    return optimize_routes_remote(latitude, longitude, ride_ids, progress_callback=progress_callback)
+
+def _solve_locally_instead(latitude, longitude, ride_ids, error_result, progress_callback=None):
+    """Falls back to the in-process solver when the API is unavailable."""
+    if not config.OPTIMIZER_FALLBACK_LOCAL:
+        return error_result
+    logger.warning(f"Optimization API unavailable ({error_result['message']}), solving locally")
+    from utils.local_optimizer import optimize_routes_local
+    result = optimize_routes_local(latitude, longitude, ride_ids, progress_callback=progress_callback)
+    return result if result["status"] == "success" else error_result
+
+def optimize_routes_remote(latitude, longitude, ride_ids, progress_callback=None):
     """
     Calls the route optimization API to get the optimal route.
     
+    The call goes through the shared pooled HTTP client (timeouts, retries and
+    a circuit breaker). If the API cannot be reached the route is solved
+    locally instead, unless config.OPTIMIZER_FALLBACK_LOCAL is off.
+    
     Args:
         latitude (float): User's latitude
         longitude (float): User's longitude
         ride_ids (list): List of ride IDs to include in the route
+        progress_callback (callable): Optional progress_callback(stage, message)
         
     Returns:
         dict: API response or error information
     """
+    # Imported here so local-only solves never load requests
+    import requests
+
     try:
         logger.info(f"Optimizing routes for {len(ride_ids)} rides")
         
-        # API endpoint
-        url = "https://rg1uo7bmxd.execute-api.us-west-2.amazonaws.com/Optimize-Routes"
-        
         # Prepare request payload
         payload = {
             "latitude": latitude,
@@ -31,14 +131,14 @@ def optimize_routes(latitude, longitude, ride_ids):
             "rideIds": ride_ids
         }
         
-        # Set headers
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
         # Make the API call
         logger.info(f"Calling API with payload: {payload}")
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        if progress_callback:
+            progress_callback("request_sent", "Waiting for the optimization API")
+        with span("http_call", rides=len(ride_ids)):
+            response = post_json(config.OPTIMIZE_API_URL, payload)
+        if progress_callback:
+            progress_callback("response_received", f"API responded with status {response.status_code}")
         
         # Check if the request was successful
         if response.status_code == 200:
@@ -55,15 +155,28 @@ def optimize_routes(latitude, longitude, ride_ids):
                 "details": response.text
             }
             
+    except CircuitOpenError as e:
+        logger.error(f"Circuit open: {e}")
+        return _solve_locally_instead(latitude, longitude, ride_ids, {
+            "status": "error",
+            "message": f"Optimization API unavailable: {str(e)}"
+        }, progress_callback)
+    except RetryableHTTPError as e:
+        logger.error(f"API call failed with status code {e.response.status_code}")
+        return _solve_locally_instead(latitude, longitude, ride_ids, {
+            "status": "error",
+            "message": f"API call failed with status code {e.response.status_code}",
+            "details": e.response.text
+        }, progress_callback)
     except requests.RequestException as e:
         logger.error(f"Request error: {e}")
-        return {
+        return _solve_locally_instead(latitude, longitude, ride_ids, {
             "status": "error",
             "message": f"Request error: {str(e)}"
-        }
+        }, progress_callback)
     except Exception as e:
         logger.error(f"Error optimizing routes: {e}")
         return {
             "status": "error",
             "message": f"Error: {str(e)}"
-        }
\ No newline at end of file
+        }
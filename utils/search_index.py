@@ -0,0 +1,216 @@
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+from utils.ride_table import get_ride_table
+
+# Weights of the ranking signals
+FULL_PREFIX_WEIGHT = 2.0
+TOKEN_PREFIX_WEIGHT = 1.0
+SUBSTRING_WEIGHT = 0.5
+NAME_SIMILARITY_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+# Minimum trigram overlap for a fuzzy-only match
+MIN_NAME_SIMILARITY = 0.35
+MIN_DESCRIPTION_CONTAINMENT = 0.75
+
+# Shorter queries only match by prefix or substring: one or two letters share
+# a trigram with almost every description
+MIN_FUZZY_QUERY_LENGTH = 3
+
+
+def normalize(text):
+    """Lowercases, strips accents and replaces punctuation with spaces."""
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    text = text.lower().replace("'", "")
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text).split())
+
+
+def trigrams(text, pad_end=True):
+    """Trigrams of normalized text; the query leaves the end open while typing."""
+    padded = "  " + text + (" " if pad_end else "")
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class _Trie:
+    """Prefix tree mapping every prefix of the inserted words to entry IDs."""
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def insert(self, word, entry):
+        node = self.root
+        for ch in word:
+            node = node.children.setdefault(ch, _TrieNode())
+            node.ids.add(entry)
+
+    def lookup(self, prefix):
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.ids
+
+
+class RideSearchIndex:
+    """
+    Ranked search over ride names and descriptions.
+
+    Prefixes of the whole name and of each name word come from tries, and
+    any other part of a name matches as a plain substring; typo tolerance and
+    description matches come from trigram postings, scored for all rides at
+    once with NumPy.
+    """
+
+    def __init__(self, names, descriptions=None):
+        """
+        Args:
+            names (list): Ride names; results are returned from this list
+            descriptions (dict): Optional name -> description text
+        """
+        descriptions = descriptions or {}
+        self.names = tuple(names)
+        # The object the index was last requested with (see get_search_index)
+        self.source = names
+        n = len(self.names)
+        self._normalized = []
+        self._full_trie = _Trie()
+        self._token_trie = _Trie()
+        name_postings = {}
+        description_postings = {}
+        self._name_trigram_counts = np.zeros(n, dtype=np.float32)
+
+        for entry, name in enumerate(self.names):
+            text = normalize(name)
+            self._normalized.append(text)
+            self._full_trie.insert(text, entry)
+            for token in text.split():
+                self._token_trie.insert(token, entry)
+            grams = trigrams(text)
+            self._name_trigram_counts[entry] = len(grams)
+            for gram in grams:
+                name_postings.setdefault(gram, []).append(entry)
+            for gram in trigrams(normalize(descriptions.get(name, ""))):
+                description_postings.setdefault(gram, []).append(entry)
+
+        self._name_postings = {g: np.array(ids, dtype=np.int32) for g, ids in name_postings.items()}
+        self._description_postings = {g: np.array(ids, dtype=np.int32) for g, ids in description_postings.items()}
+
+    def _overlap(self, postings, grams):
+        """Number of query trigrams each entry shares."""
+        lists = [postings[g] for g in grams if g in postings]
+        if not lists:
+            return np.zeros(len(self.names), dtype=np.float32)
+        return np.bincount(np.concatenate(lists), minlength=len(self.names)).astype(np.float32)
+
+    def search(self, query, k=20):
+        """
+        Returns up to k ride names ranked by how well they match the query.
+
+        Args:
+            query (str): What the user typed
+            k (int): Maximum number of results
+
+        Returns:
+            list: Matching ride names, best first
+        """
+        return [self.names[e] for e in self.search_rows(query, k)]
+
+    def search_with_total(self, query, k=20):
+        """
+        Like search, but also counts every match, including those past k.
+
+        Returns:
+            tuple: (matching ride names, best first; total number of matches)
+        """
+        rows, total = self._ranked(query, k)
+        return [self.names[e] for e in rows], total
+
+    def search_rows(self, query, k=20):
+        """Like search, but returns positions in names instead of the names."""
+        return self._ranked(query, k)[0]
+
+    def _ranked(self, query, k):
+        """Top k positions in names, best first, and the number of matches."""
+        text = normalize(query)
+        if not text or not self.names:
+            return [], 0
+
+        scores = np.zeros(len(self.names), dtype=np.float32)
+
+        # Whole-name prefix, then every query word prefixing some name word
+        full = self._full_trie.lookup(text)
+        if full:
+            scores[list(full)] += FULL_PREFIX_WEIGHT
+        token_hits = None
+        for token in text.split():
+            ids = self._token_trie.lookup(token)
+            token_hits = ids if token_hits is None else token_hits & ids
+        if token_hits:
+            scores[list(token_hits)] += TOKEN_PREFIX_WEIGHT
+        substring_hits = [e for e, name in enumerate(self._normalized) if text in name]
+        if substring_hits:
+            scores[substring_hits] += SUBSTRING_WEIGHT
+
+        # Fuzzy matches: Dice similarity on names, containment in descriptions
+        if len(text) >= MIN_FUZZY_QUERY_LENGTH:
+            grams = trigrams(text, pad_end=False)
+            name_similarity = 2 * self._overlap(self._name_postings, grams) / (len(grams) + self._name_trigram_counts)
+            containment = self._overlap(self._description_postings, grams) / len(grams)
+            scores += NAME_SIMILARITY_WEIGHT * np.where(name_similarity >= MIN_NAME_SIMILARITY, name_similarity, 0)
+            scores += DESCRIPTION_WEIGHT * np.where(containment >= MIN_DESCRIPTION_CONTAINMENT, containment, 0)
+
+        matches = np.flatnonzero(scores)
+        total = len(matches)
+        if total > k:
+            matches = matches[np.argpartition(-scores[matches], k - 1)[:k]]
+        # Best score first; shorter names first among equals
+        return sorted(matches.tolist(), key=lambda e: (-scores[e], len(self.names[e]), self.names[e])), total
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def _load_descriptions():
+    """Name -> description from the shared ride table."""
+    table = get_ride_table()
+    return dict(zip(table.names, table.descriptions))
+
+
+def get_search_index(names):
+    """
+    Returns the shared search index for a list of ride names, building it once.
+
+    The catalog hands every session the same names tuple until it reloads
+    (see RideTable.sorted_names), so a keystroke only checks that the index
+    was built from that very object. A reload compares the names once: the
+    index is rebuilt only if rides were renamed or replaced.
+
+    Args:
+        names (tuple): Ride names in the catalog
+    """
+    global _index
+    index = _index
+    if index is not None and index.source is names:
+        return index
+    with _lock:
+        index = _index
+        if index is None or (index.source is not names and index.names != tuple(names)):
+            index = RideSearchIndex(names, _load_descriptions())
+        # Later calls with this object skip the comparison
+        index.source = names
+        _index = index
+    return index
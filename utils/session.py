@@ -11,8 +11,11 @@ def initialize_session_state():
     if "longitude" not in st.session_state:
         st.session_state.longitude = -117.919  # Default to Disneyland Anaheim
     
-    if "all_rides" not in st.session_state:
-        st.session_state.all_rides = []
-    
     if "selected_rides" not in st.session_state:
-        st.session_state.selected_rides = []
\ No newline at end of file
+        st.session_state.selected_rides = []
+    
+    if "route_data" not in st.session_state:
+        st.session_state.route_data = None  # Last optimized route, updated as rides are done
+    
+    if "route_predicted" not in st.session_state:
+        st.session_state.route_predicted = False
\ No newline at end of file
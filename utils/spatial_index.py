@@ -0,0 +1,174 @@
+import math
+import threading
+
+import numpy as np
+
+from utils import config
+from utils.distance_matrix import EARTH_RADIUS_KM, WALKING_SPEED_KM_PER_MIN, haversine_km
+from utils.ride_table import get_ride_table
+
+# Length of one degree of latitude
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# Below this many points one vectorized pass over all of them is faster than the grid
+BRUTE_FORCE_MAX_POINTS = 2000
+
+
+class SpatialIndex:
+    """
+    Grid index over points for nearest and within-radius queries.
+
+    Points are bucketed into square lat/lon cells and stored sorted by cell,
+    so a query only measures the points in the cells around it.
+    """
+
+    def __init__(self, lats, lons, cell_degrees=None):
+        """
+        Args:
+            lats (array): Point latitudes
+            lons (array): Point longitudes
+            cell_degrees (float): Grid cell size (defaults to the config value)
+        """
+        self.cell = cell_degrees or config.SPATIAL_INDEX_CELL_DEGREES
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        rows = np.floor(lats / self.cell).astype(np.int64)
+        cols = np.floor(lons / self.cell).astype(np.int64)
+
+        order = np.lexsort((cols, rows))
+        self.order = order
+        self.lats = lats[order]
+        self.lons = lons[order]
+        rows, cols = rows[order], cols[order]
+
+        # Cell -> slice of the sorted arrays
+        self._cells = {}
+        if len(order):
+            starts = np.flatnonzero(np.r_[True, (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])])
+            ends = np.r_[starts[1:], len(order)]
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                self._cells[(int(rows[start]), int(cols[start]))] = (start, end)
+        self._row_range = (int(rows.min()), int(rows.max())) if len(order) else (0, -1)
+        self._col_range = (int(cols.min()), int(cols.max())) if len(order) else (0, -1)
+
+    def __len__(self):
+        return len(self.order)
+
+    def _col_spans(self, lon, col_reach):
+        """Column ranges within col_reach cells of lon, wrapping around the antimeridian."""
+        col_lo, col_hi = self._col_range
+        if (2 * col_reach + 1) * self.cell >= 360:
+            return [(col_lo, col_hi)]
+        spans = []
+        for shift in (-360, 0, 360):
+            # One cell of slack on each side for rounding at the seam
+            lo = max(math.floor((lon - col_reach * self.cell + shift) / self.cell) - 1, col_lo)
+            hi = min(math.floor((lon + col_reach * self.cell + shift) / self.cell) + 1, col_hi)
+            if lo > hi:
+                continue
+            if spans and lo <= spans[-1][1] + 1:
+                spans[-1] = (spans[-1][0], max(hi, spans[-1][1]))
+            else:
+                spans.append((lo, hi))
+        return spans
+
+    def _candidates(self, lat, lon, row_reach, col_reach):
+        """Sorted-array positions of points in the cells around (lat, lon)."""
+        row = math.floor(lat / self.cell)
+        row_lo, row_hi = max(row - row_reach, self._row_range[0]), min(row + row_reach, self._row_range[1])
+        col_spans = self._col_spans(lon, col_reach)
+        if (row_hi - row_lo + 1) * sum(hi - lo + 1 for lo, hi in col_spans) > len(self._cells):
+            # Searching more cells than exist: walk the occupied cells instead
+            slices = [s for (r, c), s in self._cells.items()
+                      if row_lo <= r <= row_hi and any(lo <= c <= hi for lo, hi in col_spans)]
+        else:
+            slices = [self._cells[(r, c)] for r in range(row_lo, row_hi + 1)
+                      for lo, hi in col_spans for c in range(lo, hi + 1) if (r, c) in self._cells]
+        if not slices:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([np.arange(start, end) for start, end in slices])
+
+    def _reach(self, lat, radius_km):
+        """Cells to search on each side to cover radius_km."""
+        row_reach = math.ceil(radius_km / (KM_PER_DEGREE * self.cell))
+        farthest_lat = abs(lat) + row_reach * self.cell
+        if farthest_lat >= 90:
+            # The circle reaches over the pole, where every longitude is close
+            return row_reach, math.ceil(360 / self.cell)
+        # A path of radius_km stays below farthest_lat, so it spans at most this much longitude
+        col_reach = math.ceil(radius_km / (KM_PER_DEGREE * self.cell * math.cos(math.radians(farthest_lat))))
+        return row_reach, col_reach
+
+    def within_radius(self, lat, lon, radius_km):
+        """
+        Points within radius_km of (lat, lon).
+
+        Returns:
+            tuple: (point indices, distances in km), nearest first
+        """
+        if len(self) <= BRUTE_FORCE_MAX_POINTS:
+            positions = np.arange(len(self))
+        else:
+            positions = self._candidates(lat, lon, *self._reach(lat, radius_km))
+        distances = haversine_km(lat, lon, self.lats[positions], self.lons[positions])
+        keep = distances <= radius_km
+        positions, distances = positions[keep], distances[keep]
+        ranked = np.argsort(distances, kind="stable")
+        return self.order[positions[ranked]], distances[ranked]
+
+    def within_walk(self, lat, lon, minutes):
+        """Points within a walk of the given minutes (straight line)."""
+        return self.within_radius(lat, lon, minutes * WALKING_SPEED_KM_PER_MIN)
+
+    def nearest(self, lat, lon, k):
+        """
+        The k points closest to (lat, lon).
+
+        Searches the cells around growing radii until k points lie within
+        the radius.
+
+        Returns:
+            tuple: (point indices, distances in km), nearest first
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        if len(self) <= BRUTE_FORCE_MAX_POINTS:
+            distances = haversine_km(lat, lon, self.lats, self.lons)
+            top = np.argpartition(distances, k - 1)[:k] if len(self) > k else np.arange(len(self))
+            top = top[np.argsort(distances[top], kind="stable")]
+            return self.order[top], distances[top]
+
+        # Every point lies within half the Earth's circumference
+        radius_km = self.cell * KM_PER_DEGREE
+        while True:
+            positions = self._candidates(lat, lon, *self._reach(lat, radius_km))
+            distances = haversine_km(lat, lon, self.lats[positions], self.lons[positions])
+            # The candidates hold every point within the radius
+            if np.count_nonzero(distances <= radius_km) >= k or radius_km >= math.pi * EARTH_RADIUS_KM:
+                break
+            radius_km *= 2
+        top = np.argpartition(distances, k - 1)[:k] if len(distances) > k else np.arange(len(distances))
+        top = top[np.argsort(distances[top], kind="stable")]
+        return self.order[positions[top]], distances[top]
+
+
+_ride_index = None
+_ride_index_lock = threading.Lock()
+
+
+def get_ride_spatial_index():
+    """
+    Returns the shared spatial index over the ride table, rebuilt when the
+    table is reloaded.
+
+    Returns:
+        tuple: (SpatialIndex, RideTable whose rows the index returns)
+    """
+    global _ride_index
+    table = get_ride_table()
+    if _ride_index is None or _ride_index[1] is not table:
+        with _ride_index_lock:
+            if _ride_index is None or _ride_index[1] is not table:
+                _ride_index = (SpatialIndex(table.lats, table.lons), table)
+    return _ride_index
@@ -0,0 +1,182 @@
+import bisect
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from utils import config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Geometric histogram buckets from 10 us to 2 min, 10% apart, so percentiles
+# read from the buckets are within 10% of the true value
+SPAN_BUCKETS_MS = tuple(0.01 * 1.1 ** k for k in range(math.ceil(math.log(120000 / 0.01, 1.1)) + 1))
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Not thread-safe on its own; callers serialize access.
+    """
+
+    def __init__(self, bounds_ms=SPAN_BUCKETS_MS):
+        self.bounds_ms = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (max for the open bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds_ms, self.counts):
+            seen += count
+            if seen >= rank:
+                return round(min(bound, self.max_ms), 2)
+        return round(self.max_ms, 2)
+
+    def snapshot(self, buckets=False):
+        """
+        Summary statistics in ms.
+
+        Args:
+            buckets (bool): Also include the count in each bucket
+        """
+        summary = {
+            "count": self.count,
+            "meanMs": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50Ms": self.percentile(50),
+            "p90Ms": self.percentile(90),
+            "p95Ms": self.percentile(95),
+            "p99Ms": self.percentile(99),
+            "maxMs": round(self.max_ms, 2),
+        }
+        if buckets:
+            summary["buckets"] = {f"le_{bound:g}": count for bound, count in zip(self.bounds_ms, self.counts)}
+            summary["buckets"]["inf"] = self.counts[-1]
+        return summary
+
+
+class Telemetry:
+    """
+    Per-process latency histograms for each named stage, plus an optional
+    JSON-lines log of every span (config.TELEMETRY_LOG_PATH).
+    """
+
+    def __init__(self, log_path=None):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._errors = {}
+        self._log = open(log_path, "a", buffering=1) if log_path else None
+
+    def record(self, stage, seconds, attrs=None, error=False):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+                self._errors[stage] = 0
+            histogram.record(seconds)
+            if error:
+                self._errors[stage] += 1
+            if self._log:
+                event = {
+                    "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                    "pid": os.getpid(),
+                    "stage": stage,
+                    "ms": round(seconds * 1000, 3),
+                    "error": error,
+                }
+                event.update(attrs or {})
+                self._log.write(json.dumps(event, default=str) + "\n")
+
+    def snapshot(self):
+        """One summary dict per stage (stage, count, errors, mean/p50/p90/p95/p99/max ms)."""
+        with self._lock:
+            return [
+                {"stage": stage, "errors": self._errors[stage], **histogram.snapshot()}
+                for stage, histogram in sorted(self._histograms.items())
+            ]
+
+    def to_jsonl(self):
+        """The per-stage summaries as JSON lines, stamped with the time and process."""
+        stamp = {"ts": datetime.now(timezone.utc).isoformat(timespec="seconds"), "pid": os.getpid()}
+        return "".join(json.dumps({**stamp, **summary}) + "\n" for summary in self.snapshot())
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+
+
+class _Span:
+    __slots__ = ("stage", "attrs", "began")
+
+    def __init__(self, stage, attrs):
+        self.stage = stage
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.began = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        get_telemetry().record(self.stage, time.perf_counter() - self.began, self.attrs, exc_type is not None)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(stage, **attrs):
+    """
+    Times a block of code as one stage:
+
+        with span("solver", rides=len(ride_ids)):
+            ...
+
+    Extra keyword arguments only go to the JSON-lines log. When telemetry is
+    disabled this returns a shared do-nothing context manager.
+    """
+    if not config.TELEMETRY_ENABLED:
+        return _NOOP_SPAN
+    return _Span(stage, attrs)
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry():
+    """Returns the Telemetry registry for this process."""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry(config.TELEMETRY_LOG_PATH or None)
+    return _telemetry
@@ -0,0 +1,275 @@
+import logging
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from utils import config
+from utils.distance_matrix import get_distance_matrix
+from utils.local_optimizer import OR_OPT_MAX_SEGMENT, ride_rows, solve_open_path
+from utils.telemetry import span
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class WaitModel:
+    """
+    Predicted waits by clock time.
+
+    Each profile is a list of waits (minutes) per bucket, starting at midnight;
+    a profile shorter than a full day wraps around.
+    """
+
+    def __init__(self, profiles, bucket_minutes=None, ride_duration=None):
+        """
+        Args:
+            profiles (list): One wait profile per point; None for points without a queue
+            bucket_minutes (int): Width of each profile bucket
+            ride_duration (float): Minutes spent on each ride after the queue
+        """
+        self.profiles = [list(p) if p else [0] for p in profiles]
+        self.bucket_minutes = bucket_minutes or config.WAIT_PROFILE_BUCKET_MINUTES
+        self.ride_duration = config.ESTIMATED_RIDE_DURATION_MINUTES if ride_duration is None else ride_duration
+
+    def wait_at(self, node, clock):
+        """Predicted wait when arriving at node at clock (minutes since midnight)."""
+        profile = self.profiles[node]
+        return profile[int(clock // self.bucket_minutes) % len(profile)]
+
+
+def simulate(cost, model, tour, start_clock, begin=1, clock=None):
+    """
+    Walks the tour from position begin and returns the finishing clock time.
+
+    Args:
+        clock (float): Clock time when leaving tour[begin - 1] (defaults to start_clock)
+    """
+    t = start_clock if clock is None else clock
+    profiles = model.profiles
+    bucket = model.bucket_minutes
+    duration = model.ride_duration
+    prev = tour[begin - 1]
+    for k in range(begin, len(tour)):
+        node = tour[k]
+        t += cost[prev][node]
+        profile = profiles[node]
+        t += profile[int(t // bucket) % len(profile)] + duration
+        prev = node
+    return t
+
+
+def departure_times(cost, model, tour, start_clock):
+    """Clock time when leaving each position of the tour."""
+    times = [start_clock]
+    t = start_clock
+    for prev, node in zip(tour, tour[1:]):
+        t += cost[prev][node]
+        t += model.wait_at(node, t) + model.ride_duration
+        times.append(t)
+    return times
+
+
+def earliest_finish_tour(cost, model, start_clock, start=0):
+    """Greedy construction: always go to the ride that can be finished soonest."""
+    unvisited = set(range(len(cost))) - {start}
+    tour = [start]
+    t = start_clock
+    while unvisited:
+        last = cost[tour[-1]]
+        best = None
+        for node in unvisited:
+            arrive = t + last[node]
+            finish = arrive + model.wait_at(node, arrive)
+            if best is None or finish < best[0]:
+                best = (finish, node)
+        node = best[1]
+        t = best[0] + model.ride_duration
+        tour.append(node)
+        unvisited.remove(node)
+    return tour
+
+
+def improve(cost, model, tour, start_clock, deadline, progress_callback=None):
+    """
+    Or-opt and 2-opt moves scored by re-simulating only the changed suffix.
+
+    Stops at the first pass without improvement or when the deadline passes.
+    """
+    n = len(tour)
+    best_finish = simulate(cost, model, tour, start_clock)
+    passes = 0
+    while time.perf_counter() < deadline:
+        passes += 1
+        improved = False
+        times = departure_times(cost, model, tour, start_clock)
+
+        # Or-opt: move a segment of 1..OR_OPT_MAX_SEGMENT rides, maybe reversed
+        for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+            for i in range(1, n - length + 1):
+                seg = tour[i:i + length]
+                rest = tour[:i] + tour[i + length:]
+                moved = False
+                for pos in range(1, len(rest) + 1):
+                    for s in (seg, seg[::-1]):
+                        if pos == i and s is seg:
+                            continue
+                        candidate = rest[:pos] + s + rest[pos:]
+                        first = min(i, pos)
+                        finish = simulate(cost, model, candidate, start_clock, first, times[first - 1])
+                        if finish < best_finish - 1e-9:
+                            tour[:] = candidate
+                            best_finish = finish
+                            times = departure_times(cost, model, tour, start_clock)
+                            improved = moved = True
+                            break
+                    # The segment and the rest changed; move on to the next position
+                    if moved:
+                        break
+                if time.perf_counter() > deadline:
+                    return tour
+
+        # 2-opt: reverse a stretch of the route
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                candidate = tour[:i] + tour[i:j + 1][::-1] + tour[j + 1:]
+                finish = simulate(cost, model, candidate, start_clock, i, times[i - 1])
+                if finish < best_finish - 1e-9:
+                    tour[:] = candidate
+                    best_finish = finish
+                    times = departure_times(cost, model, tour, start_clock)
+                    improved = True
+            if time.perf_counter() > deadline:
+                return tour
+
+        if progress_callback:
+            progress_callback("improving", f"Improvement pass {passes}: finished after {best_finish - start_clock:.0f} min")
+        if not improved:
+            break
+    return tour
+
+
+def solve_time_dependent(cost, model, start_clock, start=0, time_limit=None, progress_callback=None):
+    """
+    Finds an order that finishes all rides earliest given clock-dependent waits.
+
+    Args:
+        cost (list): Square matrix (nested lists) of walking minutes
+        model (WaitModel): Predicted waits per point
+        start_clock (float): Minutes since midnight when leaving start
+        start (int): Index of the fixed first point
+        time_limit (float): Search budget in seconds (defaults to the config value)
+        progress_callback (callable): Optional progress_callback(stage, message)
+
+    Returns:
+        list: Point indices in visiting order, starting with start
+    """
+    if time_limit is None:
+        time_limit = config.TIME_DEPENDENT_TIME_LIMIT_SECONDS
+    deadline = time.perf_counter() + time_limit
+
+    # Seed with the earliest-finish greedy and the walking-only route
+    seeds = [earliest_finish_tour(cost, model, start_clock, start), solve_open_path(cost, start)]
+    tour = min(seeds, key=lambda t: simulate(cost, model, t, start_clock))
+    return improve(cost, model, tour, start_clock, deadline, progress_callback)
+
+
+def park_now():
+    """The current time in the park's time zone (wait profiles are bucketed in it)."""
+    return datetime.now(ZoneInfo(config.PARK_TIMEZONE))
+
+
+def clock_minutes(when):
+    """Minutes since midnight in the park for a datetime (naive ones are taken as park time)."""
+    if when.tzinfo is not None:
+        when = when.astimezone(ZoneInfo(config.PARK_TIMEZONE))
+    return when.hour * 60 + when.minute + when.second / 60
+
+
+def timed_route_result(table, rows, cost, model, tour, start_clock):
+    """
+    Builds the optimizer result for a solved tour, with predicted waits and arrival times.
+
+    Args:
+        table (RideTable): Rides the rows refer to
+        rows (list): Table rows; point k of the cost matrix is rows[k - 1]
+        cost (list): Square matrix of walking minutes (point 0 is the start)
+        model (WaitModel): Predicted waits per point
+        tour (list): Point indices in visiting order, starting with 0
+        start_clock (float): Minutes since midnight when leaving the start
+
+    Returns:
+        dict: Success status and the route data (orderedRides, totalTimeMinutes)
+    """
+    ordered_rides = []
+    t = start_clock
+    for prev, node in zip(tour, tour[1:]):
+        row = rows[node - 1]
+        walking_time = cost[prev][node]
+        t += walking_time
+        wait_time = model.wait_at(node, t)
+        ordered_rides.append({
+            "rideId": table.ids[row],
+            "name": table.names[row],
+            "lat": float(table.lats[row]),
+            "lon": float(table.lons[row]),
+            "waitTime": wait_time,
+            "walkingTimeMinutes": round(walking_time, 1),
+            "arrivalMinutes": round(t - start_clock, 1),
+        })
+        t += wait_time + model.ride_duration
+
+    return {
+        "status": "success",
+        "data": {
+            "orderedRides": ordered_rides,
+            "totalTimeMinutes": round(t - start_clock, 1),
+        }
+    }
+
+
+def optimize_routes_time_dependent(latitude, longitude, ride_ids, wait_profiles, start_time=None,
+                                   progress_callback=None):
+    """
+    Computes the route that finishes soonest when each ride's wait depends on
+    the time we get there.
+
+    Args:
+        latitude (float): User's latitude
+        longitude (float): User's longitude
+        ride_ids (list): List of ride IDs to include in the route
+        wait_profiles (dict): Ride ID -> list of waits per config.WAIT_PROFILE_BUCKET_MINUTES bucket from midnight
+        start_time (datetime): When the user sets off (defaults to now, in the park's time zone)
+        progress_callback (callable): Optional progress_callback(stage, message)
+
+    Returns:
+        dict: Status and either the route data (orderedRides, totalTimeMinutes) or an error
+    """
+    try:
+        logger.info(f"Optimizing time-dependent route for {len(ride_ids)} rides")
+        matrix = get_distance_matrix()
+        table = matrix.table
+
+        rows, missing = ride_rows(table, ride_ids)
+        if missing:
+            return {
+                "status": "error",
+                "message": f"No coordinates for rides: {missing}"
+            }
+
+        start_clock = clock_minutes(start_time or park_now())
+        cost = matrix.walking_cost_matrix(latitude, longitude, rows)
+        model = WaitModel([None] + [wait_profiles.get(table.ids[row]) for row in rows])
+
+        with span("solver", solver="time_dependent", rides=len(rows)):
+            tour = solve_time_dependent(cost, model, start_clock, progress_callback=progress_callback)
+        return timed_route_result(table, rows, cost, model, tour, start_clock)
+
+    except Exception as e:
+        logger.error(f"Error optimizing time-dependent route: {e}")
+        return {
+            "status": "error",
+            "message": f"Error: {str(e)}"
+        }
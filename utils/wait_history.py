@@ -0,0 +1,212 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from utils import config
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# pyarrow takes ~0.4 s to import, so it is only loaded once history is read
+# or written (has_history and history_version never need it)
+_snapshot_schema = None
+
+
+def snapshot_schema():
+    """Columns stored for every ride in a snapshot."""
+    global _snapshot_schema
+    if _snapshot_schema is None:
+        import pyarrow as pa
+
+        _snapshot_schema = pa.schema([
+            ("ride_id", pa.string()),
+            ("wait_time", pa.int32()),
+            ("status", pa.string()),
+            ("observed_at", pa.timestamp("us", tz="UTC")),
+        ])
+    return _snapshot_schema
+
+
+def _as_utc(value):
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def append_snapshot(waits, observed_at=None, root=None):
+    """
+    Appends one wait-time snapshot to the history as a new Parquet file.
+
+    Args:
+        waits (list): Dicts with rideId, waitTime and optionally status
+        observed_at (datetime): When the waits were read (defaults to now, UTC)
+        root (str): History directory (defaults to config.WAIT_HISTORY_DIR)
+
+    Returns:
+        str: Path of the file written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    root = root or config.WAIT_HISTORY_DIR
+    observed_at = _as_utc(observed_at or datetime.now(timezone.utc))
+
+    table = pa.table({
+        "ride_id": [w["rideId"] for w in waits],
+        "wait_time": [int(w.get("waitTime") or 0) for w in waits],
+        "status": [w.get("status") for w in waits],
+        "observed_at": [observed_at] * len(waits),
+    }, schema=snapshot_schema())
+
+    # Existing files are never rewritten; each snapshot is its own file
+    partition = os.path.join(root, f"date={observed_at:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+    path = os.path.join(partition, f"{observed_at:%H%M%S}-{uuid.uuid4().hex[:8]}.parquet")
+    pq.write_table(table, path)
+    logger.info(f"Appended {len(waits)} waits to {path}")
+    return path
+
+
+def has_history(root=None):
+    """True if at least one snapshot has been recorded."""
+    root = root or config.WAIT_HISTORY_DIR
+    return os.path.isdir(root) and any(name.startswith("date=") for name in os.listdir(root))
+
+
+def history_version(root=None):
+    """A token that changes whenever a snapshot is appended (newest day partition and its mtime)."""
+    root = root or config.WAIT_HISTORY_DIR
+    if not has_history(root):
+        return None
+    newest = max(name for name in os.listdir(root) if name.startswith("date="))
+    return f"{newest}:{os.stat(os.path.join(root, newest)).st_mtime_ns}"
+
+
+def read_wait_history(ride_ids=None, start=None, end=None, columns=None, root=None):
+    """
+    Reads a slice of the wait history.
+
+    Day partitions outside [start, end] are skipped without being opened and
+    the remaining filters are pushed down to the Parquet row groups, so only
+    the requested rides, time range and columns are read.
+
+    Args:
+        ride_ids (list): Only these rides (default all)
+        start (datetime): Earliest observation, inclusive
+        end (datetime): Latest observation, exclusive
+        columns (list): Columns to return (default all snapshot columns)
+        root (str): History directory (defaults to config.WAIT_HISTORY_DIR)
+
+    Returns:
+        pyarrow.Table: Matching snapshot rows
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    root = root or config.WAIT_HISTORY_DIR
+    schema = snapshot_schema()
+    columns = columns or schema.names
+    if not has_history(root):
+        return schema.empty_table().select(columns)
+
+    # Day partitions are directories named date=YYYY-MM-DD
+    partitioning = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    dataset = ds.dataset(root, format="parquet", partitioning=partitioning)
+    conditions = []
+    if start is not None:
+        start = _as_utc(start)
+        conditions.append(ds.field("date") >= f"{start:%Y-%m-%d}")
+        conditions.append(ds.field("observed_at") >= pa.scalar(start, type=schema.field("observed_at").type))
+    if end is not None:
+        end = _as_utc(end)
+        conditions.append(ds.field("date") <= f"{end:%Y-%m-%d}")
+        conditions.append(ds.field("observed_at") < pa.scalar(end, type=schema.field("observed_at").type))
+    if ride_ids is not None:
+        conditions.append(ds.field("ride_id").isin(list(ride_ids)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression)
+
+
+def build_wait_profiles(ride_ids, days=28, bucket_minutes=None, end=None, root=None):
+    """
+    Typical wait by time of day for each ride, from the recent history.
+
+    Args:
+        ride_ids (list): Rides to build profiles for
+        days (int): How many days of history to use
+        bucket_minutes (int): Profile bucket width (defaults to the config value)
+        end (datetime): End of the history window (defaults to now)
+
+    Returns:
+        dict: Ride ID -> list of median waits per bucket from local midnight
+              (rides with no history are left out)
+    """
+    bucket_minutes = bucket_minutes or config.WAIT_PROFILE_BUCKET_MINUTES
+    end = _as_utc(end or datetime.now(timezone.utc))
+    table = read_wait_history(
+        ride_ids, start=end - timedelta(days=days), end=end,
+        columns=["ride_id", "wait_time", "observed_at"], root=root,
+    )
+    if table.num_rows == 0:
+        return {}
+
+    df = table.to_pandas()
+    local = df["observed_at"].dt.tz_convert(config.PARK_TIMEZONE)
+    df["bucket"] = (local.dt.hour * 60 + local.dt.minute) // bucket_minutes
+    medians = df.groupby(["ride_id", "bucket"])["wait_time"].median()
+
+    buckets = 24 * 60 // bucket_minutes
+    profiles = {}
+    for ride_id, ride_medians in medians.groupby(level=0):
+        by_bucket = dict(zip(ride_medians.index.get_level_values(1), ride_medians.values))
+        # Buckets with no observations take the ride's overall median
+        fallback = float(ride_medians.median())
+        profiles[ride_id] = [float(by_bucket.get(b, fallback)) for b in range(buckets)]
+    return profiles
+
+
+def compact_day(day, root=None):
+    """
+    Merges a finished day's snapshot files into one file so reads open fewer files.
+
+    Args:
+        day (date): Day partition to compact
+        root (str): History directory (defaults to config.WAIT_HISTORY_DIR)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    root = root or config.WAIT_HISTORY_DIR
+    partition = os.path.join(root, f"date={day:%Y-%m-%d}")
+    files = sorted(f for f in os.listdir(partition) if f.endswith(".parquet"))
+    if len(files) < 2:
+        return
+    table = pa.concat_tables([pq.read_table(os.path.join(partition, f), schema=snapshot_schema()) for f in files])
+    # Dot-prefixed so dataset reads skip it while it is being written
+    tmp_path = os.path.join(partition, ".compacted.parquet.tmp")
+    pq.write_table(table.sort_by([("ride_id", "ascending"), ("observed_at", "ascending")]), tmp_path)
+    os.replace(tmp_path, os.path.join(partition, "000000-compacted.parquet"))
+    for f in files:
+        if f != "000000-compacted.parquet":
+            os.remove(os.path.join(partition, f))
+    logger.info(f"Compacted {len(files)} files in {partition}")
+
+
+def record_catalog_snapshot(root=None):
+    """Appends the waits currently in rideMetaData to the history."""
+    from utils.ride_catalog import get_catalog
+
+    catalog = get_catalog()
+    # Always read fresh waits rather than the cached copy
+    catalog.bump_version()
+    return append_snapshot(catalog.items(), root=root)
+
+
+if __name__ == "__main__":
+    # Run on a schedule (e.g. every 20 minutes) to build up history
+    print(record_catalog_snapshot())
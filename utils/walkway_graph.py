@@ -0,0 +1,222 @@
+import hashlib
+import heapq
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from utils import config
+from utils.distance_matrix import haversine_km
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Most point-to-node distances held at once while snapping
+SNAP_BLOCK_SIZE = 1 << 20
+
+
+def compile_graph(source_path, output_path):
+    """
+    Compiles an editable JSON walkway graph into the binary .npz format.
+
+    The JSON has "nodes": [{"id", "lat", "lon"}] and "edges": [{"from", "to",
+    "length_m"}] (length_m defaults to the straight-line length). Edges are
+    walkable in both directions.
+    """
+    with open(source_path, "r") as f:
+        source = json.load(f)
+    node_ids = {node["id"]: i for i, node in enumerate(source["nodes"])}
+    lats = np.array([node["lat"] for node in source["nodes"]], dtype=np.float64)
+    lons = np.array([node["lon"] for node in source["nodes"]], dtype=np.float64)
+    edge_from = np.array([node_ids[edge["from"]] for edge in source["edges"]], dtype=np.int32)
+    edge_to = np.array([node_ids[edge["to"]] for edge in source["edges"]], dtype=np.int32)
+    straight = haversine_km(lats[edge_from], lons[edge_from], lats[edge_to], lons[edge_to]) * 1000
+    lengths = np.array(
+        [edge.get("length_m", s) for edge, s in zip(source["edges"], straight)], dtype=np.float32
+    )
+    save_graph(output_path, lats, lons, edge_from, edge_to, lengths)
+
+
+def save_graph(path, lats, lons, edge_from, edge_to, lengths):
+    """Writes a walkway graph in the binary .npz format."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez(path, node_lat=lats, node_lon=lons, edge_from=edge_from, edge_to=edge_to, edge_length_m=lengths)
+
+
+def dijkstra(indptr, indices, weights, source):
+    """Shortest path length (m) from source to every node; inf where unreachable."""
+    dist = [float("inf")] * (len(indptr) - 1)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        for k in range(indptr[node], indptr[node + 1]):
+            nd = d + weights[k]
+            other = indices[k]
+            if nd < dist[other]:
+                dist[other] = nd
+                heapq.heappush(heap, (nd, other))
+    return dist
+
+
+# Adjacency shared with pool workers (set once per worker process)
+_worker_graph = None
+
+
+def _init_worker(indptr, indices, weights):
+    global _worker_graph
+    _worker_graph = (indptr, indices, weights)
+
+
+def _dijkstra_in_worker(source):
+    return dijkstra(*_worker_graph, source)
+
+
+class WalkwayGraph:
+    """A park's walkway network with ride-to-ride shortest walking distances."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            raw = f.read()
+        self.digest = hashlib.sha256(raw).hexdigest()
+        with np.load(path) as data:
+            self.lats = data["node_lat"]
+            self.lons = data["node_lon"]
+            edge_from = data["edge_from"].astype(np.int64)
+            edge_to = data["edge_to"].astype(np.int64)
+            lengths = data["edge_length_m"].astype(np.float64)
+
+        # CSR adjacency with both directions of every edge
+        sources = np.concatenate([edge_from, edge_to])
+        targets = np.concatenate([edge_to, edge_from])
+        weights = np.concatenate([lengths, lengths])
+        order = np.argsort(sources, kind="stable")
+        self.indptr = np.searchsorted(sources[order], np.arange(len(self.lats) + 1)).tolist()
+        self.indices = targets[order].tolist()
+        self.weights = weights[order].tolist()
+
+    def snap(self, lats, lons):
+        """
+        Nearest graph node to each point, for blocks of points at a time.
+
+        Returns:
+            tuple: (node indices, straight-line distance to the node in m)
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        nodes = np.empty(len(lats), dtype=np.intp)
+        distances = np.empty(len(lats))
+        block = max(1, SNAP_BLOCK_SIZE // max(1, len(self.lats)))
+        for start in range(0, len(lats), block):
+            end = start + block
+            km = haversine_km(lats[start:end, None], lons[start:end, None], self.lats[None, :], self.lons[None, :])
+            nearest = km.argmin(axis=1)
+            nodes[start:end] = nearest
+            distances[start:end] = km[np.arange(len(nearest)), nearest] * 1000
+        return nodes, distances
+
+    def _shortest_paths(self, sources, workers=None):
+        """Dijkstra from each source node, spread over a process pool."""
+        workers = workers or config.WALKWAY_WORKERS or os.cpu_count() or 1
+        logger.info(f"Running Dijkstra from {len(sources)} nodes on {workers} processes")
+        if workers == 1 or len(sources) <= 1:
+            return [dijkstra(self.indptr, self.indices, self.weights, source) for source in sources]
+
+        # Spawned, not forked: forking a process with running threads (the
+        # Streamlit server) can leave locks held in the children
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(self.indptr, self.indices, self.weights),
+        ) as pool:
+            return list(pool.map(_dijkstra_in_worker, sources, chunksize=max(1, len(sources) // (4 * workers))))
+
+    def walking_m_to_points(self, lats, lons, workers=None):
+        """
+        Walking distance (m) from every graph node to each of the given points.
+
+        Points are snapped to their nearest node and Dijkstra is run once from
+        each distinct node (the network is undirected). This is the expensive
+        part; utils.distance_matrix does it once per catalog and graph, so
+        requests only index into the result.
+
+        Returns:
+            np.ndarray: float32 array of shape (nodes, points); inf where unreachable
+        """
+        nodes, snap_m = self.snap(lats, lons)
+        sources = sorted(set(nodes.tolist()))
+        to_points = np.empty((len(self.lats), len(nodes)), dtype=np.float32)
+        for source, dist in zip(sources, self._shortest_paths(sources, workers)):
+            columns = np.flatnonzero(nodes == source)
+            to_points[:, columns] = np.asarray(dist, dtype=np.float32)[:, None] + snap_m[columns].astype(np.float32)
+        return to_points
+
+    def distances_from_point(self, lat, lon, lats, lons, to_points=None):
+        """
+        Walking distance (km) from one point to each of the given points.
+
+        Args:
+            lat (float): Latitude of the point
+            lon (float): Longitude of the point
+            lats (np.ndarray): Latitudes of the points to reach
+            lons (np.ndarray): Longitudes of the points to reach
+            to_points (np.ndarray): walking_m_to_points() for those points;
+                without it a Dijkstra is run from the point
+
+        Returns:
+            np.ndarray: Distances in km
+        """
+        (source,), (source_m,) = self.snap(lat, lon)
+        if to_points is None:
+            to_points = self.walking_m_to_points(lats, lons, workers=1)
+        km = (source_m + np.asarray(to_points[source], dtype=np.float64)) / 1000
+        # Points the network cannot connect fall back to straight-line distance
+        return np.where(np.isfinite(km), km, haversine_km(lat, lon, lats, lons))
+
+    def pairwise_km(self, lats, lons, workers=None, to_points=None):
+        """
+        All-pairs walking distance (km) between the given points.
+
+        Args:
+            to_points (np.ndarray): walking_m_to_points() for the points, if already computed
+
+        Returns:
+            np.ndarray: (points, points) distances in km
+        """
+        if to_points is None:
+            to_points = self.walking_m_to_points(lats, lons, workers)
+        nodes, snap_m = self.snap(lats, lons)
+        km = (snap_m[:, None] + np.asarray(to_points, dtype=np.float64)[nodes]) / 1000
+        unreachable = ~np.isfinite(km)
+        if unreachable.any():
+            logger.warning(f"{int(unreachable.sum())} point pairs are not connected by walkways")
+            lats, lons = np.asarray(lats), np.asarray(lons)
+            straight = haversine_km(lats[:, None], lons[:, None], lats[None, :], lons[None, :])
+            km = np.where(unreachable, straight, km)
+        np.fill_diagonal(km, 0.0)
+        return km
+
+
+_graphs = {}
+
+
+def get_walkway_graph(path=None):
+    """Returns the walkway graph at path (defaults to config.WALKWAY_GRAPH_PATH), or None if there is none."""
+    path = path or config.WALKWAY_GRAPH_PATH
+    if not os.path.exists(path):
+        return None
+    if path not in _graphs:
+        _graphs[path] = WalkwayGraph(path)
+    return _graphs[path]
+
+
+if __name__ == "__main__":
+    # python -m utils.walkway_graph park.json data/walkways/park.npz
+    compile_graph(sys.argv[1], sys.argv[2])
+    print(f"Compiled {sys.argv[1]} -> {sys.argv[2]}")